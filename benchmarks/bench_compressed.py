@@ -0,0 +1,82 @@
+"""
+Folder search over gzipped logs versus the same logs uncompressed.
+
+Usage: python benchmarks/bench_compressed.py [--files 32] [--lines 50000]
+                                             [--workers 0]
+
+Writes a log corpus, then a copy with every file gzipped and a third copy
+bundled into one .tar.gz, and times the same patterns over each, serially
+and with --workers processes (0 = every CPU). "gz inline" turns off the
+background decompression thread to show what the pipeline overlap buys.
+"""
+import argparse
+import gzip
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src import core  # noqa: E402
+
+PATTERNS = [r"ERROR", r"ERROR \[worker-1\d\]", r"(?i)timeout.*kilo"]
+
+
+def gzip_corpus(paths, src_root, dest_root):
+    for path in paths:
+        dest = os.path.join(dest_root, os.path.relpath(path, src_root)) + ".gz"
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(path, "rb") as src, gzip.open(dest, "wb", compresslevel=6) as out:
+            shutil.copyfileobj(src, out)
+
+
+def run(folder, workers):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        count = sum(sum(1 for _ in core.RegexSearcher().search_in_folder(
+            folder, pattern, workers=workers)) for pattern in PATTERNS)
+        best = min(best, time.perf_counter() - start)
+    return best, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, "plain")
+        paths = generate_corpus(plain, files=args.files, lines_per_file=args.lines,
+                                mix={".log": 1})
+        gzipped = os.path.join(tmp, "gz")
+        gzip_corpus(paths, plain, gzipped)
+        bundled = os.path.join(tmp, "tar")
+        os.makedirs(bundled)
+        with tarfile.open(os.path.join(bundled, "logs.tar.gz"), "w:gz") as archive:
+            archive.add(plain, arcname="logs")
+        size = sum(os.path.getsize(path) for path in paths) / 2 ** 20
+
+        print(f"{size:.0f} MB of logs, {len(PATTERNS)} patterns, {workers} workers")
+        print(f"{'corpus':<12} {'workers':>7} {'seconds':>8} {'MB/s':>8} {'matches':>8}")
+        min_bytes = core.PREFETCH_MIN_BYTES
+        for label, folder, prefetch in (("plain", plain, True), ("gz", gzipped, True),
+                                        ("gz inline", gzipped, False),
+                                        ("tar.gz", bundled, True)):
+            core.PREFETCH_MIN_BYTES = min_bytes if prefetch else float("inf")
+            for count in sorted({1, workers}):
+                seconds, matches = run(folder, count)
+                print(f"{label:<12} {count:>7} {seconds:>8.2f} "
+                      f"{size * len(PATTERNS) / seconds:>8.1f} {matches:>8}")
+        core.PREFETCH_MIN_BYTES = min_bytes
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Rows/sec and peak RSS of streaming export for a large synthetic result set.
+
+Usage: python benchmarks/bench_export.py [--rows 10000000]
+
+Each format runs in a fresh process so peak RSS is measured independently.
+"legacy csv" materialises the result list first, as the export used to.
+Formats whose optional library (pyarrow, zstandard) is missing are skipped.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import SearchResult  # noqa: E402
+from src.export import export_results  # noqa: E402
+
+CASES = {
+    "legacy csv": ("report.csv", None),
+    "csv": ("report.csv", None),
+    "jsonl": ("report.jsonl", None),
+    "jsonl gzip": ("report.jsonl.gz", None),
+    "csv zstd": ("report.csv.zst", None),
+    "parquet": ("report.parquet", None),
+    "parquet zstd": ("report.parquet", "zstd"),
+}
+
+
+def synthetic_results(rows):
+    """Yields SearchResults sharing lines the way a real search does."""
+    for i in range(rows):
+        line = f"2024-01-01 12:00:{i % 60:02d} ERROR [worker-{i % 16}] request={i} failed"
+        yield SearchResult(f"/var/log/app/service{i % 200}.log", i + 1, line,
+                           f"request={i}")
+
+
+def run_case(name, rows, folder):
+    """Runs one case in this process; returns rows/sec, peak RSS and size."""
+    file_name, compression = CASES[name]
+    path = os.path.join(folder, file_name)
+    start = time.perf_counter()
+    results = synthetic_results(rows)
+    if name.startswith("legacy"):
+        results = list(results)
+    count = export_results(results, path, compression=compression)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_kb //= 1024
+    return {"rows_per_s": count / elapsed, "peak_mb": peak_kb / 1024,
+            "size_mb": os.path.getsize(path) / 2 ** 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--folder", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.rows, args.folder)))
+        return
+
+    print(f"{'format':<14} {'rows/s':>10} {'peak RSS MB':>12} {'file MB':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        for name in CASES:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--rows", str(args.rows),
+                 "--case", name, "--folder", folder],
+                capture_output=True, text=True)
+            if proc.returncode != 0:
+                reason = proc.stderr.strip().splitlines()[-1:] or ["failed"]
+                print(f"{name:<14} skipped: {reason[0]}")
+                continue
+            stats = json.loads(proc.stdout)
+            print(f"{name:<14} {stats['rows_per_s']:>10,.0f} "
+                  f"{stats['peak_mb']:>12.1f} {stats['size_mb']:>8.1f}")
+            for file_name in os.listdir(folder):
+                os.remove(os.path.join(folder, file_name))
+
+
+if __name__ == "__main__":
+    main()
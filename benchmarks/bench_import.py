@@ -0,0 +1,46 @@
+"""
+Import-time cost of src.core and of the optional format libraries.
+
+Usage: python benchmarks/bench_import.py [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["src.core", "src.cache", "src.index", "concurrent.futures.process",
+           "docx", "pypdf", "openpyxl"]
+
+
+def import_time_us(module):
+    """Runs python -X importtime in a fresh process; returns cumulative us."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    for line in reversed(proc.stderr.splitlines()):
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<28} {'best ms':>8}")
+    for module in MODULES:
+        timings = [import_time_us(module) for _ in range(args.repeat)]
+        if None in timings:
+            print(f"{module:<28} {'missing':>8}")
+            continue
+        print(f"{module:<28} {min(timings) / 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Candidate-set reduction and speed of search_indexed vs search_in_folder.
+
+Usage: python benchmarks/bench_index.py [--files 400] [--needle-rate 0.02]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src.core import RegexSearcher  # noqa: E402
+from src.index import TrigramIndex  # noqa: E402
+
+PATTERNS = [r"txn=DEADBEEF", r"txn=[0-9A-F]{8} refunded",
+            r"(?i)chargeback|refunded", r"ERROR \[worker-7\]", r"\d{4}-\d{2}"]
+
+
+def plant_needles(paths, rate, seed=99):
+    """Appends rare literal lines to a fraction of the text files."""
+    rng = random.Random(seed)
+    for path in paths:
+        if path.endswith((".txt", ".log")) and rng.random() < rate:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("txn=DEADBEEF refunded\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--needle-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    searcher = RegexSearcher()
+    with tempfile.TemporaryDirectory() as corpus:
+        paths = generate_corpus(corpus, files=args.files,
+                                lines_per_file=args.lines)
+        plant_needles(paths, args.needle_rate)
+        start = time.perf_counter()
+        searcher.build_index(corpus)
+        print(f"initial index build: {time.perf_counter() - start:.2f}s")
+        start = time.perf_counter()
+        searcher.build_index(corpus)
+        print(f"no-op refresh:       {time.perf_counter() - start:.2f}s\n")
+
+        index = TrigramIndex(corpus)
+        print(f"{'pattern':<28} {'candidates':>12} {'full s':>8} "
+              f"{'indexed s':>10} {'matches':>8}")
+        for pattern in PATTERNS:
+            candidates = len(index.candidates(pattern))
+            start = time.perf_counter()
+            full = sum(1 for _ in searcher.search_in_folder(corpus, pattern))
+            full_time = time.perf_counter() - start
+            start = time.perf_counter()
+            indexed = sum(1 for _ in searcher.search_indexed(corpus, pattern))
+            indexed_time = time.perf_counter() - start
+            assert full == indexed
+            print(f"{pattern:<28} {candidates:>5}/{len(paths):<6} "
+                  f"{full_time:>8.2f} {indexed_time:>10.2f} {full:>8}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
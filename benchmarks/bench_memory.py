@@ -0,0 +1,67 @@
+"""
+Bytes per SearchResult for a hit-heavy search, compared with the previous
+dict-based representation (a __dict__, a basename and a stripped line per hit).
+
+Usage: python benchmarks/bench_memory.py [--files 20] [--lines 2000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src.core import RegexSearcher  # noqa: E402
+
+
+class LegacySearchResult:
+    """The SearchResult layout before __slots__ and shared lines."""
+
+    def __init__(self, file_path, line_number, line_content, match_group):
+        self.file_path = file_path
+        self.file_name = os.path.basename(file_path)
+        self.line_number = line_number
+        self.line_content = line_content.strip()
+        self.match_group = match_group
+
+
+def measure(build):
+    tracemalloc.start()
+    results = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, len(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--pattern", default=r"\b\w+\b")
+    args = parser.parse_args()
+
+    searcher = RegexSearcher()
+    with tempfile.TemporaryDirectory() as corpus:
+        generate_corpus(corpus, files=args.files, lines_per_file=args.lines,
+                        mix={".txt": 1, ".log": 1})
+
+        def compact():
+            return list(searcher.search_in_folder(corpus, args.pattern))
+
+        def legacy():
+            return [LegacySearchResult(r.file_path, r.line_number, r._line,
+                                       r.match_group)
+                    for r in searcher.search_in_folder(corpus, args.pattern)]
+
+        new_bytes, count = measure(compact)
+        old_bytes, _ = measure(legacy)
+        print(f"results:               {count}")
+        print(f"legacy bytes/result:   {old_bytes / count:.1f}")
+        print(f"compact bytes/result:  {new_bytes / count:.1f}")
+        print(f"reduction:             {old_bytes / new_bytes:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Memory-mapped whole-buffer search vs the per-line loop on one large log.
+
+Usage: python benchmarks/bench_mmap.py [--size-mb 512] [--match-rate 0.0001]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import _log_line  # noqa: E402
+from src import core  # noqa: E402
+
+PATTERNS = [r"ERROR", r"ERROR \[worker-\d+\]", r"request=\d+7 ", r"(?i)error"]
+
+
+def write_log(path, size_mb, match_rate, seed=1234):
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = line_num = 0
+    with open(path, "w", encoding="ascii") as f:
+        while written < target:
+            lines = [_log_line(rng, line_num + i, match_rate) + "\n"
+                     for i in range(10000)]
+            block = "".join(lines)
+            f.write(block)
+            written += len(block)
+            line_num += len(lines)
+
+
+def timed(func):
+    start = time.perf_counter()
+    count = func()
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--match-rate", type=float, default=0.0001)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "big.log")
+        write_log(path, args.size_mb, args.match_rate)
+        print(f"{'pattern':<24} {'per-line s':>11} {'mmap s':>8} "
+              f"{'matches':>8} {'speedup':>8}")
+        for pattern in PATTERNS:
+            queries = [(None, re.compile(pattern))]
+            slow, slow_count = timed(lambda: sum(
+                1 for _ in core._search_lines(path, queries)))
+            fast, fast_count = timed(lambda: sum(
+                len(found) for found in core._search_mmap(path, queries)[0]))
+            assert slow_count == fast_count
+            print(f"{pattern:<24} {slow:>11.2f} {fast:>8.2f} "
+                  f"{fast_count:>8} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
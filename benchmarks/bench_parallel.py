@@ -0,0 +1,44 @@
+"""
+Scaling benchmark for RegexSearcher.search_in_folder(workers=N).
+
+Usage: python benchmarks/bench_parallel.py [--files 400] [--max-workers 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src.core import RegexSearcher  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--pattern", default=r"ERROR \[worker-\d+\]")
+    args = parser.parse_args()
+
+    searcher = RegexSearcher()
+    with tempfile.TemporaryDirectory() as corpus:
+        generate_corpus(corpus, files=args.files, lines_per_file=args.lines)
+        workers = 1
+        baseline = None
+        print(f"{'workers':>8} {'seconds':>9} {'matches':>9} {'speedup':>8}")
+        while workers <= args.max_workers:
+            start = time.perf_counter()
+            count = sum(1 for _ in searcher.search_in_folder(
+                corpus, args.pattern, workers=workers))
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.3f} {count:>9} "
+                  f"{baseline / elapsed:>7.2f}x")
+            workers *= 2
+
+
+if __name__ == "__main__":
+    main()
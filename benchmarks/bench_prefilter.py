@@ -0,0 +1,57 @@
+"""
+Speedup of the required-literal prefilter per pattern class.
+
+Usage: python benchmarks/bench_prefilter.py [--files 200] [--match-rate 0.00005]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src import core  # noqa: E402
+
+PATTERNS = {
+    "leading literal": r"ERROR \[worker-\d+\]",
+    "inner literal": r"\d+:\d+:\d+ ERROR",
+    "alternation": r"\w+ (?:ERROR|WARN) \[worker-3\d\]",
+    "ignorecase literal": r"(?i)\bwarn\b.*kilo",
+    "no literal": r"\d{2}:\d{2}:\d{2}",
+}
+
+
+def run(corpus, pattern):
+    start = time.perf_counter()
+    count = sum(1 for _ in core.RegexSearcher().search_in_folder(corpus, pattern))
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--match-rate", type=float, default=0.00005)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as corpus:
+        generate_corpus(corpus, files=args.files, lines_per_file=args.lines,
+                        mix={".txt": 1, ".log": 1, ".csv": 1},
+                        match_rate=args.match_rate)
+        print(f"{'class':<20} {'plain re s':>10} {'prefilter s':>12} "
+              f"{'matches':>8} {'speedup':>8}")
+        enabled = core.literal_prefilter
+        for name, pattern in PATTERNS.items():
+            core.literal_prefilter = lambda pattern, flags=0: None
+            plain, plain_count = run(corpus, pattern)
+            core.literal_prefilter = enabled
+            fast, fast_count = run(corpus, pattern)
+            assert plain_count == fast_count
+            print(f"{name:<20} {plain:>10.2f} {fast:>12.2f} "
+                  f"{fast_count:>8} {plain / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
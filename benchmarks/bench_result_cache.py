@@ -0,0 +1,62 @@
+"""
+Repeat folder searches with and without a ResultCache.
+
+Usage: python benchmarks/bench_result_cache.py [--files 400] [--lines 2000]
+                                               [--changed 0.01]
+
+Times a cold search, an identical repeat, and a repeat after --changed of
+the files were rewritten, against the same searches without the cache.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src.cache import ResultCache  # noqa: E402
+from src.core import RegexSearcher  # noqa: E402
+
+PATTERN = r"\d{2}:\d{2}:\d{2} ERROR \[worker-1\d\]"
+
+
+def timed(searcher, folder):
+    start = time.perf_counter()
+    count = sum(1 for _ in searcher.search_in_folder(folder, PATTERN))
+    return time.perf_counter() - start, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--changed", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "corpus")
+        paths = generate_corpus(folder, files=args.files, lines_per_file=args.lines,
+                                mix={".log": 3, ".txt": 1, ".csv": 1})
+        result_cache = ResultCache(os.path.join(tmp, "results.sqlite3"))
+        cached = RegexSearcher(result_cache=result_cache)
+        plain = RegexSearcher()
+        print(f"{'run':<16} {'no cache s':>10} {'cache s':>8} {'matches':>8}")
+        for label in ("cold", "repeat", "changed"):
+            if label == "changed":
+                rng = random.Random(1234)
+                for path in rng.sample(paths, max(1, int(len(paths) * args.changed))):
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("12:00:00 ERROR [worker-12] appended\n")
+            slow, expected = timed(plain, folder)
+            fast, count = timed(cached, folder)
+            assert count == expected
+            print(f"{label:<16} {slow:>10.3f} {fast:>8.3f} {count:>8}")
+        print(result_cache.stats())
+        result_cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Search server under concurrent load versus one CLI process per search.
+
+Usage: python benchmarks/bench_server.py [--files 100] [--clients 8]
+                                         [--requests 10] [--workers 0]
+
+Starts `python -m src.server` on a free port over a synthetic corpus, then
+runs --clients threads that each send --requests searches (rotating through
+a few patterns) and reports throughput and p50/p99 latency. The same
+patterns are then run as fresh `python -m src` processes for comparison.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_corpus  # noqa: E402
+from src.server import SearchClient, read_token  # noqa: E402
+
+PATTERNS = [r"ERROR", r"\d{2}:\d{2}:\d{2} ERROR \[worker-1\d\]",
+            r"timeout after \d+ms", r"user=\w+ .*kilo"]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def report(label, latencies, elapsed):
+    print(f"{label:<16} {len(latencies):>8} {len(latencies) / elapsed:>8.1f} "
+          f"{percentile(latencies, 0.5) * 1000:>8.1f} "
+          f"{percentile(latencies, 0.99) * 1000:>8.1f}")
+
+
+def start_server(workers, cache_path, token_path):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "src.server", "--port", "0",
+         "--workers", str(workers), "--cache", cache_path,
+         "--token-file", token_path],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line.startswith("listening on "):
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line!r}")
+    return proc, line.split()[-1], read_token(token_path)
+
+
+def run_load(address, token, folder, clients, requests):
+    latencies = []
+    lock = threading.Lock()
+
+    def client_loop(offset):
+        client = SearchClient(address, token=token)
+        for i in range(requests):
+            pattern = PATTERNS[(offset + i) % len(PATTERNS)]
+            start = time.perf_counter()
+            for _ in client.search(folder, pattern):
+                pass
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client_loop, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def run_cli(folder, searches):
+    latencies = []
+    start = time.perf_counter()
+    for i in range(searches):
+        began = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "src", PATTERNS[i % len(PATTERNS)],
+                        folder], cwd=ROOT, stdout=subprocess.DEVNULL, check=False)
+        latencies.append(time.perf_counter() - began)
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "corpus")
+        generate_corpus(folder, files=args.files, lines_per_file=args.lines)
+        proc, address, token = start_server(
+            args.workers, os.path.join(tmp, "cache.sqlite3"),
+            os.path.join(tmp, "server.token"))
+        try:
+            print(f"{'mode':<16} {'searches':>8} {'per s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+            # Warm the pool, pattern caches and text cache once
+            run_load(address, token, folder, 1, len(PATTERNS))
+            report(f"server x{args.clients}",
+                   *run_load(address, token, folder, args.clients, args.requests))
+            report("server x1", *run_load(address, token, folder, 1, args.requests))
+        finally:
+            proc.terminate()
+            proc.wait()
+        report("cli process", *run_cli(folder, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Deterministic synthetic corpus generator for benchmarks.
+
+Plain-text formats (.txt, .log, .csv) are synthesised from a seeded random
+generator. With synthesize_documents=True, .docx and .xlsx files are written
+the same way through python-docx and openpyxl (one paragraph or row per
+line, like the samples in data/); otherwise, and always for .pdf, binary
+formats are copies of the samples, so no document-writing libraries are
+needed to build a corpus.
+"""
+import os
+import random
+import shutil
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "data")
+
+DEFAULT_MIX = {".txt": 3, ".log": 3, ".csv": 2,
+               ".pdf": 1, ".docx": 1, ".xlsx": 1}
+
+WORDS = ["alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf",
+         "hotel", "india", "juliet", "kilo", "lima", "mike", "november"]
+LEVELS = ["INFO", "DEBUG", "INFO", "WARN", "INFO", "DEBUG"]
+
+
+def _log_line(rng, line_num, match_rate):
+    level = "ERROR" if rng.random() < match_rate else rng.choice(LEVELS)
+    words = " ".join(rng.choice(WORDS) for _ in range(8))
+    return (f"2024-01-{rng.randint(1, 28):02d} {rng.randint(0, 23):02d}:"
+            f"{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d} {level} "
+            f"[worker-{rng.randint(1, 32)}] request={line_num} {words}")
+
+
+def _write_text(path, rng, lines, match_rate):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(_log_line(rng, i, match_rate) + "\n")
+
+
+def _write_csv(path, rng, lines, match_rate):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("id,level,worker,message\n")
+        for i in range(lines):
+            level = "ERROR" if rng.random() < match_rate else rng.choice(LEVELS)
+            words = " ".join(rng.choice(WORDS) for _ in range(6))
+            f.write(f"{i},{level},worker-{rng.randint(1, 32)},{words}\n")
+
+
+def _write_docx(path, rng, lines, match_rate):
+    import docx
+    document = docx.Document()
+    for i in range(lines):
+        document.add_paragraph(_log_line(rng, i, match_rate))
+    document.save(path)
+
+
+def _write_xlsx(path, rng, lines, match_rate):
+    import openpyxl
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet("Data")
+    sheet.append(["id", "level", "worker", "message"])
+    for i in range(lines):
+        level = "ERROR" if rng.random() < match_rate else rng.choice(LEVELS)
+        words = " ".join(rng.choice(WORDS) for _ in range(6))
+        sheet.append([i, level, f"worker-{rng.randint(1, 32)}", words])
+    workbook.save(path)
+
+
+def can_synthesize_documents():
+    """True if python-docx and openpyxl are available to write documents."""
+    try:
+        import docx  # noqa: F401
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def generate_corpus(dest, files=200, lines_per_file=2000, mix=None,
+                    match_rate=0.001, seed=1234, synthesize_documents=False):
+    """
+    Writes `files` files into `dest` (split across a few subfolders) and
+    returns the list of created paths. Identical arguments always produce
+    an identical corpus.
+    """
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    extensions = [ext for ext, weight in sorted(mix.items())
+                  for _ in range(weight)]
+    paths = []
+    for i in range(files):
+        ext = extensions[i % len(extensions)]
+        folder = os.path.join(dest, f"part{i % 8:02d}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"file{i:06d}{ext}")
+        if ext == ".csv":
+            _write_csv(path, rng, lines_per_file, match_rate)
+        elif synthesize_documents and ext == ".docx":
+            _write_docx(path, rng, lines_per_file, match_rate)
+        elif synthesize_documents and ext == ".xlsx":
+            _write_xlsx(path, rng, lines_per_file, match_rate)
+        elif ext in (".pdf", ".docx", ".xlsx"):
+            shutil.copyfile(os.path.join(DATA_DIR, "Data" + ext), path)
+        else:
+            _write_text(path, rng, lines_per_file, match_rate)
+        paths.append(path)
+    return paths
@@ -0,0 +1,187 @@
+"""
+Benchmark suite: search and extraction throughput with stored baselines.
+
+Usage: python benchmarks/suite.py [--quick] [--repeat 3] [--filter TEXT]
+                                  [--save NAME] [--compare NAME]
+                                  [--threshold 0.15]
+
+Every case runs against a deterministic corpus (see corpus.py) and reports
+MB/s, files/s and peak Python memory (tracemalloc, measured in a separate
+run so it does not slow the timed ones). --save writes the numbers to
+benchmarks/baselines/NAME.json; --compare prints the change against a saved
+baseline and exits with status 1 if any case's MB/s dropped by more than
+--threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.corpus import can_synthesize_documents, generate_corpus  # noqa: E402
+from src.core import RegexSearcher, read_file_content, walk_files  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Corpus name -> generate_corpus arguments (sizes are for the full run)
+CORPORA = {
+    "sparse": {"files": 240, "lines_per_file": 4000, "match_rate": 0.0005},
+    "dense": {"files": 240, "lines_per_file": 4000, "match_rate": 0.2},
+}
+
+# Case name -> (corpus, pattern, flags); "extract" cases read every file
+CASES = {
+    "extract/all-formats": ("sparse", None, 0),
+    "literal/sparse": ("sparse", r"ERROR", 0),
+    "literal/dense": ("dense", r"ERROR", 0),
+    "complex/sparse": ("sparse", r"\d{2}:\d{2}:\d{2} ERROR \[worker-(?:1\d|2\d)\]", 0),
+    "complex/dense": ("dense", r"\d{2}:\d{2}:\d{2} ERROR \[worker-(?:1\d|2\d)\]", 0),
+    "alternation/sparse": ("sparse", r"(?:ERROR|WARN) \[worker-3\d\]", 0),
+    "no-literal/sparse": ("sparse", r"\d{2}:\d{2}:5\d", 0),
+    "ignorecase/sparse": ("sparse", r"error.*kilo", re.IGNORECASE),
+    "ignorecase/dense": ("dense", r"error.*kilo", re.IGNORECASE),
+    "multiline/sparse": ("sparse", r"^2024-01-0\d \d\d:00", re.MULTILINE),
+    "dotall/sparse": ("sparse", r"ERROR.*request=\d+7\b", re.DOTALL),
+}
+
+# --- Measurement ---
+
+
+def build_corpora(root, quick, synthesize):
+    folders = {}
+    for name, spec in CORPORA.items():
+        spec = dict(spec)
+        if quick:
+            spec["files"] //= 8
+            spec["lines_per_file"] //= 4
+        folder = os.path.join(root, name)
+        generate_corpus(folder, seed=1234, synthesize_documents=synthesize, **spec)
+        folders[name] = folder
+    return folders
+
+
+def run_case(folder, pattern, flags):
+    """Runs one case once; returns the number of results (or files read)."""
+    if pattern is None:
+        count = 0
+        for path in walk_files(folder):
+            read_file_content(path)
+            count += 1
+        return count
+    return sum(1 for _ in RegexSearcher().search_in_folder(folder, pattern, flags))
+
+
+def measure(folder, pattern, flags, repeat):
+    """Best-of-repeat timing, then one traced run for peak memory."""
+    paths = list(walk_files(folder))
+    size = sum(os.path.getsize(path) for path in paths)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = run_case(folder, pattern, flags)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    run_case(folder, pattern, flags)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "seconds": best,
+        "mb_per_s": size / 2 ** 20 / best,
+        "files_per_s": len(paths) / best,
+        "peak_mb": peak / 2 ** 20,
+        "results": results,
+    }
+
+# --- Baselines ---
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name, report):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_baseline(name):
+    with open(baseline_path(name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(report, baseline, threshold):
+    """Prints per-case changes; returns the names of regressed cases."""
+    if baseline["settings"] != report["settings"]:
+        print(f"warning: baseline settings differ: {baseline['settings']}")
+    regressed = []
+    print(f"\n{'case':<22} {'base MB/s':>10} {'now MB/s':>10} {'change':>8}")
+    for case, now in report["cases"].items():
+        before = baseline["cases"].get(case)
+        if before is None:
+            print(f"{case:<22} {'-':>10} {now['mb_per_s']:>10.1f}      new")
+            continue
+        change = now["mb_per_s"] / before["mb_per_s"] - 1
+        flag = ""
+        if change < -threshold:
+            regressed.append(case)
+            flag = "  REGRESSION"
+        elif now["results"] != before["results"]:
+            flag = "  results differ"
+        print(f"{case:<22} {before['mb_per_s']:>10.1f} {now['mb_per_s']:>10.1f} "
+              f"{change:>+7.0%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--quick", action="store_true",
+                        help="use a corpus 32x smaller, e.g. for CI")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default="",
+                        help="only run cases whose name contains this text")
+    parser.add_argument("--save", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    synthesize = can_synthesize_documents()
+    report = {
+        "settings": {"quick": args.quick, "synthesized_documents": synthesize},
+        "environment": {"python": platform.python_version(),
+                        "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "cases": {},
+    }
+    cases = {name: case for name, case in CASES.items() if args.filter in name}
+    with tempfile.TemporaryDirectory() as root:
+        folders = build_corpora(root, args.quick, synthesize)
+        # Warm up imports and the OS page cache before timing
+        for folder in folders.values():
+            run_case(folder, None, 0)
+        print(f"{'case':<22} {'MB/s':>8} {'files/s':>9} {'peak MB':>8} {'results':>8}")
+        for name, (corpus, pattern, flags) in cases.items():
+            stats = measure(folders[corpus], pattern, flags, args.repeat)
+            report["cases"][name] = stats
+            print(f"{name:<22} {stats['mb_per_s']:>8.1f} {stats['files_per_s']:>9.1f} "
+                  f"{stats['peak_mb']:>8.1f} {stats['results']:>8}")
+
+    if args.save:
+        save_baseline(args.save, report)
+        print(f"\nsaved baseline {baseline_path(args.save)}")
+    if args.compare:
+        regressed = compare(report, load_baseline(args.compare), args.threshold)
+        if regressed:
+            print(f"\n{len(regressed)} case(s) regressed by more than "
+                  f"{args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,38 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext, font
+import os
 import re
-from core import RegexSearcher, read_file_content, find_matches_in_text
+import queue
+import threading
+import time
+from core import (RegexSearcher, ContextReader, count_files, read_file_content,
+                  find_match_spans)
+from cache import ResultCache, TextCache
+from results import ResultStore
+from patterns import PatternRiskError, check_pattern
+from session import SearchSession
+from stats import SearchStats
+from ignore import VCS_DIRS
+
+# Folder search results are moved from the worker queue to the UI in batches
+RESULT_BATCH_SIZE = 5000
+POLL_INTERVAL_MS = 50
+
+# How often a watched folder is checked for changes
+WATCH_INTERVAL_S = 2.0
+
+# Matches are tagged in the file view a block of lines at a time, as the
+# block scrolls into view
+HIGHLIGHT_BLOCK_LINES = 200
+
+# Lines shown above and below a selected folder search result
+CONTEXT_LINES = 2
+
+# Longest a folder search may spend on one file before it is skipped
+FILE_TIMEOUT_S = 30.0
+
+# Folder searches skip binary files and version-control metadata
+FOLDER_WALK_OPTIONS = {"exclude": list(VCS_DIRS), "skip_binary": True}
 
 # root window and main application class
 class RegexSearchApp:
@@ -11,10 +42,28 @@ class RegexSearchApp:
         self.root.geometry("650x500")   # Changed from 1100x800
         self.root.minsize(650, 500)     # Adjusted minimum size
 
-        # Core searcher instance
-        self.searcher = RegexSearcher()
-        self.folder_search_results = []
-        self.file_search_matches = []
+        # Core searcher instance; repeated folder searches only re-read
+        # files that changed since the same search last ran
+        self.searcher = RegexSearcher(cache=TextCache(), result_cache=ResultCache())
+        self.result_store = ResultStore()
+        self.result_offset = 0      # View position of the first visible row
+        self.context_reader = ContextReader(self.searcher.cache)
+        self.file_search_matches = None     # MatchSpans of the last file search
+        self.file_text = ""                 # Text shown in the file tab
+        self._file_search_cancel = None
+        self._highlighted_blocks = set()
+        self._current_match = None
+
+        # Background folder search state
+        self._search_cancel = None
+        self._result_queue = None
+        self._files_scanned = 0
+        self._files_total = None
+        self._search_started = 0.0
+        self._search_diagnostics = []
+        self._search_stats = None
+        self._watch_session = None
+        self._watch_stop = None
         self.saved_queries = self.searcher.load_queries()
 
         self._setup_styles()
@@ -105,12 +154,16 @@ class RegexSearchApp:
         self.ignore_case_var = tk.BooleanVar()
         self.multiline_var = tk.BooleanVar()
         self.dotall_var = tk.BooleanVar()
+        self.whole_file_var = tk.BooleanVar()
         ttk.Checkbutton(flags_frame, text="Ignore Case",
                         variable=self.ignore_case_var).pack(side=tk.LEFT, padx=15)
         ttk.Checkbutton(flags_frame, text="Multiline",
                         variable=self.multiline_var).pack(side=tk.LEFT, padx=15)
         ttk.Checkbutton(flags_frame, text="Dot All",
                         variable=self.dotall_var).pack(side=tk.LEFT, padx=15)
+        # Folder search only; the file tab always matches the whole text
+        ttk.Checkbutton(flags_frame, text="Across Lines",
+                        variable=self.whole_file_var).pack(side=tk.LEFT, padx=15)
 
     # -------------------------------------------------------------------------
     # FILE SEARCH TAB
@@ -129,6 +182,10 @@ class RegexSearchApp:
                    command=self._browse_file).pack(side=tk.LEFT)
         ttk.Button(file_controls, text="Search in File",
                    command=self._perform_file_search).pack(side=tk.LEFT, padx=5)
+        ttk.Button(file_controls, text="< Prev",
+                   command=lambda: self._goto_match(-1)).pack(side=tk.LEFT)
+        ttk.Button(file_controls, text="Next >",
+                   command=lambda: self._goto_match(1)).pack(side=tk.LEFT, padx=(5, 0))
 
         # Text area for file content
         text_frame = ttk.Frame(file_tab)
@@ -139,6 +196,14 @@ class RegexSearchApp:
         self.file_text_area.pack(fill=tk.BOTH, expand=True)
         self.file_text_area.tag_configure(
             "match", background=self.MATCH_HIGHLIGHT, foreground="White")
+        self.file_text_area.tag_configure(
+            "current_match", background=self.ACCENT_HOVER, foreground="White",
+            underline=True)
+        self.file_text_area.tag_raise("current_match")
+        # Tag matches as they scroll into view instead of all up front
+        scrollbar_set = self.file_text_area.vbar.set
+        self.file_text_area.configure(yscrollcommand=lambda *args: (
+            scrollbar_set(*args), self._highlight_visible_matches()))
 
         # Bottom frame for match count and download button
         bottom_frame = ttk.Frame(file_tab)
@@ -166,28 +231,57 @@ class RegexSearchApp:
                    command=self._browse_folder).pack(side=tk.LEFT)
         ttk.Button(folder_controls, text="Search in Folder",
                    command=self._perform_folder_search).pack(side=tk.LEFT, padx=5)
-        
+        self.cancel_button = ttk.Button(folder_controls, text="Cancel", state="disabled",
+                                        command=self._cancel_folder_search)
+        self.cancel_button.pack(side=tk.LEFT)
+        self.watch_var = tk.BooleanVar()
+        ttk.Checkbutton(folder_controls, text="Watch", variable=self.watch_var,
+                        command=self._toggle_watch).pack(side=tk.LEFT, padx=5)
+        self.stats_var = tk.BooleanVar()
+        ttk.Checkbutton(folder_controls, text="Stats",
+                        variable=self.stats_var).pack(side=tk.LEFT)
+
+        # Progress of the running search
+        self.folder_progress_label = ttk.Label(folder_tab, text="")
+        self.folder_progress_label.pack(fill=tk.X)
+
         # Results Treeview
         results_frame = ttk.Labelframe(
             folder_tab, text="Search Results", height=5)
         results_frame.pack(fill=tk.BOTH, expand=False, pady=0)
 
-        # Treeview for results
+        # Filter box: matches file names or matched text
+        filter_frame = ttk.Frame(results_frame)
+        filter_frame.pack(fill=tk.X)
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT)
+        self.result_filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(filter_frame, textvariable=self.result_filter_var,
+                                 font=self.default_font)
+        filter_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        filter_entry.bind("<Return>", lambda event: self._apply_result_view())
+
+        # Treeview for results: only the visible window of rows is inserted,
+        # the rest stays in the ResultStore
         columns = ("file", "line", "match")
         self.results_tree = ttk.Treeview(
             results_frame, columns=columns, show="headings", height=5)
-        self.results_tree.heading("file", text="File Name")
-        self.results_tree.heading("line", text="Line No.")
-        self.results_tree.heading("match", text="Matched Text")
+        self.results_tree.heading("file", text="File Name",
+                                  command=lambda: self._sort_results("file"))
+        self.results_tree.heading("line", text="Line No.",
+                                  command=lambda: self._sort_results("line"))
+        self.results_tree.heading("match", text="Matched Text",
+                                  command=lambda: self._sort_results("match"))
         self.results_tree.column("line", width=80, anchor=tk.CENTER)
 
-        # Vertical scrollbar
-        vsb = ttk.Scrollbar(results_frame, orient="vertical",
-                            command=self.results_tree.yview)
-        vsb.pack(side=tk.RIGHT, fill=tk.Y)
-        self.results_tree.configure(yscrollcommand=vsb.set)
+        # Vertical scrollbar drives the window offset, not the Treeview
+        self.results_vsb = ttk.Scrollbar(results_frame, orient="vertical",
+                                         command=self._on_results_scroll)
+        self.results_vsb.pack(side=tk.RIGHT, fill=tk.Y)
         self.results_tree.pack(fill=tk.BOTH, expand=True)
         self.results_tree.bind("<<TreeviewSelect>>", self._on_result_select)
+        self.results_tree.bind("<MouseWheel>", self._on_results_wheel)
+        self.results_tree.bind("<Button-4>", lambda event: self._scroll_results(-1))
+        self.results_tree.bind("<Button-5>", lambda event: self._scroll_results(1))
 
         # Context preview
         context_frame = ttk.Labelframe(folder_tab, text="Context Preview")
@@ -220,8 +314,10 @@ class RegexSearchApp:
     def _browse_file(self):
         filetypes = [
             ("All Supported Files",
-             "*.txt *.py *.log *.md *.csv *.json *.pdf *.docx *.xlsx"),
+             "*.txt *.py *.log *.md *.csv *.json *.pdf *.docx *.xlsx "
+             "*.gz *.bz2 *.xz *.zip *.tar *.tgz"),
             ("Text Files", "*.txt *.py *.log *.md"),
+            ("Compressed Files and Archives", "*.gz *.bz2 *.xz *.zip *.tar *.tgz"),
             ("PDF Files", "*.pdf"),
             ("Word Documents", "*.docx"),
             ("Excel Spreadsheets", "*.xlsx"),
@@ -231,9 +327,11 @@ class RegexSearchApp:
         path = filedialog.askopenfilename(filetypes=filetypes)
         if path:
             self.file_path_var.set(path)
-            content = read_file_content(path)
+            self._clear_file_matches()
+            self.file_text = read_file_content(path, self.searcher.cache)
             self.file_text_area.delete("1.0", tk.END)
-            self.file_text_area.insert("1.0", content)
+            self.file_text_area.insert("1.0", self.file_text)
+            self.file_text_area.edit_modified(False)
 
     # Browse folder dialog
     def _browse_folder(self):
@@ -244,34 +342,107 @@ class RegexSearchApp:
     # Perform file search
     def _perform_file_search(self):
         pattern = self.pattern_var.get()
-        content = self.file_text_area.get("1.0", tk.END)
         if not pattern:
             messagebox.showwarning(
                 "Input Required", "Please enter a regex pattern.")
             return
-
-        self.file_text_area.tag_remove("match", "1.0", tk.END)
-
-        # Find matches
+        flags = self._get_regex_flags()
         try:
-            flags = self._get_regex_flags()
-            self.file_search_matches = find_matches_in_text(
-                content, pattern, flags)
-            self.file_match_label.config(
-                text=f"Matches Found: {len(self.file_search_matches)}")
-            if not self.file_search_matches:
-                messagebox.showinfo("Search Complete", "No matches found.")
-                return
-
-            # Highlight matches in the text area
-            for match in self.file_search_matches:
-                start_index = f"1.0 + {match.start()} chars"
-                end_index = f"1.0 + {match.end()} chars"
-                self.file_text_area.tag_add("match", start_index, end_index)
+            re.compile(pattern, flags)
         except re.error as e:
             messagebox.showerror(
                 "Invalid Regex", f"The regex pattern is invalid.\n\nDetails: {e}")
-            
+            return
+        # The search reads the text kept outside the widget unless it was edited
+        if self.file_text_area.edit_modified():
+            self.file_text = self.file_text_area.get("1.0", "end-1c")
+            self.file_text_area.edit_modified(False)
+
+        self._clear_file_matches()
+        self.file_match_label.config(text="Searching...")
+        cancel = self._file_search_cancel = threading.Event()
+        results = queue.Queue()
+        threading.Thread(target=self._file_search_worker, daemon=True,
+                         args=(self.file_text, pattern, flags, cancel,
+                               results)).start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_file_search, cancel, results)
+
+    # Runs on a worker thread: match offsets and the line table
+    def _file_search_worker(self, text, pattern, flags, cancel, results):
+        try:
+            results.put(("done", find_match_spans(text, pattern, flags, cancel)))
+        except Exception as e:
+            results.put(("error", e))
+
+    def _poll_file_search(self, cancel, results):
+        if cancel is not self._file_search_cancel:
+            return  # A newer search or file has replaced this one
+        try:
+            kind, value = results.get_nowait()
+        except queue.Empty:
+            self.root.after(POLL_INTERVAL_MS, self._poll_file_search, cancel, results)
+            return
+        self._file_search_cancel = None
+        if kind == "error":
+            self.file_match_label.config(text="Matches Found: 0")
+            messagebox.showerror(
+                "Search Failed", f"The file search failed.\n\nDetails: {value}")
+            return
+        self.file_search_matches = value
+        self.file_match_label.config(text=f"Matches Found: {len(value)}")
+        if not value:
+            messagebox.showinfo("Search Complete", "No matches found.")
+            return
+        self._goto_match(1)
+
+    def _clear_file_matches(self):
+        if self._file_search_cancel is not None:
+            self._file_search_cancel.set()
+            self._file_search_cancel = None
+        self.file_search_matches = None
+        self._highlighted_blocks.clear()
+        self._current_match = None
+        self.file_text_area.tag_remove("match", "1.0", tk.END)
+        self.file_text_area.tag_remove("current_match", "1.0", tk.END)
+        self.file_match_label.config(text="Matches Found: 0")
+
+    # Tag the matches in blocks of lines that are on screen and not yet tagged
+    def _highlight_visible_matches(self):
+        spans = self.file_search_matches
+        if not spans:
+            return
+        text_area = self.file_text_area
+        top = int(text_area.index("@0,0").split(".")[0])
+        bottom = int(text_area.index(f"@0,{text_area.winfo_height()}").split(".")[0])
+        for block in range((top - 1) // HIGHLIGHT_BLOCK_LINES,
+                           (bottom - 1) // HIGHLIGHT_BLOCK_LINES + 1):
+            if block in self._highlighted_blocks:
+                continue
+            self._highlighted_blocks.add(block)
+            first_line = block * HIGHLIGHT_BLOCK_LINES + 1
+            numbers = spans.on_lines(first_line, first_line + HIGHLIGHT_BLOCK_LINES)
+            indices = [index for pair in spans.indices(numbers) for index in pair]
+            if indices:
+                text_area.tag_add("match", *indices)
+
+    # Move to the next (step=1) or previous (step=-1) match, wrapping around
+    def _goto_match(self, step):
+        spans = self.file_search_matches
+        if not spans:
+            return
+        if self._current_match is None:
+            number = 0 if step > 0 else len(spans) - 1
+        else:
+            number = (self._current_match + step) % len(spans)
+        self._current_match = number
+        start, end = next(spans.indices([number]))
+        self.file_text_area.tag_remove("current_match", "1.0", tk.END)
+        self.file_text_area.tag_add("current_match", start, end)
+        self.file_text_area.see(start)
+        self.file_match_label.config(
+            text=f"Matches Found: {len(spans)} (showing {number + 1})")
+        self._highlight_visible_matches()
+
     # Download matches to a text file
     def _download_file_matches(self):
         if not self.file_search_matches:
@@ -293,8 +464,10 @@ class RegexSearchApp:
                 with open(file_path, "w", encoding="utf-8") as f:
                     f.write(
                         f"--- Found {len(self.file_search_matches)} matches ---\n\n")
-                    for match in self.file_search_matches:
-                        f.write(match.group(0) + "\n")
+                    text = self.file_text
+                    f.writelines(text[start:end] + "\n" for start, end in zip(
+                        self.file_search_matches.starts,
+                        self.file_search_matches.ends))
                 messagebox.showinfo("Download Complete",
                                     f"Matches saved to:\n{file_path}")
             except Exception as e:
@@ -310,58 +483,298 @@ class RegexSearchApp:
                 "Input Required", "Please select a folder and enter a regex pattern.")
             return
 
-        self._clear_folder_results()
-
-    # Find matches
+        # Validate the pattern before starting the worker, warning about ones
+        # that could backtrack for minutes on a single long line
         try:
             flags = self._get_regex_flags()
-            self.folder_search_results = list(
-                self.searcher.search_in_folder(folder, pattern, flags))
-
-            # Populate the treeview with results
-            if not self.folder_search_results:
-                messagebox.showinfo("Search Complete", "No matches found.")
+            check_pattern(pattern, flags)
+        except PatternRiskError as e:
+            if not messagebox.askyesno(
+                    "Risky Regex", "The regex pattern could take extremely long to run."
+                    f"\n\nDetails: {e}\n\nSearch anyway?", icon=messagebox.WARNING):
                 return
-            
-            # Populate the treeview with results
-            for i, res in enumerate(self.folder_search_results):
-                self.results_tree.insert("", tk.END, iid=i,
-                                         values=(res.file_name, res.line_number, res.match_group))
+        except re.error as e:
+            messagebox.showerror(
+                "Invalid Regex", f"The regex pattern is invalid.\n\nDetails: {e}")
+            return
 
-        # Select the first result by default
+        self._cancel_folder_search()
+        self._clear_folder_results()
+        self._files_scanned = 0
+        self._files_total = None
+        self._search_started = time.perf_counter()
+        self._search_diagnostics = []
+        # Stage timings are only collected when asked for
+        self._search_stats = SearchStats() if self.stats_var.get() else None
+        self._search_cancel = threading.Event()
+        self._result_queue = queue.Queue()
+        self.cancel_button.config(state="normal")
+
+        # Search and count files on background threads
+        threading.Thread(target=self._folder_search_worker, daemon=True,
+                         args=(folder, pattern, flags, self.whole_file_var.get(),
+                               self._search_cancel, self._result_queue)).start()
+        threading.Thread(target=self._count_folder_files, daemon=True,
+                         args=(folder, self._result_queue)).start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_folder_search,
+                        self._result_queue)
+
+    # Runs on a worker thread: stream results into the queue
+    def _folder_search_worker(self, folder, pattern, flags, whole_file, cancel,
+                              results):
+        def on_file(_path):
+            self._files_scanned += 1
+        diagnostics = []
+        try:
+            # Matching runs in a killable process so one runaway file
+            # cannot hang the search
+            for res in self.searcher.search_in_folder(
+                    folder, pattern, flags, cancel=cancel, progress=on_file,
+                    timeout=FILE_TIMEOUT_S, diagnostics=diagnostics,
+                    stats=self._search_stats, whole_file=whole_file,
+                    **FOLDER_WALK_OPTIONS):
+                if cancel.is_set():
+                    break
+                results.put(("result", res))
+        except Exception as e:
+            results.put(("error", e))
+        results.put(("diagnostics", diagnostics))
+        results.put(("done", cancel.is_set()))
+
+    # Runs on a worker thread: total file count for the progress display
+    def _count_folder_files(self, folder, results):
+        results.put(("total", count_files(folder, **FOLDER_WALK_OPTIONS)))
+
+    # Move queued results into the Treeview in batches on the Tk thread
+    def _poll_folder_search(self, results):
+        if results is not self._result_queue:
+            return  # A newer search has replaced this one
+        finished = None
+        batch = []
+        try:
+            while len(batch) < RESULT_BATCH_SIZE:
+                kind, value = results.get_nowait()
+                if kind == "result":
+                    batch.append(value)
+                elif kind == "total":
+                    self._files_total = value
+                elif kind == "diagnostics":
+                    self._search_diagnostics = value
+                elif kind == "error":
+                    messagebox.showerror(
+                        "Search Failed", f"The folder search failed.\n\nDetails: {value}")
+                else:
+                    finished = value
+                    break
+        except queue.Empty:
+            pass
+
+        if batch:
+            self.result_store.add_many(batch)
+            self._render_results()
+        self._update_folder_progress(finished)
+
+        if finished is None:
+            self.root.after(POLL_INTERVAL_MS, self._poll_folder_search, results)
+            return
+        self.cancel_button.config(state="disabled")
+        self._result_queue = None
+        self.result_store.refresh_view()
+        self._render_results()
+        if self._search_diagnostics:
+            self._show_search_diagnostics(self._search_diagnostics)
+        elif not finished and not self.result_store.total():
+            messagebox.showinfo("Search Complete", "No matches found.")
+
+    # List the files a search had to skip
+    def _show_search_diagnostics(self, diagnostics, limit=10):
+        lines = [f"{os.path.basename(d.file_path or '')} ({d.kind}): {d.message}"
+                 for d in diagnostics[:limit]]
+        if len(diagnostics) > limit:
+            lines.append(f"... and {len(diagnostics) - limit} more")
+        messagebox.showwarning(
+            "Search Incomplete",
+            f"{len(diagnostics)} file(s) could not be fully searched:\n\n"
+            + "\n".join(lines))
+
+    def _update_folder_progress(self, finished=None):
+        elapsed = max(time.perf_counter() - self._search_started, 1e-6)
+        total = "?" if self._files_total is None else self._files_total
+        if finished is False:
+            total = self._files_scanned  # Every file was visited
+        status = "Searching"
+        if finished is not None:
+            status = "Cancelled" if finished else "Done"
+        skipped = ""
+        if self._search_diagnostics:
+            skipped = f", {len(self._search_diagnostics)} skipped"
+        text = (f"{status}: {self._files_scanned} / {total} files scanned, "
+                f"{self.result_store.total()} matches{skipped}, "
+                f"{self._files_scanned / elapsed:.0f} files/s")
+        if finished is not None and self._search_stats is not None:
+            text += f" | {self._search_stats.summary()}"
+        self.folder_progress_label.config(text=text)
+
+    # -------------------------------------------------------------------------
+    # LIVE FOLDER WATCHING
+    # -------------------------------------------------------------------------
+    def _toggle_watch(self):
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+            self._watch_session = None
+        if not self.watch_var.get():
+            return
+        folder = self.folder_path_var.get()
+        pattern = self.pattern_var.get()
+        try:
+            flags = self._get_regex_flags()
+            re.compile(pattern, flags)
         except re.error as e:
+            pattern = ""
             messagebox.showerror(
                 "Invalid Regex", f"The regex pattern is invalid.\n\nDetails: {e}")
-            
+        if not folder or not pattern:
+            self.watch_var.set(False)
+            return
+
+        # Only changed files are re-searched on each poll
+        self._cancel_folder_search()
+        self._watch_session = SearchSession(folder, pattern, flags, self.searcher)
+        self._watch_stop = threading.Event()
+        updates = queue.Queue()
+        threading.Thread(target=self._watch_worker, daemon=True,
+                         args=(self._watch_session, updates, self._watch_stop)).start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_watch,
+                        self._watch_session, updates)
+
+    # Runs on a worker thread: initial scan, then polling
+    def _watch_worker(self, session, updates, stop):
+        updates.put(session.refresh())
+        session.watch(updates.put, interval=WATCH_INTERVAL_S, stop_event=stop)
+
+    def _poll_watch(self, session, updates):
+        if session is not self._watch_session:
+            return  # Watching was stopped or restarted
+        added = removed = 0
+        changed = False
+        while not updates.empty():
+            diff = updates.get_nowait()
+            added += len(diff.added)
+            removed += len(diff.removed)
+            changed = True
+        if changed:
+            self._clear_folder_results()
+            self.result_store.add_many(session.results())
+            self._render_results()
+            self.folder_progress_label.config(
+                text=f"Watching: {self.result_store.total()} matches "
+                     f"(+{added} / -{removed} since last update)")
+        self.root.after(500, self._poll_watch, session, updates)
+
+    # Stop a running folder search
+    def _cancel_folder_search(self):
+        if self._search_cancel is not None:
+            self._search_cancel.set()
+
         # Select the first result by default
     def _on_result_select(self, event):
         selected_items = self.results_tree.selection()
         if not selected_items:
             return
 
-        # Get the selected result
-        selected_iid = int(selected_items[0])
-        result = self.folder_search_results[selected_iid]
+        # Get the selected result (iids are positions in the store's view)
+        result = self.result_store.get(int(selected_items[0]))
+        if result is None:
+            return
 
-        # Display context with highlighted match
+        # Display the surrounding lines, read from the file on demand
+        first_line, lines = self.context_reader.context(
+            result, CONTEXT_LINES, CONTEXT_LINES)
         self.context_text.config(state="normal")
         self.context_text.delete("1.0", tk.END)
-        self.context_text.insert("1.0", result.line_content)
+        self.context_text.insert("1.0", "\n".join(lines))
 
-        # Highlight the match
+        # Highlight the match itself, located by its column
+        end = result.end_location()
         try:
-            start_index = result.line_content.find(result.match_group)
-            if start_index != -1:
-                end_index = start_index + len(result.match_group)
+            if end is not None and first_line <= result.line_number:
+                row = result.line_number - first_line + 1
                 self.context_text.tag_add(
-                    "match", f"1.{start_index}", f"1.{end_index}")
+                    "match", f"{row}.{result.column}",
+                    f"{end[0] - first_line + 1}.{end[1]}")
+                self.context_text.see(f"{row}.{result.column}")
         except tk.TclError:
             pass
         self.context_text.config(state="disabled")
 
+    # -------------------------------------------------------------------------
+    # VIRTUAL RESULTS VIEW
+    # -------------------------------------------------------------------------
+    def _visible_rows(self):
+        return int(self.results_tree.cget("height"))
+
+    # Show the rows of the store's view starting at result_offset
+    def _render_results(self):
+        total = len(self.result_store)
+        rows = self._visible_rows()
+        self.result_offset = max(0, min(self.result_offset, total - rows))
+        selected = self.results_tree.selection()
+        self.results_tree.delete(*self.results_tree.get_children())
+        for i, res in enumerate(self.result_store.fetch(self.result_offset, rows),
+                                self.result_offset):
+            self.results_tree.insert("", tk.END, iid=i,
+                                     values=(self._result_label(res), res.line_number, res.match_group))
+        for iid in selected:
+            if self.results_tree.exists(iid):
+                self.results_tree.selection_set(iid)
+        if total:
+            self.results_vsb.set(self.result_offset / total,
+                                 min(1.0, (self.result_offset + rows) / total))
+        else:
+            self.results_vsb.set(0.0, 1.0)
+
+    # File column text, with the PDF page or sheet number when known
+    def _result_label(self, res):
+        if res.section is None:
+            return res.file_name
+        kind = "sheet" if res.file_name.lower().endswith(".xlsx") else "page"
+        return f"{res.file_name} ({kind} {res.section})"
+
+    def _scroll_results(self, delta):
+        self.result_offset += delta
+        self._render_results()
+
+    # Scrollbar callback: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+    def _on_results_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.result_offset = int(float(amount) * len(self.result_store))
+            self._render_results()
+        elif action == "scroll":
+            step = self._visible_rows() if unit == "pages" else 1
+            self._scroll_results(int(amount) * step)
+
+    def _on_results_wheel(self, event):
+        self._scroll_results(-1 if event.delta > 0 else 1)
+
+    # Sort by a column; clicking the same column again reverses the order
+    def _sort_results(self, column):
+        store = self.result_store
+        descending = store.sort_column == column and not store.descending
+        store.set_view(column, descending, self.result_filter_var.get())
+        self.result_offset = 0
+        self._render_results()
+
+    def _apply_result_view(self):
+        store = self.result_store
+        store.set_view(store.sort_column, store.descending,
+                       self.result_filter_var.get())
+        self.result_offset = 0
+        self._render_results()
+
     # Export results to CSV
     def _export_results(self):
-        if not self.folder_search_results:
+        if not self.result_store.total():
             messagebox.showwarning(
                 "No Results", "There are no search results to export.")
             return
@@ -369,15 +782,26 @@ class RegexSearchApp:
             # Save dialog
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"),
+                       ("JSON Lines", "*.jsonl"),
+                       ("Parquet", "*.parquet"),
+                       ("Compressed", "*.gz *.zst"),
+                       ("All files", "*.*")],
             title="Save Results As...",
             initialfile="MatchReport.csv",
         )
         if file_path:
-            self.searcher.export_results_to_csv(
-                self.folder_search_results, file_path)
+            # Rows are streamed from the result store, not loaded up front
+            try:
+                count = self.searcher.export_results(
+                    self.result_store.iter_results(), file_path,
+                    context=CONTEXT_LINES)
+            except (OSError, RuntimeError, ValueError) as e:
+                messagebox.showerror(
+                    "Export Failed", f"Could not export the results.\n\nError: {e}")
+                return
             messagebox.showinfo("Export Successful",
-                                f"Results saved to:\n{file_path}")
+                                f"{count} results saved to:\n{file_path}")
             
         # Perform any additional actions after export
     def _save_query(self):
@@ -391,6 +815,9 @@ class RegexSearchApp:
 
     # Clear folder results
     def _clear_folder_results(self):
+        self.result_store.clear()
+        self.result_filter_var.set("")
+        self.result_offset = 0
         self.results_tree.delete(*self.results_tree.get_children())
         self.context_text.config(state="normal")
         self.context_text.delete("1.0", tk.END)
@@ -0,0 +1,241 @@
+"""
+Compressed files and archives. Files compressed with gzip, bzip2 or xz are
+decompressed as a stream, never to a temporary file, and the members of
+.zip and .tar archives (plain or compressed) are searched as virtual files
+named "<archive>!/<member>". prefetch() runs decompression in a background
+thread; zlib, bz2 and lzma release the GIL while they work, so the next
+block is decompressed while the current one is matched.
+"""
+import io
+import queue
+import importlib
+import threading
+
+# Extension -> module whose open() reads that compression format
+COMPRESSED_MODULES = {".gz": "gzip", ".bz2": "bz2", ".xz": "lzma"}
+
+# Archive name suffix -> archive kind; longer suffixes are checked first
+ARCHIVE_SUFFIXES = {
+    ".tar.gz": "tar", ".tar.bz2": "tar", ".tar.xz": "tar",
+    ".tgz": "tar", ".tbz2": "tar", ".txz": "tar", ".tar": "tar",
+    ".zip": "zip",
+}
+
+# Separates an archive's path from a member's name in virtual paths
+ARCHIVE_SEPARATOR = "!/"
+
+# Blocks decompressed ahead of the consumer by prefetch()
+PREFETCH_DEPTH = 4
+
+# --- Paths ---
+
+
+def archive_kind(file_path):
+    """Returns "zip" or "tar" for archive file names, otherwise None."""
+    name = file_path.lower()
+    for suffix, kind in ARCHIVE_SUFFIXES.items():
+        if name.endswith(suffix):
+            return kind
+    return None
+
+
+def member_path(archive_path, member):
+    """Returns the virtual path of an archive member."""
+    return archive_path + ARCHIVE_SEPARATOR + member
+
+
+def split_archive_path(file_path):
+    """
+    Splits a virtual path into (archive path, member name), or returns
+    (file_path, None) for a path that does not point into an archive.
+    """
+    start = file_path.find(ARCHIVE_SEPARATOR)
+    while start != -1:
+        if archive_kind(file_path[:start]):
+            return file_path[:start], file_path[start + len(ARCHIVE_SEPARATOR):]
+        start = file_path.find(ARCHIVE_SEPARATOR, start + 1)
+    return file_path, None
+
+# --- Streams ---
+
+
+def open_compressed(file, ext):
+    """Opens a path or binary file object compressed in the `ext` format."""
+    return importlib.import_module(COMPRESSED_MODULES[ext]).open(file, "rb")
+
+
+def iter_text_blocks(binary_file, block_size):
+    """
+    Decodes a binary stream as UTF-8 text in blocks of `block_size`
+    characters, with the same newline handling as open() in text mode.
+    """
+    with io.TextIOWrapper(binary_file, encoding="utf-8", errors="ignore") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+def iter_line_blocks(binary_file, block_size):
+    """
+    Yields a binary stream in blocks of about `block_size` bytes, each cut
+    just after a newline (the last block ends wherever the stream does).
+    """
+    pending = b""
+    with binary_file:
+        while True:
+            block = binary_file.read(block_size)
+            if not block:
+                break
+            block = pending + block
+            cut = block.rfind(b"\n") + 1
+            if cut:
+                pending = block[cut:]
+                yield block[:cut]
+            else:
+                pending = block
+    if pending:
+        yield pending
+
+
+def iter_members(archive_path):
+    """
+    Yields (name, size, binary file) for each regular file in an archive,
+    in archive order. A member's file object is only valid until the next
+    member is requested. Tar archives are read as a single forward stream,
+    so compressed tars are decompressed once however many members they hold.
+    """
+    if archive_kind(archive_path) == "zip":
+        import zipfile
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                with archive.open(info) as member:
+                    yield info.filename, info.file_size, member
+        return
+    import tarfile
+    with tarfile.open(archive_path, "r|*") as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            # Stream-mode members cannot seek, which TextIOWrapper checks for
+            yield info.name, info.size, _MemberReader(archive.extractfile(info))
+
+
+def open_member(archive_path, member):
+    """
+    Returns a binary file object for one archive member, which must be
+    closed by the caller. Raises KeyError if the archive has no such member.
+    """
+    if archive_kind(archive_path) == "zip":
+        import zipfile
+        archive = zipfile.ZipFile(archive_path)
+        try:
+            return _MemberReader(archive.open(member), archive)
+        except BaseException:
+            archive.close()
+            raise
+    import tarfile
+    archive = tarfile.open(archive_path, "r:*")
+    try:
+        stream = archive.extractfile(member)
+        if stream is None:
+            raise KeyError(f"{member!r} is not a regular file")
+        return _MemberReader(stream, archive)
+    except BaseException:
+        archive.close()
+        raise
+
+
+class _MemberReader(io.BufferedIOBase):
+    """
+    A read-only, non-seekable view of a member's file object that also
+    closes its archive, if given, when closed.
+    """
+
+    def __init__(self, stream, archive=None):
+        super().__init__()
+        self._stream = stream
+        self._archive = archive
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def read1(self, size=-1):
+        return self._stream.read(size)
+
+    def close(self):
+        if not self.closed:
+            try:
+                self._stream.close()
+            finally:
+                if self._archive is not None:
+                    self._archive.close()
+        super().close()
+
+# --- Producer/Consumer Pipeline ---
+
+
+def prefetch(iterable, depth=PREFETCH_DEPTH):
+    """
+    Yields the items of an iterable while a background thread produces up
+    to `depth` items ahead. Errors raised by the iterable are re-raised in
+    the consumer. Closing the generator stops the producer and closes the
+    iterable from its thread.
+    """
+    items = queue.Queue(depth)
+    stop = threading.Event()
+    thread = threading.Thread(target=_produce, args=(iterable, items, stop),
+                              daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, done, error = items.get()
+            if error is not None:
+                raise error
+            if done:
+                return
+            yield item
+    finally:
+        stop.set()
+        # Free a slot so a producer blocked on a full queue sees the stop
+        while True:
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                break
+        thread.join()
+
+
+def _produce(iterable, items, stop):
+    """Producer thread of prefetch(): queues (item, done, error) triples."""
+    try:
+        for item in iterable:
+            if not _put(items, (item, False, None), stop):
+                return
+        _put(items, (None, True, None), stop)
+    except BaseException as e:
+        _put(items, (None, True, e), stop)
+    finally:
+        close = getattr(iterable, "close", None)
+        if close is not None:
+            close()
+
+
+def _put(items, entry, stop):
+    """Queues an entry unless the consumer stops first; returns False then."""
+    while not stop.is_set():
+        try:
+            items.put(entry, timeout=0.05)
+            return True
+        except queue.Full:
+            continue
+    return False
@@ -0,0 +1,296 @@
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import time
+import threading
+
+# --- Persistent Extracted-Text Cache ---
+
+
+class TextCache:
+    """
+    SQLite-backed store of text extracted from documents.
+
+    Entries are keyed by absolute path and validated against the file's
+    mtime, size and the extractor version, so a changed file or a newer
+    extractor simply misses. The store is capped at `max_bytes` of text and
+    evicts least-recently-used entries first.
+    """
+
+    def __init__(self, db_path="text_cache.sqlite3", max_bytes=512 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._conn = None
+        # One connection is shared by the GUI's search and watch threads
+        self._lock = threading.RLock()
+
+    # Open the database lazily so instances can be sent to worker processes
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=30,
+                                         check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS texts ("
+                " path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,"
+                " version INTEGER, text TEXT, nbytes INTEGER,"
+                " last_access REAL)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS texts_lru ON texts(last_access)")
+        return self._conn
+
+    def __getstate__(self):
+        # Worker copies start with fresh counters so they can be summed back
+        state = self.__dict__.copy()
+        state.update(_conn=None, hits=0, misses=0, bytes_saved=0)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    # Look up cached text, returning None when missing or stale
+    def get(self, file_path, version):
+        path = os.path.abspath(file_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT mtime_ns, size, version, text FROM texts WHERE path = ?",
+                (path,)).fetchone()
+            if row is None or row[:3] != (st.st_mtime_ns, st.st_size, version):
+                self.misses += 1
+                return None
+            with conn:
+                conn.execute("UPDATE texts SET last_access = ? WHERE path = ?",
+                             (time.time(), path))
+            self.hits += 1
+            self.bytes_saved += st.st_size
+        return row[3]
+
+    # Store extracted text, then evict old entries beyond the size cap
+    def put(self, file_path, version, text):
+        path = os.path.abspath(file_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        nbytes = len(text.encode("utf-8"))
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO texts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (path, st.st_mtime_ns, st.st_size, version, text, nbytes,
+                     time.time()))
+                self._evict(conn)
+
+    def _evict(self, conn):
+        total = conn.execute(
+            "SELECT COALESCE(SUM(nbytes), 0) FROM texts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT path, nbytes FROM texts ORDER BY last_access").fetchall()
+        for path, nbytes in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM texts WHERE path = ?", (path,))
+            total -= nbytes
+
+    # Report hit rate and bytes of source documents that were not re-parsed
+    def stats(self):
+        with self._lock:
+            entries, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM texts").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes_saved": self.bytes_saved,
+            "entries": entries,
+            "stored_bytes": total,
+        }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM texts")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+# --- Persistent Search-Result Cache ---
+
+
+class ResultCache:
+    """
+    SQLite-backed memo of folder search results.
+
+    Results are stored per file under a key made from the queries and the
+    options that change them, and are valid while the file's mtime and size
+    are unchanged. Each (key, folder) pair also records a fingerprint of
+    every file the last complete search saw. The store is capped at
+    `max_bytes` of compressed results and evicts least-recently-used
+    entries first. Rows are opaque JSON lists; RegexSearcher decides what
+    goes in them.
+    """
+
+    def __init__(self, db_path="result_cache.sqlite3", max_bytes=256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0             # Files served from the cache
+        self.misses = 0           # Files that had to be searched
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=30,
+                                         check_same_thread=False)
+            self._conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT, path TEXT, mtime_ns INTEGER, size INTEGER,"
+                " payload BLOB, nbytes INTEGER, last_access REAL,"
+                " PRIMARY KEY (key, path));"
+                "CREATE INDEX IF NOT EXISTS results_lru ON results(last_access);"
+                "CREATE TABLE IF NOT EXISTS searches ("
+                " key TEXT, folder TEXT, fingerprint TEXT,"
+                " PRIMARY KEY (key, folder));")
+        return self._conn
+
+    def owns(self, file_path):
+        """True for the cache's own database files, which are never searched."""
+        return os.path.abspath(file_path).startswith(os.path.abspath(self.db_path))
+
+    @staticmethod
+    def query_key(*parts):
+        """Returns the key for a search from JSON-serialisable parts."""
+        text = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    @staticmethod
+    def fingerprint(files):
+        """Fingerprints a list of (path, mtime_ns, size) entries."""
+        digest = hashlib.blake2b(digest_size=16)
+        for path, mtime_ns, size in files:
+            entry = f"{path}\0{mtime_ns}\0{size}\n"
+            digest.update(entry.encode("utf-8", "surrogateescape"))
+        return digest.hexdigest()
+
+    # Fetch the cached rows of a batch of files that are still valid
+    def lookup(self, key, files):
+        """
+        Takes (path, mtime_ns, size) entries for some of the files a search
+        visits and returns a dict of path -> rows for those whose results
+        are cached and still valid. Only those files' payloads are loaded.
+        """
+        paths = {os.path.abspath(path): (path, mtime_ns, size)
+                 for path, mtime_ns, size in files}
+        if not paths:
+            return {}
+        conn = self._connection()
+        placeholders = ",".join("?" * len(paths))
+        cached = {}
+        for abs_path, mtime_ns, size, payload in conn.execute(
+                "SELECT path, mtime_ns, size, payload FROM results"
+                f" WHERE key = ? AND path IN ({placeholders})",
+                (key, *paths)):
+            path, walked_mtime_ns, walked_size = paths[abs_path]
+            if (mtime_ns, size) == (walked_mtime_ns, walked_size):
+                cached[path] = json.loads(zlib.decompress(payload))
+        if cached:
+            now = time.time()
+            with conn:
+                conn.executemany(
+                    "UPDATE results SET last_access = ? WHERE key = ? AND path = ?",
+                    [(now, key, os.path.abspath(path)) for path in cached])
+        self.hits += len(cached)
+        self.misses += len(paths) - len(cached)
+        return cached
+
+    # Store the rows of freshly searched files
+    def store(self, key, entries):
+        """Stores (path, mtime_ns, size, rows) entries, then evicts old ones."""
+        now = time.time()
+        records = []
+        for path, mtime_ns, size, rows in entries:
+            payload = zlib.compress(json.dumps(rows, ensure_ascii=False).encode("utf-8"))
+            if len(payload) > self.max_bytes:
+                continue
+            records.append((key, os.path.abspath(path), mtime_ns, size,
+                            payload, len(payload), now))
+        if not records:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                records)
+            self._evict(conn)
+
+    def finish(self, key, folder, fingerprint):
+        """Records that a search of `folder` completed with this fingerprint."""
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?)",
+                         (key, os.path.abspath(folder), fingerprint))
+
+    def _evict(self, conn):
+        total = conn.execute(
+            "SELECT COALESCE(SUM(nbytes), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT key, path, nbytes FROM results ORDER BY last_access").fetchall()
+        evicted = set()
+        for key, path, nbytes in rows:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ? AND path = ?",
+                         (key, path))
+            evicted.add(key)
+            total -= nbytes
+        # Fingerprints no longer vouch for searches that lost files
+        conn.executemany("DELETE FROM searches WHERE key = ?",
+                         [(key,) for key in evicted])
+
+    def stats(self):
+        conn = self._connection()
+        entries, total = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM results").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "stored_bytes": total,
+        }
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM results")
+            conn.execute("DELETE FROM searches")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
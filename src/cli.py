@@ -0,0 +1,261 @@
+"""
+Headless command-line search: python -m src PATTERN [FOLDER] [options]
+
+Results are written to stdout as they are found, so memory use stays flat
+no matter how many matches a folder produces. Exit status follows grep:
+0 if anything matched, 1 if nothing did, 2 on errors (including files that
+could not be read or ran past --timeout, which are listed on stderr).
+Like ripgrep, files matched by .gitignore/.ignore files, version-control
+folders and binary files are skipped unless --no-ignore/--binary is given.
+"""
+import re
+import os
+import csv
+import sys
+import json
+import argparse
+
+import contextlib
+
+try:
+    from .core import RegexSearcher
+    from .ignore import DEFAULT_IGNORE_FILES
+    from .patterns import PatternRiskError, analyze_pattern, check_pattern
+    from .stats import SearchStats, profile_to
+except ImportError:                             # Running as a script from src/
+    from core import RegexSearcher
+    from ignore import DEFAULT_IGNORE_FILES
+    from patterns import PatternRiskError, analyze_pattern, check_pattern
+    from stats import SearchStats, profile_to
+
+FORMATS = ("grep", "jsonl", "csv")
+
+# Suffixes accepted by --max-filesize
+SIZE_UNITS = {"": 1, "K": 2 ** 10, "M": 2 ** 20, "G": 2 ** 30}
+
+# --- Argument Parsing ---
+
+
+def build_parser():
+    """Returns the argparse parser for the search command."""
+    parser = argparse.ArgumentParser(
+        prog="python -m src",
+        description="Search files under a folder with a regular expression.")
+    parser.add_argument("pattern", help="regular expression to search for")
+    parser.add_argument("folder", nargs="?", default=".",
+                        help="folder to search (default: current directory)")
+    parser.add_argument("-i", "--ignore-case", action="store_true",
+                        help="match case-insensitively (re.IGNORECASE)")
+    parser.add_argument("--multiline", action="store_true",
+                        help="^ and $ match at line breaks (re.MULTILINE)")
+    parser.add_argument("--dotall", action="store_true",
+                        help=". also matches newlines (re.DOTALL)")
+    parser.add_argument("-U", "--whole-file", action="store_true",
+                        help="match against each file's whole text, so matches "
+                             "can span lines (combine with --dotall)")
+    parser.add_argument("--include", action="append", metavar="GLOB",
+                        help="only search files matching GLOB (repeatable)")
+    parser.add_argument("--exclude", action="append", metavar="GLOB",
+                        help="skip files and folders matching GLOB (repeatable)")
+    parser.add_argument("--no-ignore", action="store_true",
+                        help="also search files matched by .gitignore/.ignore "
+                             "files and inside .git folders")
+    parser.add_argument("--binary", action="store_true",
+                        help="also search files that look binary")
+    parser.add_argument("--max-filesize", type=parse_size, metavar="SIZE",
+                        help="skip files larger than SIZE bytes (suffixes K, M, G)")
+    parser.add_argument("--max-depth", type=int, metavar="NUM",
+                        help="descend at most NUM folders below FOLDER")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="worker processes; 0 uses every CPU (default: 1)")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="grep",
+                        help="output format (default: grep)")
+    parser.add_argument("-m", "--max-count", type=int, metavar="NUM",
+                        help="stop reading a file after NUM matches")
+    parser.add_argument("-l", "--files-with-matches", action="store_true",
+                        help="print only the paths of files that match")
+    parser.add_argument("--timeout", type=float, metavar="SECONDS",
+                        help="skip a file once searching it takes longer than this")
+    parser.add_argument("--total-timeout", type=float, metavar="SECONDS",
+                        help="stop the whole search after this long")
+    parser.add_argument("--stats", action="store_true",
+                        help="print per-stage timings and counts to stderr")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write a per-file Chrome trace (JSON) to FILE")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="write cProfile data for the run to FILE")
+    parser.add_argument("--server", metavar="ADDRESS",
+                        help="send the search to a running 'python -m src.server' "
+                             "at HOST:PORT or unix:PATH")
+    parser.add_argument("--token-file", metavar="PATH",
+                        help="access token file written by the server "
+                             "(default: ~/.regex_search_token)")
+    parser.add_argument("--analyze", action="store_true",
+                        help="print an analysis of the pattern as JSON and exit")
+    parser.add_argument("--allow-risky", action="store_true",
+                        help="run patterns with a high catastrophic-backtracking risk")
+    return parser
+
+
+def parse_size(text):
+    """Parses a size such as "512", "64K" or "1.5M" into bytes."""
+    text = text.strip().upper().removesuffix("B")
+    unit = text[-1:] if text[-1:] in SIZE_UNITS else ""
+    try:
+        return int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size: {text!r}") from None
+
+
+def regex_flags(args):
+    """Combines the flag options into a re flags value."""
+    flags = 0
+    if args.ignore_case:
+        flags |= re.IGNORECASE
+    if args.multiline:
+        flags |= re.MULTILINE
+    if args.dotall:
+        flags |= re.DOTALL
+    return flags
+
+# --- Output Writers ---
+
+
+def write_grep(results, out):
+    for res in results:
+        out.write(f"{res.file_path}:{res.line_number}:{res.line_content}\n")
+
+
+def write_jsonl(results, out):
+    for res in results:
+        out.write(json.dumps({
+            "file": res.file_path,
+            "line": res.line_number,
+            "match": res.match_group,
+            "content": res.line_content,
+            "section": res.section,
+            "column": res.column,
+        }, ensure_ascii=False) + "\n")
+
+
+def write_csv(results, out):
+    writer = csv.writer(out)
+    writer.writerow(["File", "Line Number", "Matched Text", "Full Line"])
+    for res in results:
+        writer.writerow([res.file_path, res.line_number,
+                         res.match_group, res.line_content])
+
+
+def write_files(results, out):
+    """Writes each matching file's path once; results arrive grouped by file."""
+    last_path = None
+    for res in results:
+        if res.file_path != last_path:
+            out.write(res.file_path + "\n")
+            last_path = res.file_path
+
+
+WRITERS = {"grep": write_grep, "jsonl": write_jsonl, "csv": write_csv}
+
+# --- Entry Point ---
+
+
+def main(argv=None, out=None):
+    """Runs a search from command-line arguments; returns the exit status."""
+    args = build_parser().parse_args(argv)
+    out = sys.stdout if out is None else out
+    flags = regex_flags(args)
+    try:
+        if args.analyze:
+            out.write(json.dumps(analyze_pattern(args.pattern, flags).to_dict()) + "\n")
+            return 0
+        if not args.allow_risky:
+            check_pattern(args.pattern, flags)
+    except PatternRiskError as e:
+        print(f"error: refusing risky regex: {e} (use --allow-risky)",
+              file=sys.stderr)
+        return 2
+    except re.error as e:
+        print(f"error: invalid regex: {e}", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.folder):
+        print(f"error: not a folder: {args.folder}", file=sys.stderr)
+        return 2
+    max_count = args.max_count
+    if args.files_with_matches:
+        # One match is enough to list a file
+        max_count = 1
+    if max_count is not None and max_count < 1:
+        return 1
+
+    diagnostics = []
+    stats = None
+    if args.stats or args.trace:
+        stats = SearchStats(trace=bool(args.trace))
+    walk_options = {
+        "include": args.include, "exclude": args.exclude,
+        "ignore_files": None if args.no_ignore else list(DEFAULT_IGNORE_FILES),
+        "max_size": args.max_filesize, "max_depth": args.max_depth,
+        "skip_binary": not args.binary}
+    client = None
+    try:
+        if args.server:
+            if args.timeout or args.total_timeout or stats is not None:
+                print("error: --timeout, --total-timeout, --stats and --trace "
+                      "are not available with --server", file=sys.stderr)
+                return 2
+            try:
+                from .server import SearchClient, read_token
+            except ImportError:                 # Running as a script from src/
+                from server import SearchClient, read_token
+            token = read_token(args.token_file) if args.token_file else None
+            client = SearchClient(args.server, token=token)
+            results = client.search(args.folder, args.pattern, flags,
+                                    max_count=max_count,
+                                    allow_risky=args.allow_risky,
+                                    whole_file=args.whole_file, **walk_options)
+        else:
+            results = RegexSearcher().search_in_folder(
+                args.folder, args.pattern, flags,
+                workers=args.workers or None, max_count=max_count,
+                timeout=args.timeout, total_timeout=args.total_timeout,
+                diagnostics=diagnostics, stats=stats,
+                whole_file=args.whole_file, **walk_options)
+    except re.error as e:
+        print(f"error: invalid regex: {e}", file=sys.stderr)
+        return 2
+    except (ValueError, OSError) as e:
+        print(f"error: server {args.server}: {e}", file=sys.stderr)
+        return 2
+
+    matched = False
+
+    def track(results):
+        nonlocal matched
+        for res in results:
+            matched = True
+            yield res
+
+    writer = write_files if args.files_with_matches else WRITERS[args.format]
+    profiling = profile_to(args.profile) if args.profile else contextlib.nullcontext()
+    try:
+        with profiling:
+            writer(track(results), out)
+        out.flush()
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head); stop quietly
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 0 if matched else 1
+    if client is not None:
+        diagnostics.extend(client.diagnostics)
+    if args.stats:
+        print(stats.report(), file=sys.stderr)
+    if args.trace:
+        stats.write_trace(args.trace)
+    for diagnostic in diagnostics:
+        print(f"{diagnostic.file_path or args.folder}: {diagnostic.kind}: "
+              f"{diagnostic.message}", file=sys.stderr)
+    if diagnostics:
+        return 2
+    return 0 if matched else 1
@@ -1,93 +1,1318 @@
+import io
 import os
 import re
+import sys
 import csv
+import fnmatch
 import json
+import mmap
+import array
+import queue
+import bisect
+import functools
+import itertools
+import importlib
+import threading
+import collections
 
-# --- Optional Imports for Advanced File Processing ---
 try:
-    import docx                                 # python-docx library
-    from pypdf import PdfReader                 # PyPDF2 library
-    import openpyxl                             # openpyxl library
-except ImportError:                             # Handle missing libraries gracefully
-    # Missing libraries
-    print("Warning: Libraries for DOCX, PDF, and Excel not found.")
-    # Installation instructions
-    print("Please run: pip install python-docx pypdf openpyxl")
-    docx = None
-    PdfReader = None
-    openpyxl = None
+    from .archives import (COMPRESSED_MODULES, archive_kind, iter_line_blocks,
+                           iter_members, iter_text_blocks, member_path,
+                           open_compressed, open_member, prefetch,
+                           split_archive_path, _produce, _put)
+    from .patterns import compile_pattern, is_line_local, literal_prefilter
+except ImportError:                             # Running as a script from src/
+    from archives import (COMPRESSED_MODULES, archive_kind, iter_line_blocks,
+                          iter_members, iter_text_blocks, member_path,
+                          open_compressed, open_member, prefetch,
+                          split_archive_path, _produce, _put)
+    from patterns import compile_pattern, is_line_local, literal_prefilter
+
+# Bump whenever extraction output changes so cached text is invalidated
+EXTRACTOR_VERSION = 2
+
+# Name of the trigram index database kept at the root of an indexed folder
+DEFAULT_INDEX_NAME = ".trigram_index.sqlite3"
+
+# Bytes read from a plain-text file to decide whether it is binary
+SNIFF_BYTES = 8192
+
+# Extensions skipped without being opened when binary files are skipped
+BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".tif", ".tiff", ".webp",
+    ".mp3", ".mp4", ".m4a", ".avi", ".mov", ".mkv", ".wav", ".flac", ".ogg",
+    ".7z", ".rar", ".zst",
+    ".exe", ".dll", ".so", ".dylib", ".o", ".a", ".lib", ".class", ".jar",
+    ".pyc", ".pyo", ".whl", ".sqlite", ".sqlite3", ".db", ".bin", ".iso",
+    ".doc", ".xls", ".ppt", ".pptx", ".odt", ".ods", ".woff", ".woff2",
+    ".ttf", ".otf", ".eot",
+})
+
+# --- Format Extractor Registry ---
+
+# Extension -> function yielding a file's text in chunks
+EXTRACTORS = {}
+
+# Formats whose extraction is expensive enough to be worth caching
+CACHED_EXTENSIONS = set()
+
+# Formats whose text is split into numbered sections (PDF pages, sheets)
+SECTIONED_EXTENSIONS = set()
+
+# Ends every section of a sectioned format. splitlines() treats it as a
+# line break, so it replaces the newline that would otherwise end the line.
+SECTION_BREAK = "\f"
+
+
+def register_extractor(*extensions, cached=False, sectioned=False):
+    """
+    Decorator registering a chunk generator for one or more extensions.
+    Set cached=True for formats whose text should go through a TextCache,
+    and sectioned=True for generators that end each page or sheet with
+    SECTION_BREAK. Files with unregistered extensions are read as plain text.
+    """
+    def decorator(func):
+        for ext in extensions:
+            ext = ext.lower()
+            EXTRACTORS[ext] = func
+            for registry, flag in ((CACHED_EXTENSIONS, cached),
+                                   (SECTIONED_EXTENSIONS, sectioned)):
+                if flag:
+                    registry.add(ext)
+                else:
+                    registry.discard(ext)
+        return func
+    return decorator
+
+
+@functools.lru_cache(maxsize=None)
+def _optional_import(module_name, package_name):
+    """Imports a format library on first use, or returns None if missing."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:                         # Handle missing libraries gracefully
+        print(f"Warning: {package_name} not found; files that need it "
+              f"will be read as plain text.", file=sys.stderr)
+        print(f"Please run: pip install {package_name}", file=sys.stderr)
+        return None
+
+
+# Characters str.splitlines() treats as line boundaries
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
+# PDFs with at least this many pages have page ranges extracted in parallel
+PDF_PARALLEL_MIN_PAGES = 64
+
+# Pages extracted by each task of a parallel PDF extraction
+PDF_PAGES_PER_TASK = 16
+
+# Processes used for parallel PDF extraction; None means os.cpu_count()
+PDF_WORKERS = None
+
+# Size of the blocks plain-text files are streamed in
+TEXT_BLOCK_SIZE = 1024 * 1024
+
+# Compressed files and archive members at least this large are decompressed
+# in a background thread while the previous block is matched
+PREFETCH_MIN_BYTES = 256 * 1024
+
+# Uncompressed archive members up to this size are read whole and searched
+# as one buffer, like a memory-mapped file; larger ones are streamed
+MEMBER_BUFFER_BYTES = 32 * 1024 * 1024
+
+# Fresh results held back for a ResultCache are dropped (and not cached)
+# once they take roughly this much memory
+RESULT_CACHE_BUFFER_BYTES = 64 * 1024 * 1024
+
+# Walked files looked up in a ResultCache with one query, and how many
+# walked files may wait to be yielded before the walk pauses for the search
+RESULT_CACHE_LOOKUP_BATCH = 64
+RESULT_CACHE_WALK_AHEAD = 4096
+
+# Search events a memoized search's background thread may queue ahead
+RESULT_CACHE_QUEUE_DEPTH = 1024
+
+# ASCII characters other than "\n" that splitlines() or universal newlines
+# treat as line breaks, plus "\x1f", which str patterns but not bytes
+# patterns count as \s; files containing them take the line-by-line path
+_EXTRA_ASCII_BREAKS = (b"\r", b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e",
+                       b"\x1f")
 
 # --- Core Functionality ---
 
 
-def read_file_content(file_path):
+def read_file_content(file_path, cache=None):
     """
     Reads file content into a string. Supports PDF, DOCX, XLSX, CSV, and text files.
+    When a TextCache is given, document formats are served from it if unchanged.
     """
-    content = ""
     try:
         ext = os.path.splitext(file_path)[1].lower()  # Get file extension
+        if cache is not None and ext in CACHED_EXTENSIONS:
+            return _cached_text(file_path, ext, cache)
+        return "".join(_file_chunks(file_path))
 
-        # DOCX processing
-        if ext == ".docx" and docx:
-            doc = docx.Document(file_path)
-            # Extract text from paragraphs
-            content = "\n".join([p.text for p in doc.paragraphs])
-
-        # PDF processing
-        elif ext == ".pdf" and PdfReader:
-            reader = PdfReader(file_path)
-            for page in reader.pages:
-                text = page.extract_text()
-                if text:
-                    content += text + "\n"
-
-        # Excel processing
-        elif ext == ".xlsx" and openpyxl:
-            workbook = openpyxl.load_workbook(file_path)
-            sheet = workbook.active
-            for row in sheet.iter_rows(values_only=True):
-                content += "\t".join([str(cell)
-                                     for cell in row if cell is not None]) + "\n"
+    # Handle any file read errors
+    except Exception as e:
+        return f"Error reading file '{os.path.basename(file_path)}':\n\n{e}"
 
-        # CSV processing
-        elif ext == ".csv":
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    content += ", ".join(row) + "\n"
 
-        # Plain text files
-        else:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                content = f.read()
+def read_file_text(file_path, cache=None):
+    """
+    Returns a file's whole text, the string every result offset refers to.
+    Unlike read_file_content, read errors are raised to the caller.
+    """
+    return "".join(_file_chunks(file_path, cache))
+
+
+def iter_file_lines(file_path, cache=None):
+    """
+    Yields (line_number, line) pairs without building the whole file in memory.
+    Lines are split exactly as read_file_content(...).splitlines() would split
+    them. Unlike read_file_content, read errors are raised to the caller.
+    """
+    return enumerate(_split_lines(_file_chunks(file_path, cache)), 1)
+
+
+def iter_located_lines(file_path, cache=None):
+    """
+    Like iter_file_lines, but yields (line_number, section, line) triples
+    where section is the 1-based page or sheet of sectioned formats and
+    None for everything else.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    for line_num, section, line, _ in _located_lines(_file_chunks(file_path, cache), ext):
+        yield line_num, section, line
+
+
+def _located_lines(chunks, ext):
+    """
+    Splits a file's chunks into (line_number, section, line, offset)
+    tuples, where offset is the position of the line's first character in
+    the file's text (as read_file_content returns it).
+    """
+    sectioned = ext in SECTIONED_EXTENSIONS
+    section = 1 if sectioned else None
+    offset = 0
+    for line_num, line in enumerate(_split_lines(chunks, keepends=True), 1):
+        # Lines only contain line-break characters in their terminator
+        yield line_num, section, line.rstrip(_LINE_BREAKS), offset
+        offset += len(line)
+        if sectioned and line.endswith(SECTION_BREAK):
+            section += 1
 
-    # Handle any file read errors
-    except Exception as e:
-        content = f"Error reading file '{os.path.basename(file_path)}':\n\n{e}"
 
+def _file_chunks(file_path, cache=None):
+    """
+    Yields a file's text in chunks, serving documents from the cache.
+    Archive members are read through their virtual paths, and an archive
+    itself reads as the text of all of its searched members.
+    """
+    archive_path, member = split_archive_path(file_path)
+    if member is not None:
+        return _member_chunks(archive_path, member)
+    if archive_kind(file_path):
+        return _archive_chunks(file_path)
+    ext = os.path.splitext(file_path)[1].lower()
+    if cache is not None and ext in CACHED_EXTENSIONS:
+        text = _cached_text(file_path, ext, cache)
+        return (text[i:i + TEXT_BLOCK_SIZE]
+                for i in range(0, len(text), TEXT_BLOCK_SIZE))
+    return _iter_text_chunks(file_path, ext)
+
+
+def _deferred_chunks(file_path, cache=None):
+    """_file_chunks, but cached documents are only extracted on first next()."""
+    yield from _file_chunks(file_path, cache)
+
+
+def _cached_text(file_path, ext, cache):
+    """Returns a document's text from the cache, extracting it on a miss."""
+    content = cache.get(file_path, EXTRACTOR_VERSION)
+    if content is None:
+        content = _extract_text(file_path, ext)
+        cache.put(file_path, EXTRACTOR_VERSION, content)
     return content
 
+
+def _extract_text(file_path, ext):
+    """Parses a whole file into a string according to its extension."""
+    return "".join(_iter_text_chunks(file_path, ext))
+
+
+def _split_lines(chunks, keepends=False):
+    """
+    Re-splits arbitrary text chunks into lines, as str.splitlines(keepends)
+    would.
+    """
+    pending = ""
+    for chunk in chunks:
+        text = pending + chunk
+        if not text:
+            continue
+        lines = text.splitlines(keepends)
+        if text[-1] == "\r":
+            # A trailing "\r" may be the first half of a "\r\n" pair
+            pending = lines.pop() + ("" if keepends else "\r")
+        elif text[-1] in _LINE_BREAKS:
+            pending = ""
+        else:
+            pending = lines.pop()
+        yield from lines
+    if pending:
+        yield from pending.splitlines(keepends)
+
+
+def _iter_text_chunks(file_path, ext):
+    """Yields the text of a file piece by piece (pages, rows, paragraphs)."""
+    return EXTRACTORS.get(ext, _iter_plain_text)(file_path)
+
+
+# DOCX processing
+@register_extractor(".docx", cached=True)
+def _iter_docx_text(file_path):
+    docx = _optional_import("docx", "python-docx")
+    if docx is None:
+        yield from _iter_plain_text(file_path)
+        return
+    doc = docx.Document(file_path)
+    # Extract text from paragraphs
+    for i, paragraph in enumerate(doc.paragraphs):
+        if i:
+            yield "\n"
+        yield paragraph.text
+
+
+# PDF processing, one section per page
+@register_extractor(".pdf", cached=True, sectioned=True)
+def _iter_pdf_text(file_path):
+    pypdf = _optional_import("pypdf", "pypdf")
+    if pypdf is None:
+        yield from _iter_plain_text(file_path)
+        return
+    reader = pypdf.PdfReader(file_path)
+    page_count = len(reader.pages)
+    workers = PDF_WORKERS or os.cpu_count() or 1
+    if page_count >= PDF_PARALLEL_MIN_PAGES and workers > 1 and _is_main_process():
+        texts = _iter_pdf_pages_parallel(file_path, page_count, workers)
+    else:
+        texts = (page.extract_text() for page in reader.pages)
+    for text in texts:
+        yield (text or "").replace(SECTION_BREAK, "\n") + SECTION_BREAK
+
+
+def _is_main_process():
+    """False inside pool workers, which must not start pools of their own."""
+    import multiprocessing
+    return multiprocessing.parent_process() is None
+
+
+def _extract_pdf_pages(file_path, start, stop):
+    """Worker entry point: extracts the text of pages [start, stop)."""
+    reader = _optional_import("pypdf", "pypdf").PdfReader(file_path)
+    return [reader.pages[i].extract_text() for i in range(start, stop)]
+
+
+def _iter_pdf_pages_parallel(file_path, page_count, workers):
+    """Yields page texts in order while page ranges are extracted in a pool."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    starts = range(0, page_count, PDF_PAGES_PER_TASK)
+    stops = [min(start + PDF_PAGES_PER_TASK, page_count) for start in starts]
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(starts)))
+    try:
+        for texts in executor.map(_extract_pdf_pages,
+                                  itertools.repeat(file_path), starts, stops):
+            yield from texts
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Excel processing, one section per worksheet
+@register_extractor(".xlsx", cached=True, sectioned=True)
+def _iter_xlsx_text(file_path):
+    openpyxl = _optional_import("openpyxl", "openpyxl")
+    if openpyxl is None:
+        yield from _iter_plain_text(file_path)
+        return
+    # Read-only mode streams rows instead of building every cell object;
+    # formula cells keep their formula text, as cached values may be missing
+    workbook = openpyxl.load_workbook(file_path, read_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            line = None
+            for row in sheet.iter_rows(values_only=True):
+                if line is not None:
+                    yield line + "\n"
+                line = "\t".join([str(cell)
+                                  for cell in row if cell is not None])
+            # The sheet's last row ends with the section break
+            yield (line or "") + SECTION_BREAK
+    finally:
+        workbook.close()
+
+
+# CSV processing
+@register_extractor(".csv")
+def _iter_csv_text(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        reader = csv.reader(f)
+        for row in reader:
+            yield ", ".join(row) + "\n"
+
+
+# Plain text files
+def _iter_plain_text(file_path):
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        while True:
+            block = f.read(TEXT_BLOCK_SIZE)
+            if not block:
+                break
+            yield block
+
+
+# Compressed files, decompressed as a stream and read as plain text
+@register_extractor(*COMPRESSED_MODULES)
+def _iter_compressed_text(file_path):
+    ext = os.path.splitext(file_path)[1].lower()
+    yield from _stream_chunks(open_compressed(file_path, ext),
+                              os.path.getsize(file_path))
+
+
+def _stream_chunks(stream, size):
+    """
+    Decodes a binary stream into text chunks, ahead of the consumer for
+    long streams (see _prefetched).
+    """
+    return _prefetched(iter_text_blocks(stream, TEXT_BLOCK_SIZE), size)
+
+
+def _prefetched(blocks, size):
+    """
+    Wraps a decompressing iterator in prefetch() when the stream is at
+    least PREFETCH_MIN_BYTES long and there is a spare CPU to overlap on.
+    """
+    if size >= PREFETCH_MIN_BYTES and (os.cpu_count() or 1) > 1:
+        return prefetch(blocks)
+    return blocks
+
+# --- Archives ---
+
+
+def _is_searched_member(name):
+    """
+    Returns False for archive members a search skips: nested archives and
+    binary or document formats, which need a file of their own.
+    """
+    if archive_kind(name):
+        return False
+    ext = os.path.splitext(name)[1].lower()
+    return ext not in BINARY_EXTENSIONS and ext not in CACHED_EXTENSIONS
+
+
+def _member_stream_chunks(name, stream, size):
+    """Text chunks of an archive member, decompressing .gz/.bz2/.xz members."""
+    ext = os.path.splitext(name)[1].lower()
+    if ext in COMPRESSED_MODULES:
+        stream = open_compressed(stream, ext)
+    return _stream_chunks(stream, size)
+
+
+def _member_text(name, size, stream):
+    """
+    Returns the text chunks of a searched archive member, or None if its
+    first SNIFF_BYTES contain a NUL and it is skipped as binary. The chunks
+    must be used up or closed before the next member is requested.
+    """
+    chunks = _member_stream_chunks(name, stream, size)
+    first = next(chunks, "")
+    if "\0" in first[:SNIFF_BYTES]:
+        chunks.close()
+        return None
+    return _prepend(first, chunks)
+
+
+def _archive_members(archive_path):
+    """
+    Yields (virtual path, text chunks) for each searched member of an
+    archive, in one pass over it (see _member_text).
+    """
+    for name, size, stream in iter_members(archive_path):
+        if _is_searched_member(name):
+            chunks = _member_text(name, size, stream)
+            if chunks is not None:
+                yield member_path(archive_path, name), chunks
+
+
+def _prepend(first, chunks):
+    """Yields `first` and then `chunks`, closing `chunks` when closed early."""
+    try:
+        yield first
+        yield from chunks
+    finally:
+        chunks.close()
+
+
+def _archive_chunks(archive_path):
+    """Yields the text of every searched member of an archive, each ending a line."""
+    for _, chunks in _archive_members(archive_path):
+        last = ""
+        for last in chunks:
+            yield last
+        if last and last[-1] not in _LINE_BREAKS:
+            yield "\n"
+
+
+def _member_chunks(archive_path, member):
+    """Yields one archive member's text, opening the archive on first next()."""
+    yield from _member_stream_chunks(member, open_member(archive_path, member), 0)
+
 # --- Regex Search Logic ---
 
 
 def find_matches_in_text(text_content, pattern, flags=0):
     """Finds regex matches in text."""
-    compiled_pattern = re.compile(pattern, flags)
+    compiled_pattern = compile_pattern(pattern, flags)
+    prefilter = literal_prefilter(compiled_pattern.pattern, compiled_pattern.flags)
+    if prefilter is not None and not prefilter.may_match(text_content):
+        return []
     return list(compiled_pattern.finditer(text_content))
 
+
+class MatchSpans:
+    """
+    Start and end offsets of the matches in one text, kept in compact
+    arrays rather than match objects, with conversion to Tk-style
+    "line.column" indices. Lines are split on "\n" only, as a Tk Text
+    widget does; lines count from 1 and columns from 0.
+    """
+
+    __slots__ = ("starts", "ends", "line_starts")
+
+    def __init__(self, text, starts=(), ends=()):
+        self.starts = array.array("q", starts)
+        self.ends = array.array("q", ends)
+        # Offset of the first character of every line
+        self.line_starts = array.array("q", [0])
+        self.line_starts.extend(itertools.accumulate(
+            map((1).__add__, map(len, text.split("\n")[:-1]))))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def index(self, offset):
+        """Returns the "line.column" index of a character offset."""
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        return f"{line + 1}.{offset - self.line_starts[line]}"
+
+    def on_lines(self, first_line, stop_line):
+        """Returns the range of match numbers starting on lines [first_line, stop_line)."""
+        line_starts = self.line_starts
+        bounds = [line_starts[line - 1] if line <= len(line_starts) else float("inf")
+                  for line in (max(first_line, 1), max(stop_line, 1))]
+        return range(bisect.bisect_left(self.starts, bounds[0]),
+                     bisect.bisect_left(self.starts, bounds[1]))
+
+    def indices(self, numbers):
+        """
+        Yields (start index, end index) for a range of match numbers,
+        converting every offset in one forward pass over the line table
+        (finditer matches never overlap, so offsets only grow).
+        """
+        line_starts = self.line_starts
+        last_line = len(line_starts) - 1
+        line = None
+        for number in numbers:
+            pair = []
+            for offset in (self.starts[number], self.ends[number]):
+                if line is None:
+                    line = bisect.bisect_right(line_starts, offset) - 1
+                while line < last_line and line_starts[line + 1] <= offset:
+                    line += 1
+                pair.append(f"{line + 1}.{offset - line_starts[line]}")
+            yield pair[0], pair[1]
+
+
+def find_match_spans(text, pattern, flags=0, cancel=None):
+    """
+    Returns a MatchSpans for every match of a pattern in text. Meant to run
+    on a background thread: once the optional `cancel` threading.Event is
+    set the search stops and returns None.
+    """
+    compiled_pattern = compile_pattern(pattern, flags)
+    prefilter = literal_prefilter(compiled_pattern.pattern, compiled_pattern.flags)
+    if prefilter is not None and not prefilter.may_match(text):
+        return MatchSpans(text)
+    starts = array.array("q")
+    ends = array.array("q")
+    for count, match in enumerate(compiled_pattern.finditer(text)):
+        if cancel is not None and count % 4096 == 0 and cancel.is_set():
+            return None
+        start, end = match.span()
+        starts.append(start)
+        ends.append(end)
+    return MatchSpans(text, starts, ends)
+
 # --- Data Structures and Persistence ---
 
 
 class SearchResult:
-    """Container for a regex match."""
+    """
+    Container for a regex match. Uses __slots__ and keeps a reference to the
+    raw line, which every match on that line shares; `file_name` and the
+    stripped `line_content` are computed when read. `section` is the 1-based
+    PDF page or workbook sheet of the match, or None for other formats.
 
-    def __init__(self, file_path, line_number, line_content, match_group):
-        self.file_path = file_path
-        self.file_name = os.path.basename(file_path)
+    `column` is the match's 0-based position in its (unstripped) line, and
+    `start`/`end` its character offsets in the file's text as
+    read_file_content returns it; all three are None when unknown. A
+    whole-file match may span lines, in which case the line is its first.
+    """
+
+    __slots__ = ("file_path", "line_number", "_line", "match_group", "query",
+                 "section", "column", "start", "end")
+
+    def __init__(self, file_path, line_number, line_content, match_group,
+                 query=None, section=None, column=None, start=None, end=None):
+        self.file_path = sys.intern(file_path)
         self.line_number = line_number
-        self.line_content = line_content.strip()
+        self._line = line_content
         self.match_group = match_group
+        self.query = query  # Name of the query that produced the match
+        self.section = section
+        self.column = column
+        self.start = start
+        self.end = end
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.file_path)
+
+    @property
+    def line_content(self):
+        return self._line.strip()
+
+    def end_location(self):
+        """Returns (line_number, column) just past the match, or None if unknown."""
+        if self.column is None:
+            return None
+        lines = self.match_group.splitlines()
+        if len(lines) <= 1:
+            return self.line_number, self.column + len(self.match_group.rstrip(_LINE_BREAKS))
+        return self.line_number + len(lines) - 1, len(lines[-1])
+
+
+def _result_row(file_path, result):
+    """Flattens a result found in file_path into a ResultCache row."""
+    # Archive members keep their "!/member" suffix
+    return [result.file_path[len(file_path):], result.line_number,
+            result.line_content, result.match_group, result.query,
+            result.section, result.column, result.start, result.end]
+
+
+def _row_result(file_path, row):
+    """Rebuilds a SearchResult from a ResultCache row for file_path."""
+    return SearchResult(file_path + row[0], *row[1:])
+
+
+class _MemoFile:
+    """A walked file in a memoized search, waiting for its turn to be yielded."""
+
+    __slots__ = ("path", "mtime_ns", "size", "rows", "results", "done")
+
+    def __init__(self, path, mtime_ns, size, rows):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.rows = rows          # Cached rows, or None if the file is searched
+        self.results = []         # Fresh results not yielded yet
+        self.done = rows is not None
+
+
+class ContextReader:
+    """
+    Reads the lines around search results on demand. A file is read only
+    as far as the last line asked for, and the lines read so far are kept
+    along with the open reader, so consecutive results from one file (the
+    order searches produce them in) read it only once.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self._key = None          # (path, mtime, size) of the kept lines
+        self._lines = []
+        self._reader = None       # Line iterator positioned after _lines
+
+    def _file_lines(self, file_path, count):
+        """Returns at least the first `count` lines of a file, or all of them."""
+        try:
+            # Archive members change along with their archive
+            st = os.stat(split_archive_path(file_path)[0])
+            key = (file_path, st.st_mtime_ns, st.st_size)
+        except OSError:
+            return []
+        if key != self._key:
+            self.close()
+            self._key = key
+            self._lines = []
+            try:
+                self._reader = _split_lines(_file_chunks(file_path, self.cache))
+            except Exception:
+                return []
+        missing = count - len(self._lines)
+        if missing > 0 and self._reader is not None:
+            try:
+                self._lines.extend(itertools.islice(self._reader, missing))
+                if len(self._lines) < count:
+                    self.close()
+            except Exception:
+                self.close()
+        return self._lines
+
+    def close(self):
+        """Closes the file being read, if any; kept lines stay usable."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def context(self, result, before=2, after=2):
+        """
+        Returns (first_line_number, lines): the lines a result's match
+        covers plus up to `before` and `after` lines around them. Falls back
+        to the result's own line if the file can no longer be read.
+        """
+        span = max(1, len(result.match_group.splitlines()))
+        lines = self._file_lines(result.file_path,
+                                 result.line_number + span - 1 + after)
+        if not 0 < result.line_number <= len(lines):
+            return result.line_number, [result._line]
+        first = max(1, result.line_number - before)
+        last = min(len(lines), result.line_number + span - 1 + after)
+        return first, lines[first - 1:last]
+
+
+class SearchDiagnostic:
+    """
+    A file a search could not fully cover. `kind` is "error" (the file
+    could not be read or extracted), "timeout" (it ran past its time
+    budget) or "incomplete" (the overall budget ran out; file_path is None
+    and later files were not searched).
+    """
+
+    __slots__ = ("file_path", "kind", "message")
+
+    def __init__(self, file_path, kind, message):
+        self.file_path = file_path
+        self.kind = kind
+        self.message = message
+
+    def __repr__(self):
+        return f"SearchDiagnostic({self.file_path!r}, {self.kind!r}, {self.message!r})"
+
+# --- Folder Traversal and Per-File Search ---
+
+
+def walk_files(folder_path, include=None, exclude=None, ignore_files=None,
+               max_size=None, max_depth=None, skip_binary=False):
+    """
+    Yields file paths under a folder in a deterministic, name-sorted order,
+    each folder's files before its subfolders.
+
+    `include` and `exclude` are lists of glob patterns matched against each
+    file's name and its "/"-separated path relative to the folder.
+    `ignore_files` names .gitignore-style files (see ignore.py) read in
+    every folder; when given, version-control folders are skipped too.
+    Excluded and ignored folders are pruned before they are listed.
+
+    `max_size` skips files larger than that many bytes, `max_depth` limits
+    how many folder levels below folder_path are entered (0 = only its own
+    files), and skip_binary=True drops files that is_binary_file rejects.
+    """
+    rules = None
+    if ignore_files:
+        try:
+            from .ignore import VCS_DIRS, IgnoreRules, parse_ignore_file
+        except ImportError:                     # Running as a script from src/
+            from ignore import VCS_DIRS, IgnoreRules, parse_ignore_file
+        rules = IgnoreRules()
+    # Folders still to list: (path, relative path ending in "/", depth, rules)
+    stack = [(folder_path, "", 0, rules)]
+    while stack:
+        root, rel_root, depth, rules = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        if rules is not None:
+            rules = rules.extend([rule for name in ignore_files
+                                  for rule in parse_ignore_file(
+                                      os.path.join(root, name), rel_root)])
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel_path = rel_root + name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Symlinked folders are not followed, as with os.walk
+                if entry.is_symlink() or (max_depth is not None and depth >= max_depth):
+                    continue
+                if exclude and _glob_match(name, rel_path, exclude):
+                    continue
+                if rules is not None and (name in VCS_DIRS or rules.ignored(rel_path, True)):
+                    continue
+                subdirs.append((entry.path, rel_path + "/", depth + 1, rules))
+                continue
+            if name.startswith(DEFAULT_INDEX_NAME):
+                continue
+            if include and not _glob_match(name, rel_path, include):
+                continue
+            if exclude and _glob_match(name, rel_path, exclude):
+                continue
+            if rules is not None and rules.ignored(rel_path):
+                continue
+            if max_size is not None:
+                try:
+                    if entry.stat().st_size > max_size:
+                        continue
+                except OSError:
+                    pass                        # Let the search report it
+            if skip_binary and is_binary_file(entry.path):
+                continue
+            yield entry.path
+        stack.extend(reversed(subdirs))
+
+
+def is_binary_file(file_path):
+    """
+    Returns True for files not worth reading as text: known binary
+    extensions, and files read as plain text whose first SNIFF_BYTES
+    contain a NUL byte. Registered document formats are never binary.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext in EXTRACTORS or archive_kind(file_path):
+        return False
+    if ext in BINARY_EXTENSIONS:
+        return True
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+    except OSError:
+        return False                            # Let the search report it
+    return b"\0" in head
+
+
+def _glob_match(name, rel_path, globs):
+    """Returns True if a name or relative path matches any of the globs."""
+    return any(fnmatch.fnmatch(name, glob) or fnmatch.fnmatch(rel_path, glob)
+               for glob in globs)
+
+
+def _search_file(file_path, queries, cache=None, max_count=None,
+                 diagnostics=None, stats=None, whole_file=False):
+    """
+    Yields SearchResult objects for every match of each (name, compiled
+    pattern) query in a single file. The file is read once for all queries.
+    With `max_count`, reading stops after that many matches. Read errors
+    are appended to the `diagnostics` list when one is given, and stage
+    timings are recorded in `stats` (see _search_file_timed). With
+    whole_file=True patterns run over the whole text instead of per line.
+    Archives are searched member by member (see _search_archive).
+    """
+    if archive_kind(file_path):
+        yield from _search_archive(file_path, queries, max_count, diagnostics,
+                                   stats, whole_file)
+        return
+    if whole_file:
+        yield from itertools.islice(
+            _search_whole_file(file_path, queries, cache, diagnostics), max_count)
+        return
+    ext = os.path.splitext(file_path)[1].lower()
+    if _is_plain_text(ext):
+        found, remaining = _search_mmap(file_path, queries, max_count)
+    elif ext in COMPRESSED_MODULES:
+        found, remaining = _search_compressed(file_path, ext, queries, max_count)
+    else:
+        yield from itertools.islice(
+            _search_lines(file_path, queries, cache, diagnostics, stats),
+            max_count)
+        return
+    yield from _finish_fast_search(
+        found, remaining, max_count,
+        lambda remaining: _search_lines(file_path, remaining, cache,
+                                        diagnostics, stats))
+
+
+def _finish_fast_search(found, remaining, max_count, search_lines):
+    """
+    Yields the results of a whole-buffer search in line order, after
+    running the `remaining` queries through search_lines(remaining).
+    """
+    if remaining:
+        found.append(list(itertools.islice(search_lines(remaining), max_count)))
+    if len(found) == 1:
+        yield from found[0]
+    elif found:
+        # Interleave per-query results back into line order
+        yield from itertools.islice(
+            sorted(itertools.chain(*found), key=lambda r: r.line_number),
+            max_count)
+
+
+def _search_file_timed(file_path, queries, cache=None, max_count=None,
+                       diagnostics=None, stats=None, whole_file=False):
+    """
+    Returns _search_file's results as a list, recording the file in a
+    SearchStats. Results are collected first so time the caller spends
+    consuming them is not charged to the file.
+    """
+    stats.begin_file(file_path)
+    results = list(_search_file(file_path, queries, cache, max_count,
+                                diagnostics, stats, whole_file))
+    stats.end_file(len(results))
+    return results
+
+
+def _search_archive(file_path, queries, max_count=None, diagnostics=None,
+                    stats=None, whole_file=False):
+    """
+    Searches the members of an archive in a single pass, each as a file of
+    its own: results carry the members' virtual paths ("<archive>!/<member>")
+    and `max_count` applies per member.
+    """
+    try:
+        members = iter_members(file_path)
+        try:
+            for name, size, stream in members:
+                if not _is_searched_member(name):
+                    continue
+                path = member_path(file_path, name)
+                if (not whole_file and size <= MEMBER_BUFFER_BYTES
+                        and os.path.splitext(name)[1].lower() not in COMPRESSED_MODULES):
+                    yield from _search_member_buffer(path, stream.read(), queries,
+                                                     max_count, diagnostics, stats)
+                    continue
+                chunks = _member_text(name, size, stream)
+                if chunks is None:
+                    continue
+                if whole_file:
+                    found = _search_whole_file(path, queries, None, diagnostics,
+                                               chunks=chunks)
+                else:
+                    found = _search_lines(path, queries, None, diagnostics,
+                                          stats, chunks=chunks)
+                try:
+                    yield from itertools.islice(found, max_count)
+                finally:
+                    chunks.close()
+        finally:
+            members.close()
+    except Exception as e:
+        # A corrupt or truncated archive ends the search of its members
+        if diagnostics is not None:
+            diagnostics.append(SearchDiagnostic(
+                file_path, "error", f"{type(e).__name__}: {e}"))
+
+
+def _search_member_buffer(file_path, buf, queries, max_count=None,
+                          diagnostics=None, stats=None):
+    """
+    Searches an archive member read into memory the way _search_file
+    searches a plain-text file: ASCII buffers in one pass, anything else
+    line by line. Members with a NUL in their first SNIFF_BYTES are skipped.
+    """
+    if not buf or b"\0" in buf[:SNIFF_BYTES]:
+        return
+    fast, remaining = _split_fast_queries(queries)
+    found = []
+    if fast:
+        found, remaining = _search_ascii_buffer(file_path, buf, queries, fast,
+                                                remaining, max_count)
+    yield from _finish_fast_search(
+        found, remaining, max_count,
+        lambda remaining: _search_lines(
+            file_path, remaining, None, diagnostics, stats,
+            chunks=iter_text_blocks(io.BytesIO(buf), TEXT_BLOCK_SIZE)))
+
+
+def _search_lines(file_path, queries, cache=None, diagnostics=None,
+                  stats=None, chunks=None):
+    """
+    Runs each (name, compiled pattern) query over the streamed lines of a
+    file, or of the text `chunks` when they are given.
+    """
+    prepared = [(name, compiled, literal_prefilter(compiled.pattern, compiled.flags))
+                for name, compiled in queries]
+    try:
+        ext = os.path.splitext(file_path)[1].lower()
+        if stats is None:
+            if chunks is None:
+                chunks = _file_chunks(file_path, cache)
+            lines = _split_lines(chunks, keepends=True)
+        else:
+            if chunks is None:
+                chunks = _deferred_chunks(file_path, cache)
+            lines = stats.time_lines(chunks,
+                                     lambda chunks: _split_lines(chunks, keepends=True))
+        # Inlined _located_lines: terminators are only stripped from lines
+        # that get past the prefilter, which ignores them anyway
+        sectioned = ext in SECTIONED_EXTENSIONS
+        section = 1 if sectioned else None
+        offset = 0
+        for line_num, raw_line in enumerate(lines, 1):
+            line = None
+            for name, compiled_pattern, prefilter in prepared:
+                # Lines missing a required literal cannot match
+                if prefilter is not None and not prefilter.may_match(raw_line):
+                    continue
+                if line is None:
+                    line = raw_line.rstrip(_LINE_BREAKS)
+                for match in compiled_pattern.finditer(line):
+                    start, end = match.span()
+                    yield SearchResult(
+                        file_path=file_path,
+                        line_number=line_num,
+                        line_content=line,
+                        match_group=match.group(0),
+                        query=name,
+                        section=section,
+                        column=start,
+                        start=offset + start,
+                        end=offset + end,
+                    )
+            offset += len(raw_line)
+            if sectioned and raw_line.endswith(SECTION_BREAK):
+                section += 1
+    except Exception as e:
+        # Unreadable files are skipped, as with read_file_content errors,
+        # but reported to callers that collect diagnostics
+        if diagnostics is not None:
+            diagnostics.append(SearchDiagnostic(
+                file_path, "error", f"{type(e).__name__}: {e}"))
+        return
+
+
+def _search_whole_file(file_path, queries, cache=None, diagnostics=None,
+                       chunks=None):
+    """
+    Runs each (name, compiled pattern) query over a file's whole text (or
+    the joined `chunks`), so matches may span lines (with DOTALL, or
+    patterns such as "a\\s+b"). Results come back in text order; line
+    numbers follow the same splitlines() rules as the line-by-line search.
+    """
+    try:
+        if chunks is None:
+            text = read_file_text(file_path, cache)
+        else:
+            text = "".join(chunks)
+    except Exception as e:
+        if diagnostics is not None:
+            diagnostics.append(SearchDiagnostic(
+                file_path, "error", f"{type(e).__name__}: {e}"))
+        return
+    if not text:
+        return                                  # No lines, as per line
+    matches = []
+    for name, compiled_pattern in queries:
+        prefilter = literal_prefilter(compiled_pattern.pattern, compiled_pattern.flags)
+        if prefilter is not None and not prefilter.may_match(text):
+            continue
+        matches.extend((match.start(), match.end(), match.group(0), name)
+                       for match in compiled_pattern.finditer(text))
+    if not matches:
+        return
+    matches.sort(key=lambda item: item[0])
+    # Start offset of every line, and of every section after the first
+    line_starts = [0]
+    line_starts.extend(itertools.accumulate(map(len, text.splitlines(True))))
+    section_starts = None
+    if os.path.splitext(file_path)[1].lower() in SECTIONED_EXTENSIONS:
+        section_starts = [m.end() for m in re.finditer(SECTION_BREAK, text)]
+    for start, end, group, name in matches:
+        line = bisect.bisect_right(line_starts, start) - 1
+        if line >= len(line_starts) - 1:
+            line = max(0, len(line_starts) - 2)   # Match at the very end
+        line_text = text[line_starts[line]:line_starts[line + 1]].rstrip(_LINE_BREAKS)
+        yield SearchResult(
+            file_path=file_path,
+            line_number=line + 1,
+            line_content=line_text,
+            match_group=group,
+            query=name,
+            section=None if section_starts is None
+            else bisect.bisect_right(section_starts, start) + 1,
+            column=start - line_starts[line],
+            start=start,
+            end=end,
+        )
+
+
+def _is_plain_text(ext):
+    """Returns True if files with this extension are read as plain text."""
+    return ext not in EXTRACTORS
+
+
+@functools.lru_cache(maxsize=64)
+def _bytes_pattern(pattern, flags):
+    """
+    Compiles a str pattern for whole-buffer search over ASCII bytes, or
+    returns None when its bytes form could match differently.
+    """
+    if not isinstance(pattern, str) or not pattern.isascii():
+        return None
+    flags &= ~re.UNICODE
+    if not is_line_local(pattern, flags):
+        return None
+    try:
+        return re.compile(pattern.encode("ascii"), flags | re.MULTILINE)
+    except (re.error, ValueError):
+        return None
+
+
+def _search_mmap(file_path, queries, max_count=None):
+    """
+    Searches a plain-text file as one memory-mapped buffer, computing line
+    numbers and line text only around actual hits. Returns a list of
+    per-query result lists and the queries that still need the line-by-line
+    path (non-ASCII content, unusual line breaks, or a match spanning lines).
+    Each query stops after `max_count` matches.
+    """
+    fast, remaining = _split_fast_queries(queries)
+    if not fast:
+        return [], remaining
+    try:
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return [], remaining
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _search_ascii_buffer(file_path, buf, queries, fast,
+                                            remaining, max_count)
+    except (OSError, ValueError):
+        return [], queries
+
+
+def _split_fast_queries(queries):
+    """
+    Splits (name, compiled) queries into (name, compiled, bytes pattern)
+    triples for whole-buffer search and the queries that cannot use it.
+    """
+    fast, remaining = [], []
+    for name, compiled in queries:
+        pattern = _bytes_pattern(compiled.pattern, compiled.flags)
+        if pattern is None:
+            remaining.append((name, compiled))
+        else:
+            fast.append((name, compiled, pattern))
+    return fast, remaining
+
+
+def _search_ascii_buffer(file_path, buf, queries, fast, remaining,
+                         max_count=None):
+    """
+    Runs the `fast` queries over a whole non-empty buffer; returns
+    _search_mmap's (found, remaining) pair, leaving all `queries` to the
+    line-by-line path unless the buffer passes _is_plain_ascii.
+    """
+    if not _is_plain_ascii(buf):
+        return [], queries
+    found = []
+    for name, compiled, pattern in fast:
+        prefilter = literal_prefilter(compiled.pattern, compiled.flags)
+        results = _search_buffer(file_path, buf, pattern, prefilter, name,
+                                 max_count)
+        if results is None:
+            remaining.append((name, compiled))
+        elif results:
+            found.append(results)
+    return found, remaining
+
+
+def _search_compressed(file_path, ext, queries, max_count=None):
+    """
+    _search_mmap for a compressed file: the file is decompressed once, in
+    line-aligned blocks (ahead of the search, in a background thread, for
+    large files), and each block is searched as a buffer. Returns the same
+    (found, remaining) pair; a block that is not plain ASCII, or a read
+    error, leaves every query to the line-by-line path.
+    """
+    fast, remaining = _split_fast_queries(queries)
+    if not fast:
+        return [], remaining
+    # Each fast query's results so far, or None once a match spans lines
+    collected = [[] for _ in fast]
+    try:
+        blocks = _prefetched(
+            iter_line_blocks(open_compressed(file_path, ext), TEXT_BLOCK_SIZE),
+            os.path.getsize(file_path))
+        try:
+            line_base = offset_base = 0
+            for block in blocks:
+                if not _is_plain_ascii(block):
+                    return [], queries
+                searching = False
+                for i, (name, compiled, pattern) in enumerate(fast):
+                    results = collected[i]
+                    if results is None or (max_count is not None
+                                           and len(results) >= max_count):
+                        continue
+                    prefilter = literal_prefilter(compiled.pattern, compiled.flags)
+                    block_results = _search_buffer(
+                        file_path, block, pattern, prefilter, name,
+                        None if max_count is None else max_count - len(results))
+                    if block_results is None:
+                        collected[i] = None
+                        continue
+                    for res in block_results:
+                        res.line_number += line_base
+                        res.start += offset_base
+                        res.end += offset_base
+                    results.extend(block_results)
+                    searching = True
+                if not searching:
+                    break                       # Every query is done
+                line_base += block.count(b"\n")
+                offset_base += len(block)
+        finally:
+            blocks.close()
+    except Exception:
+        return [], queries                      # The line path reports it
+    for (name, compiled, _), results in zip(fast, collected):
+        if results is None:
+            remaining.append((name, compiled))
+    return [results for results in collected if results], remaining
+
+
+def _is_plain_ascii(buf):
+    """Returns True if a buffer is ASCII and only uses "\n" line breaks."""
+    for start in range(0, len(buf), TEXT_BLOCK_SIZE):
+        block = buf[start:start + TEXT_BLOCK_SIZE]
+        if not block.isascii() or any(c in block for c in _EXTRA_ASCII_BREAKS):
+            return False
+    return True
+
+
+def _search_buffer(file_path, buf, pattern, prefilter=None, query=None,
+                   max_count=None):
+    """
+    Collects SearchResults for a bytes pattern over a buffer that passed
+    _is_plain_ascii, or returns None if a match spans lines. Matches before
+    the first multi-line one agree with the per-line search, so stopping
+    after `max_count` results is safe.
+    """
+    # Skip the regex entirely when a required literal never occurs
+    if prefilter is not None and not prefilter.may_match_bytes(buf):
+        return []
+
+    # splitlines() yields no empty line after a trailing newline
+    end = len(buf) - 1 if buf[-1:] == b"\n" else len(buf)
+    results = []
+    line_num, counted_to = 1, 0
+    line_end = -1
+    line = ""
+    for match in pattern.finditer(buf):
+        pos = match.start()
+        if pos > end:
+            break
+        text = match.group(0)
+        if b"\n" in text:
+            return None
+        if pos > line_end:
+            line_num += buf[counted_to:pos].count(b"\n")
+            counted_to = pos
+            line_start = buf.rfind(b"\n", 0, pos) + 1
+            line_end = buf.find(b"\n", pos)
+            if line_end < 0:
+                line_end = len(buf)
+            line = buf[line_start:line_end].decode("ascii")
+        results.append(SearchResult(
+            file_path=file_path,
+            line_number=line_num,
+            line_content=line,
+            match_group=text.decode("ascii"),
+            query=query,
+            column=pos - line_start,
+            start=pos,
+            end=match.end(),
+        ))
+        if max_count is not None and len(results) >= max_count:
+            break
+    return results
+
+
+def _compile_queries(queries):
+    """Compiles (name, pattern, flags) triples into (name, compiled) pairs."""
+    return [(name, compile_pattern(pattern, flags))
+            for name, pattern, flags in queries]
+
+
+def _search_file_batch(file_paths, queries, cache=None, max_count=None,
+                       stats=None, whole_file=False):
+    """
+    Worker entry point: searches a chunk of files in a child process.
+    Returns the per-file results, the worker's cache counters, any
+    diagnostics and, when `stats` is given, a SearchStats for the chunk.
+    """
+    compiled_queries = _compile_queries(queries)
+    diagnostics = []
+    if stats is None:
+        results = [list(_search_file(path, compiled_queries, cache, max_count,
+                                     diagnostics, whole_file=whole_file))
+                   for path in file_paths]
+    else:
+        stats = stats.spawn()
+        results = [_search_file_timed(path, compiled_queries, cache, max_count,
+                                      diagnostics, stats, whole_file)
+                   for path in file_paths]
+    return results, _cache_counters(cache), diagnostics, stats
+
+
+def _cache_counters(cache):
+    """Returns a worker's cache counters and resets them for the next batch."""
+    if cache is None:
+        return None
+    counters = (cache.hits, cache.misses, cache.bytes_saved)
+    cache.hits = cache.misses = cache.bytes_saved = 0
+    return counters
+
+
+def _merge_cache_counters(cache, counters):
+    """Folds counters returned by a worker into this process's cache."""
+    if counters and cache is not None:
+        cache.hits += counters[0]
+        cache.misses += counters[1]
+        cache.bytes_saved += counters[2]
+
+
+def _open_index(folder_path, index_path=None):
+    """Opens a folder's TrigramIndex, importing SQLite support on first use."""
+    try:
+        from .index import TrigramIndex
+    except ImportError:                         # Running as a script from src/
+        from index import TrigramIndex
+    return TrigramIndex(folder_path, index_path)
+
+
+def count_files(folder_path, include=None, exclude=None, ignore_files=None,
+                max_size=None, max_depth=None, skip_binary=False):
+    """Counts the files a folder search would visit, with walk_files filters."""
+    return sum(1 for _ in walk_files(folder_path, include, exclude,
+                                     ignore_files, max_size, max_depth,
+                                     skip_binary))
+
+
+def _chunked(iterable, size):
+    """Groups an iterable into lists of at most `size` items."""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
 
 # --- Main Searcher Class ---
 
@@ -95,33 +1320,409 @@ class SearchResult:
 class RegexSearcher:
     """Handles searching, exporting, and query persistence."""
 
+    def __init__(self, cache=None, result_cache=None):
+        # Optional TextCache consulted for extracted document text
+        self.cache = cache
+        # Optional ResultCache memoizing folder search results per file
+        self.result_cache = result_cache
+
 # Search files in a folder
-    def search_in_folder(self, folder_path, pattern, flags=0):
-        compiled_pattern = re.compile(pattern, flags)
-        for root, _, files in os.walk(folder_path):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                content = read_file_content(file_path)
-                if content.startswith("Error reading file"):
-                    continue
-                for line_num, line in enumerate(content.splitlines(), 1):
-                    for match in compiled_pattern.finditer(line):
-                        yield SearchResult(
-                            file_path=file_path,
-                            line_number=line_num,
-                            line_content=line,
-                            match_group=match.group(0),
-                        )
+    def search_in_folder(self, folder_path, pattern, flags=0, workers=1,
+                         chunk_size=16, ordered=True, cancel=None,
+                         progress=None, include=None, exclude=None,
+                         max_count=None, timeout=None, total_timeout=None,
+                         diagnostics=None, stats=None, ignore_files=None,
+                         max_size=None, max_depth=None, skip_binary=False,
+                         whole_file=False):
+        """
+        Yields a SearchResult for every match in the files under folder_path.
+
+        With workers=1 files are searched in this process. Any other value
+        (None meaning os.cpu_count()) dispatches chunks of `chunk_size` files
+        to a process pool. When `ordered` is True results come back in the
+        same path-sorted order as a serial search; otherwise each chunk is
+        yielded as soon as it completes.
+
+        `cancel` is an optional threading.Event; once set, no further files
+        are read. `progress` is an optional callable invoked with each file
+        path after that file has been searched.
+
+        `include`, `exclude`, `ignore_files`, `max_size`, `max_depth` and
+        `skip_binary` choose which files are read (see walk_files), and
+        `max_count` stops reading each file after that many matches.
+
+        `timeout` (seconds per file) and `total_timeout` (seconds for the
+        whole search) switch to guarded workers that are killed when a
+        file runs over budget, e.g. a pattern backtracking catastrophically
+        on a long line. Files that fail or time out are appended to the
+        `diagnostics` list, if given, as SearchDiagnostic objects.
+
+        `stats` is an optional stats.SearchStats that records per-stage
+        timings, bytes read and per-format counts for the run.
+
+        Patterns are matched one line at a time unless whole_file=True,
+        which runs them over each file's whole text so a match can span
+        lines (e.g. with re.DOTALL).
+
+        When the searcher has a result_cache, files unchanged since the
+        same search last ran are not read again (see _search_memoized).
+        """
+        return self.search_many_in_folder(
+            folder_path, [(None, pattern, flags)], workers=workers,
+            chunk_size=chunk_size, ordered=ordered, cancel=cancel,
+            progress=progress, include=include, exclude=exclude,
+            max_count=max_count, timeout=timeout,
+            total_timeout=total_timeout, diagnostics=diagnostics, stats=stats,
+            ignore_files=ignore_files, max_size=max_size, max_depth=max_depth,
+            skip_binary=skip_binary, whole_file=whole_file)
+
+    # Search files in a folder for several patterns at once
+    def search_many_in_folder(self, folder_path, queries, workers=1,
+                              chunk_size=16, ordered=True, cancel=None,
+                              progress=None, include=None, exclude=None,
+                              max_count=None, timeout=None,
+                              total_timeout=None, diagnostics=None,
+                              stats=None, ignore_files=None, max_size=None,
+                              max_depth=None, skip_binary=False,
+                              whole_file=False):
+        """
+        Runs a list of (name, pattern, flags) queries in a single pass over
+        the folder: each file is read and extracted once, and every
+        SearchResult's `query` holds the name of the query that matched.
+        Other arguments are as for search_in_folder.
+        """
+        queries = [tuple(query) for query in queries]
+        compiled_queries = _compile_queries(queries)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        file_paths = walk_files(folder_path, include, exclude, ignore_files,
+                                max_size, max_depth, skip_binary)
+        if stats is not None:
+            file_paths = stats.time_walk(file_paths)
+        search = functools.partial(
+            self._search_files, queries=queries,
+            compiled_queries=compiled_queries, workers=workers,
+            chunk_size=chunk_size, ordered=ordered, cancel=cancel,
+            max_count=max_count, timeout=timeout, total_timeout=total_timeout,
+            stats=stats, whole_file=whole_file)
+        if self.result_cache is None:
+            results = search(file_paths, progress=progress,
+                             diagnostics=diagnostics)
+        else:
+            results = self._search_memoized(
+                folder_path, queries, file_paths, search, max_count,
+                whole_file, cancel, progress, diagnostics)
+        if stats is not None:
+            results = stats.time_run(results)
+        return results
+
+    # Dispatch files to the serial, parallel or time-budgeted search
+    def _search_files(self, file_paths, queries, compiled_queries, workers,
+                      chunk_size, ordered, cancel, progress, max_count,
+                      timeout, total_timeout, diagnostics, stats, whole_file):
+        if cancel is not None:
+            file_paths = itertools.takewhile(
+                lambda _: not cancel.is_set(), file_paths)
+        if timeout is not None or total_timeout is not None:
+            try:
+                from .guarded import search_guarded
+            except ImportError:                 # Running as a script from src/
+                from guarded import search_guarded
+            results = search_guarded(
+                file_paths, queries, max(1, workers), self.cache,
+                timeout=timeout, total_timeout=total_timeout,
+                ordered=ordered, cancel=cancel, progress=progress,
+                max_count=max_count, diagnostics=diagnostics, stats=stats,
+                whole_file=whole_file)
+        elif workers <= 1:
+            results = self._search_serial(file_paths, compiled_queries,
+                                          progress, max_count, diagnostics,
+                                          stats, whole_file)
+        else:
+            results = self._search_in_folder_parallel(
+                file_paths, queries, workers, chunk_size, ordered, progress,
+                max_count, diagnostics, stats, whole_file)
+        return results
+
+    # Serve unchanged files from the result cache and search the rest
+    def _search_memoized(self, folder_path, queries, file_paths, search,
+                         max_count=None, whole_file=False, cancel=None,
+                         progress=None, diagnostics=None):
+        """
+        Yields a folder search's results through self.result_cache, in walk
+        order. Walked files are looked up a batch at a time: unchanged files
+        replay their stored results as soon as their turn comes, and the
+        rest are fed to search(paths, progress=..., diagnostics=...), which
+        runs on a background thread so neither side waits for the whole
+        walk. Fresh results are stored once the search finishes, except for
+        files it failed on.
+        """
+        cache = self.result_cache
+        key = cache.query_key(queries, max_count, whole_file, EXTRACTOR_VERSION)
+        if diagnostics is None:
+            diagnostics = []
+        first_diagnostic = len(diagnostics)
+        window = collections.deque()   # _MemoFiles in walk order, not yet yielded
+        running = {}              # path -> _MemoFile handed to the search
+        walked = []               # (path, mtime_ns, size) for the fingerprint
+        searched = []             # _MemoFiles the search finished
+        fresh = {}                # path -> rows to store; None once too big
+        fresh_bytes = 0
+        paths = queue.Queue()     # Paths for the search thread; None ends them
+        events = queue.Queue(RESULT_CACHE_QUEUE_DEPTH)
+        stop = threading.Event()
+        thread = None
+
+        def feed():
+            while True:
+                path = paths.get()
+                if path is None:
+                    return
+                yield path
+
+        def on_file(path):
+            # Called after the file's results, so it marks the file done
+            _put(events, ((path, None), False, None), stop)
+
+        def start():
+            results = ((split_archive_path(res.file_path)[0], res) for res in
+                       search(feed(), progress=on_file, diagnostics=diagnostics))
+            worker = threading.Thread(target=_produce,
+                                      args=(results, events, stop), daemon=True)
+            worker.start()
+            return worker
+
+        def handle(item):
+            nonlocal fresh, fresh_bytes
+            path, res = item
+            entry = running.get(path)
+            if entry is None:
+                return
+            if res is not None:
+                entry.results.append(res)
+                if fresh is not None:
+                    fresh.setdefault(path, []).append(_result_row(path, res))
+                    fresh_bytes += len(res.line_content) + len(res.match_group) + 64
+                    if fresh_bytes > RESULT_CACHE_BUFFER_BYTES:
+                        fresh = None
+                return
+            entry.done = True
+            searched.append(entry)
+            del running[path]
+
+        def ready():
+            # Yield from the front of the window until a file is unfinished
+            while window:
+                entry = window[0]
+                if entry.rows is not None:
+                    for row in entry.rows:
+                        yield _row_result(entry.path, row)
+                    entry.rows = ()
+                results, entry.results = entry.results, []
+                yield from results
+                if not entry.done:
+                    return
+                window.popleft()
+                if progress is not None:
+                    progress(entry.path)
+
+        def drain(block):
+            # Returns False once the search thread has ended
+            while True:
+                try:
+                    item, done, error = events.get(block)
+                except queue.Empty:
+                    return True
+                if error is not None:
+                    raise error
+                if done:
+                    return False
+                handle(item)
+
+        searching = False
+        try:
+            batches = _chunked((path for path in file_paths if not cache.owns(path)),
+                               RESULT_CACHE_LOOKUP_BATCH)
+            for batch in batches:
+                files = []
+                for path in batch:
+                    try:
+                        st = os.stat(path)
+                        files.append((path, st.st_mtime_ns, st.st_size))
+                    except OSError:
+                        files.append((path, None, None))   # Let the search report it
+                cached = cache.lookup(key, files)
+                for path, mtime_ns, size in files:
+                    entry = _MemoFile(path, mtime_ns, size, cached.get(path))
+                    window.append(entry)
+                    if entry.rows is None:
+                        running[path] = entry
+                        paths.put(path)
+                        if thread is None:
+                            thread = start()
+                            searching = True
+                walked.extend(files)
+                if searching:
+                    searching = drain(False)
+                yield from ready()
+                while searching and len(window) > RESULT_CACHE_WALK_AHEAD:
+                    searching = drain(True)
+                    yield from ready()
+                if cancel is not None and cancel.is_set():
+                    break
+            paths.put(None)
+            while searching:
+                searching = drain(True)
+                yield from ready()
+            # Files the search never finished (cancelled or out of time)
+            for entry in running.values():
+                entry.done = True
+            if cancel is None or not cancel.is_set():
+                yield from ready()
+        finally:
+            stop.set()
+            paths.put(None)
+            if thread is not None:
+                while thread.is_alive():
+                    try:
+                        events.get(timeout=0.05)
+                    except queue.Empty:
+                        pass
+        if fresh is None or (cancel is not None and cancel.is_set()):
+            return
+        errors = diagnostics[first_diagnostic:]
+        failed = {split_archive_path(d.file_path)[0] for d in errors if d.file_path}
+        cache.store(key, [(entry.path, entry.mtime_ns, entry.size,
+                           fresh.get(entry.path, []))
+                          for entry in searched if entry.path not in failed])
+        if not errors and not running:
+            cache.finish(key, folder_path, cache.fingerprint(walked))
+
+    def _search_serial(self, file_paths, compiled_queries, progress=None,
+                       max_count=None, diagnostics=None, stats=None,
+                       whole_file=False):
+        for file_path in file_paths:
+            if stats is None:
+                yield from _search_file(file_path, compiled_queries,
+                                        self.cache, max_count, diagnostics,
+                                        whole_file=whole_file)
+            else:
+                yield from _search_file_timed(file_path, compiled_queries,
+                                              self.cache, max_count,
+                                              diagnostics, stats, whole_file)
+            if progress is not None:
+                progress(file_path)
+
+    # Search a single file
+    def search_in_file(self, file_path, pattern, flags=0, whole_file=False):
+        """Yields a SearchResult for every match in one file."""
+        compiled_queries = _compile_queries([(None, pattern, flags)])
+        return _search_file(file_path, compiled_queries, self.cache,
+                            whole_file=whole_file)
+
+    # Fan file chunks out to a process pool, keeping a bounded number in flight
+    def _search_in_folder_parallel(self, file_paths, queries, workers,
+                                   chunk_size, ordered, progress=None,
+                                   max_count=None, diagnostics=None,
+                                   stats=None, whole_file=False):
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunks = _chunked(file_paths, max(1, chunk_size))
+        max_pending = workers * 4
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = []
+            for chunk in chunks:
+                future = executor.submit(
+                    _search_file_batch, chunk, queries, self.cache, max_count,
+                    stats, whole_file)
+                future.file_paths = chunk
+                pending.append(future)
+                if len(pending) >= max_pending:
+                    yield from self._drain_completed(
+                        pending, ordered, progress, diagnostics, stats)
+            while pending:
+                yield from self._drain_completed(
+                    pending, ordered, progress, diagnostics, stats)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    # Yield results from finished chunks, removing them from `pending`
+    def _drain_completed(self, pending, ordered, progress=None,
+                         diagnostics=None, stats=None):
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        if ordered:
+            done = [pending.pop(0)]
+        else:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            done = [f for f in pending if f in finished]
+            pending[:] = [f for f in pending if f not in finished]
+        for future in done:
+            results, counters, errors, chunk_stats = future.result()
+            _merge_cache_counters(self.cache, counters)
+            if diagnostics is not None:
+                diagnostics.extend(errors)
+            if stats is not None:
+                stats.merge(chunk_stats)
+            for file_path, file_results in zip(future.file_paths, results):
+                yield from file_results
+                if progress is not None:
+                    progress(file_path)
+
+    # Build or refresh the trigram index of a folder
+    def build_index(self, folder_path, index_path=None):
+        """
+        Indexes the text of every file under folder_path, re-reading only
+        files whose mtime or size changed since the last build. Returns
+        counts of added, updated, removed and unchanged files.
+        """
+        index = _open_index(folder_path, index_path)
+        try:
+            return index.update(walk_files(folder_path),
+                                lambda path: _file_chunks(path, self.cache))
+        finally:
+            index.close()
+
+    # Search only the files the trigram index says can match
+    def search_indexed(self, folder_path, pattern, flags=0, index_path=None):
+        """
+        Same results as search_in_folder, but the folder's trigram index
+        (refreshed first) narrows the files that are actually opened.
+        """
+        compiled_queries = _compile_queries([(None, pattern, flags)])
+        file_paths = list(walk_files(folder_path))
+        index = _open_index(folder_path, index_path)
+        try:
+            index.update(file_paths, lambda path: _file_chunks(path, self.cache))
+            candidates = index.candidates(pattern, flags)
+        finally:
+            index.close()
+        for file_path in file_paths:
+            if file_path in candidates:
+                yield from _search_file(file_path, compiled_queries, self.cache)
 
     # Export results to CSV
     def export_results_to_csv(self, results, output_path):
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["File Name", "Line Number",
-                            "Matched Text", "Full Line"])
-            for res in results:
-                writer.writerow([res.file_name, res.line_number,
-                                res.match_group, res.line_content])
+        """Streams results to a CSV report; returns the number of rows."""
+        return self.export_results(results, output_path, "csv")
+
+    # Export results in any supported format
+    def export_results(self, results, output_path, fmt=None, compression=None,
+                       context=0):
+        """
+        Streams results (any iterable, e.g. a search generator) to a CSV,
+        JSON Lines or Parquet file, optionally gzip- or zstd-compressed,
+        with `context` lines around each match. See export.export_results
+        for the details.
+        """
+        try:
+            from .export import export_results
+        except ImportError:                     # Running as a script from src/
+            from export import export_results
+        return export_results(results, output_path, fmt, compression,
+                              context=context,
+                              context_reader=ContextReader(self.cache))
 
     # Save and load queries
     def save_queries(self, queries, file_path="saved_queries.json"):
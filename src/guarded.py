@@ -0,0 +1,209 @@
+"""
+Time-budgeted folder search. Each file is searched in a worker process
+that owns a private pipe, so a worker stuck on one file (a pattern
+backtracking catastrophically, a parser looping on a corrupt document) can
+be terminated and replaced without disturbing the others.
+"""
+import copy
+import time
+import multiprocessing
+from multiprocessing.connection import wait
+
+try:
+    from .core import (SearchDiagnostic, _cache_counters, _compile_queries,
+                       _merge_cache_counters, _search_file, _search_file_timed)
+except ImportError:                             # Running as a script from src/
+    from core import (SearchDiagnostic, _cache_counters, _compile_queries,
+                      _merge_cache_counters, _search_file, _search_file_timed)
+
+# Longest the parent waits between checks of budgets and cancellation
+POLL_INTERVAL_S = 0.1
+
+# --- Worker Process ---
+
+
+def _worker_main(conn, queries, cache, max_count, stats, whole_file):
+    """Searches one file per request until it receives None."""
+    compiled_queries = _compile_queries(queries)
+    while True:
+        file_path = conn.recv()
+        if file_path is None:
+            return
+        diagnostics = []
+        if stats is None:
+            file_stats = None
+            results = list(_search_file(file_path, compiled_queries, cache,
+                                        max_count, diagnostics,
+                                        whole_file=whole_file))
+        else:
+            file_stats = stats.spawn()
+            results = _search_file_timed(file_path, compiled_queries, cache,
+                                         max_count, diagnostics, file_stats,
+                                         whole_file)
+        conn.send((results, _cache_counters(cache), diagnostics, file_stats))
+
+
+class _Worker:
+    """A worker process, its end of the pipe and the file it is searching."""
+
+    def __init__(self, queries, cache, max_count, stats, whole_file):
+        self.conn, child_conn = multiprocessing.Pipe()
+        # Copy through TextCache.__getstate__ so a forked child opens its own
+        # connection and starts with zeroed counters
+        cache = copy.copy(cache)
+        self.process = multiprocessing.Process(
+            target=_worker_main,
+            args=(child_conn, queries, cache, max_count, stats, whole_file),
+            daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.task = None          # (index, file_path) being searched
+        self.started = None       # time.monotonic() when the task was sent
+
+    def submit(self, index, file_path):
+        self.task = (index, file_path)
+        self.started = time.monotonic()
+        self.conn.send(file_path)
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        if self.process.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+# --- Scheduler ---
+
+
+def search_guarded(file_paths, queries, workers, cache=None, timeout=None,
+                   total_timeout=None, ordered=True, cancel=None,
+                   progress=None, max_count=None, diagnostics=None,
+                   stats=None, whole_file=False):
+    """
+    Yields SearchResults for (name, pattern, flags) queries over file_paths
+    using `workers` killable processes. A file still running after
+    `timeout` seconds has its worker terminated and is reported as a
+    "timeout" diagnostic; once `total_timeout` seconds have passed, files
+    in flight are reported the same way and an "incomplete" diagnostic
+    marks that the rest were not searched. With ordered=True results come
+    back in file_paths order. Worker timings are merged into `stats`, and
+    whole_file=True matches over each file's whole text.
+    """
+    if diagnostics is None:
+        diagnostics = []
+    deadline = None if total_timeout is None else time.monotonic() + total_timeout
+    paths = enumerate(file_paths)
+    pool = [_Worker(queries, cache, max_count, stats, whole_file)
+            for _ in range(workers)]
+    finished = {}                 # index -> (path, results), waiting their turn
+    next_index = 0                # next index to yield when ordered
+    exhausted = False
+
+    def done(worker, results):
+        index, file_path = worker.task
+        worker.task = None
+        finished[index] = (file_path, results)
+
+    def hand_back(index):
+        # Progress follows the results, as in the other search paths
+        file_path, results = finished.pop(index)
+        yield from results
+        if progress is not None:
+            progress(file_path)
+
+    def abandon(worker, kind, message, respawn=True):
+        diagnostics.append(SearchDiagnostic(worker.task[1], kind, message))
+        worker.kill()
+        done(worker, [])
+        if respawn:
+            pool[pool.index(worker)] = _Worker(queries, cache, max_count,
+                                               stats, whole_file)
+        else:
+            pool.remove(worker)
+
+    try:
+        while True:
+            # Keep every idle worker busy
+            for worker in pool:
+                if worker.task is None and not exhausted:
+                    item = next(paths, None)
+                    if item is None:
+                        exhausted = True
+                    else:
+                        worker.submit(*item)
+            busy = [worker for worker in pool if worker.task is not None]
+            if not busy:
+                break
+
+            # Wait for a reply, but no longer than the nearest budget
+            now = time.monotonic()
+            wait_for = POLL_INTERVAL_S
+            if timeout is not None:
+                wait_for = min(wait_for, min(
+                    w.started + timeout for w in busy) - now)
+            if deadline is not None:
+                wait_for = min(wait_for, deadline - now)
+            ready = wait([w.conn for w in busy], max(0.0, wait_for))
+            for worker in busy:
+                if worker.task is None or worker.conn not in ready:
+                    continue
+                try:
+                    results, counters, errors, file_stats = worker.conn.recv()
+                except (EOFError, OSError):
+                    abandon(worker, "error",
+                            f"worker exited with code {worker.process.exitcode}")
+                    continue
+                _merge_cache_counters(cache, counters)
+                diagnostics.extend(errors)
+                if stats is not None:
+                    stats.merge(file_stats)
+                done(worker, results)
+
+            now = time.monotonic()
+            if cancel is not None and cancel.is_set():
+                break
+            if deadline is not None and now >= deadline:
+                for worker in [w for w in pool if w.task is not None]:
+                    abandon(worker, "timeout",
+                            f"overall time budget of {total_timeout}s exceeded",
+                            respawn=False)
+                if not exhausted and next(paths, None) is not None:
+                    diagnostics.append(SearchDiagnostic(
+                        None, "incomplete",
+                        f"search stopped after {total_timeout}s; "
+                        f"remaining files were not searched"))
+                exhausted = True
+            elif timeout is not None:
+                for worker in [w for w in pool if w.task is not None]:
+                    if now - worker.started >= timeout:
+                        abandon(worker, "timeout",
+                                f"file took longer than {timeout}s")
+
+            # Hand back whatever is ready, in order if requested
+            if ordered:
+                while next_index in finished:
+                    yield from hand_back(next_index)
+                    next_index += 1
+            else:
+                for index in sorted(finished):
+                    yield from hand_back(index)
+        for index in sorted(finished):
+            yield from hand_back(index)
+    finally:
+        for worker in pool:
+            if worker.task is None:
+                worker.stop()
+            else:
+                worker.kill()
@@ -0,0 +1,132 @@
+"""
+.gitignore-style ignore files. Each ignore file applies to the folder it
+sits in and everything below it; rules are checked in order from the top
+of the walk down and the last rule that matches a path decides whether it
+is ignored, so a deeper file can re-include what a shallower one ignored.
+"""
+import re
+
+# Ignore files read in every folder when a search respects ignore rules
+DEFAULT_IGNORE_FILES = (".gitignore", ".ignore")
+
+# Version-control metadata folders skipped whenever ignore rules are used
+VCS_DIRS = (".git", ".hg", ".svn")
+
+# --- Pattern Translation ---
+
+
+def _translate(glob):
+    """Translates a gitignore glob (without its leading "/") into a regex."""
+    parts = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i) and (i == 0 or glob[i - 1] == "/"):
+            parts.append("(?:.*/)?")            # zero or more folders
+            i += 3
+        elif glob.startswith("**", i) and i + 2 == n and (i == 0 or glob[i - 1] == "/"):
+            parts.append(".*")                  # everything inside
+            i += 2
+        elif c == "*":
+            parts.append("[^/]*")
+            i += 1
+        elif c == "?":
+            parts.append("[^/]")
+            i += 1
+        elif c == "[":
+            start = i + 2 if glob[i + 1:i + 2] in ("!", "^") else i + 1
+            # A "]" right after the opening bracket is part of the class
+            end = glob.find("]", start + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+                continue
+            body = glob[i + 1:end]
+            if body[0] in "!^":
+                body = "^" + body[1:]
+            parts.append("[" + body.replace("\\", "\\\\") + "]")
+            i = end + 1
+        elif c == "\\" and i + 1 < n:
+            parts.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+    return re.compile("".join(parts), re.DOTALL)
+
+
+class IgnoreRule:
+    """One line of an ignore file, relative to the folder `base`."""
+
+    __slots__ = ("base", "regex", "negate", "dir_only", "anchored")
+
+    def __init__(self, line, base=""):
+        self.negate = line.startswith("!")
+        if self.negate:
+            line = line[1:]
+        self.dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        # A slash anywhere but the end ties the glob to the ignore file's folder
+        self.anchored = "/" in line
+        self.base = base
+        self.regex = _translate(line.lstrip("/"))
+
+    def matches(self, rel_path, is_dir):
+        """Matches a "/"-separated path relative to the top of the walk."""
+        if self.dir_only and not is_dir:
+            return False
+        if not rel_path.startswith(self.base):
+            return False
+        rel_path = rel_path[len(self.base):]
+        if not self.anchored:
+            rel_path = rel_path.rpartition("/")[2]
+        return self.regex.fullmatch(rel_path) is not None
+
+
+def parse_ignore_file(file_path, base=""):
+    """
+    Returns the IgnoreRules in an ignore file, or an empty list if it cannot
+    be read. `base` is the file's folder relative to the top of the walk,
+    ending in "/" (or "" for the top itself).
+    """
+    try:
+        with open(file_path, encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+    rules = []
+    for line in lines:
+        # "\#" and "\!" escapes are handled by _translate like any other
+        if not line or line.startswith("#"):
+            continue
+        # Trailing spaces are dropped unless escaped
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        if stripped.strip("!/"):
+            rules.append(IgnoreRule(stripped, base))
+    return rules
+
+# --- Rule Sets ---
+
+
+class IgnoreRules:
+    """The ignore rules in effect for one folder of a walk."""
+
+    __slots__ = ("rules",)
+
+    def __init__(self, rules=()):
+        self.rules = tuple(rules)
+
+    def extend(self, rules):
+        """Returns the rules for a subfolder that adds its own `rules`."""
+        if not rules:
+            return self
+        return IgnoreRules(self.rules + tuple(rules))
+
+    def ignored(self, rel_path, is_dir=False):
+        """Returns True if the last rule matching rel_path ignores it."""
+        for rule in reversed(self.rules):
+            if rule.matches(rel_path, is_dir):
+                return not rule.negate
+        return False
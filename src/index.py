@@ -0,0 +1,153 @@
+import os
+import sqlite3
+
+try:
+    from .core import DEFAULT_INDEX_NAME
+    from .patterns import fold_case, required_query
+except ImportError:                             # Running as a script from src/
+    from core import DEFAULT_INDEX_NAME
+    from patterns import fold_case, required_query
+
+# --- Trigram Helpers ---
+
+
+def trigrams(text):
+    """Returns the set of three-character substrings of text."""
+    # Deduplicating character tuples first is about twice as fast as slicing
+    return {"".join(gram) for gram in set(zip(text, text[1:], text[2:]))}
+
+
+def text_trigrams(chunks):
+    """Collects the case-folded trigrams of streamed text chunks."""
+    grams = set()
+    tail = ""
+    for chunk in chunks:
+        text = tail + fold_case(chunk)
+        grams.update(trigrams(text))
+        tail = text[-2:]
+    return grams
+
+# --- Persistent Trigram Index ---
+
+
+class TrigramIndex:
+    """
+    Inverted index from case-folded trigrams to the files containing them,
+    stored in SQLite. Paths are kept relative to the indexed folder and
+    re-indexed only when their mtime or size changes.
+    """
+
+    def __init__(self, folder_path, index_path=None):
+        self.folder_path = folder_path
+        self.index_path = index_path or os.path.join(
+            folder_path, DEFAULT_INDEX_NAME)
+        self._conn = sqlite3.connect(self.index_path, timeout=30)
+        self._conn.executescript(
+            "PRAGMA journal_mode=WAL;"
+            "PRAGMA synchronous=NORMAL;"
+            "PRAGMA cache_size=-65536;"
+            "CREATE TABLE IF NOT EXISTS files ("
+            " id INTEGER PRIMARY KEY, path TEXT UNIQUE,"
+            " mtime_ns INTEGER, size INTEGER);"
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " trigram TEXT, file_id INTEGER,"
+            " PRIMARY KEY (trigram, file_id)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS postings_file ON postings(file_id);")
+
+    # Bring the index in line with the folder, touching only changed files
+    def update(self, file_paths, extract):
+        """
+        Re-indexes files whose mtime or size changed and drops files that
+        are gone. `extract(path)` must yield the file's text in chunks.
+        Returns counts of added, updated, removed and unchanged files.
+        """
+        known = {path: (file_id, mtime, size) for file_id, path, mtime, size
+                 in self._conn.execute(
+                     "SELECT id, path, mtime_ns, size FROM files")}
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        seen = set()
+        own_files = os.path.abspath(self.index_path)
+        with self._conn:
+            for file_path in file_paths:
+                # Skip the database itself along with its -wal/-journal files
+                if os.path.abspath(file_path).startswith(own_files):
+                    continue
+                rel = os.path.relpath(file_path, self.folder_path)
+                seen.add(rel)
+                try:
+                    st = os.stat(file_path)
+                except OSError:
+                    continue
+                entry = known.get(rel)
+                if entry and entry[1:] == (st.st_mtime_ns, st.st_size):
+                    counts["unchanged"] += 1
+                    continue
+                try:
+                    grams = text_trigrams(extract(file_path))
+                except Exception:
+                    grams = set()
+                if entry:
+                    file_id = entry[0]
+                    self._conn.execute(
+                        "DELETE FROM postings WHERE file_id = ?", (file_id,))
+                    self._conn.execute(
+                        "UPDATE files SET mtime_ns = ?, size = ? WHERE id = ?",
+                        (st.st_mtime_ns, st.st_size, file_id))
+                    counts["updated"] += 1
+                else:
+                    file_id = self._conn.execute(
+                        "INSERT INTO files (path, mtime_ns, size)"
+                        " VALUES (?, ?, ?)",
+                        (rel, st.st_mtime_ns, st.st_size)).lastrowid
+                    counts["added"] += 1
+                self._conn.executemany(
+                    "INSERT INTO postings VALUES (?, ?)",
+                    ((gram, file_id) for gram in sorted(grams)))
+            for rel, (file_id, _, _) in known.items():
+                if rel not in seen:
+                    self._conn.execute(
+                        "DELETE FROM postings WHERE file_id = ?", (file_id,))
+                    self._conn.execute(
+                        "DELETE FROM files WHERE id = ?", (file_id,))
+                    counts["removed"] += 1
+        return counts
+
+    # Narrow the indexed files to those that can contain a match
+    def candidates(self, pattern, flags=0):
+        """Returns the set of indexed paths that may contain a match."""
+        file_ids = self._evaluate(required_query(pattern, flags))
+        rows = self._conn.execute("SELECT id, path FROM files").fetchall()
+        return {os.path.join(self.folder_path, path)
+                for file_id, path in rows
+                if file_ids is None or file_id in file_ids}
+
+    def _evaluate(self, query):
+        """Resolves a required-literal query to a set of file ids (None = all)."""
+        if query is None:
+            return None
+        if isinstance(query, str):
+            grams = trigrams(query)
+            if not grams:
+                return None
+            result = None
+            for gram in grams:
+                ids = {row[0] for row in self._conn.execute(
+                    "SELECT file_id FROM postings WHERE trigram = ?", (gram,))}
+                result = ids if result is None else result & ids
+                if not result:
+                    break
+            return result
+        op, items = query
+        sets = [self._evaluate(item) for item in items]
+        if op == "and":
+            known = [s for s in sets if s is not None]
+            return set.intersection(*known) if known else None
+        if any(s is None for s in sets):
+            return None
+        return set.union(*sets)
+
+    def file_count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
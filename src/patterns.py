@@ -0,0 +1,551 @@
+import functools
+import re
+
+# --- Regex Parser Access ---
+try:
+    from re import _parser as sre_parse         # Python 3.11+
+    from re import _constants as sre_constants
+except ImportError:                             # Python 3.10
+    import sre_parse
+    import sre_constants
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+            getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+_ASSERTS = {sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+# Anchors that behave differently on a lone line than inside a buffer
+_UNSAFE_ANCHORS = {sre_constants.AT_BEGINNING_STRING,
+                   sre_constants.AT_END_STRING,
+                   sre_constants.AT_NON_BOUNDARY}
+# Anchors that pin a match to the start of the string or of a line
+_START_ANCHORS = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+# Single-node repeat bodies that can match many different characters
+_WIDE_NODES = {sre_constants.ANY, sre_constants.IN, sre_constants.NOT_LITERAL,
+               sre_constants.CATEGORY}
+
+# Character categories as the class escapes that match them
+_CATEGORY_ESCAPES = {
+    sre_constants.CATEGORY_DIGIT: r"\d", sre_constants.CATEGORY_NOT_DIGIT: r"\D",
+    sre_constants.CATEGORY_SPACE: r"\s", sre_constants.CATEGORY_NOT_SPACE: r"\S",
+    sre_constants.CATEGORY_WORD: r"\w", sre_constants.CATEGORY_NOT_WORD: r"\W"}
+
+# Number of (pattern, flags) pairs compile_pattern keeps compiled
+PATTERN_CACHE_SIZE = 1024
+
+# Backtracking risk levels reported by analyze_pattern, lowest first
+RISK_LEVELS = ("none", "low", "medium", "high")
+
+# --- Compiled Pattern Cache ---
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def compile_pattern(pattern, flags=0):
+    """
+    Returns re.compile(pattern, flags), compiled once per process and kept
+    in a bounded LRU cache shared by every search. Raises re.error for an
+    invalid pattern; failures are not cached.
+    """
+    return re.compile(pattern, flags)
+
+# --- Pattern Analysis ---
+
+
+def parse_pattern(pattern, flags=0):
+    """Parses a regex into the re module's internal node list."""
+    return sre_parse.parse(pattern, flags)
+
+
+def walk_nodes(subpattern):
+    """Yields every (op, argument) node of a parsed pattern, depth first."""
+    for op, av in subpattern:
+        yield op, av
+        if op is sre_constants.SUBPATTERN:
+            yield from walk_nodes(av[-1])
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                yield from walk_nodes(branch)
+        elif op in _REPEATS:
+            yield from walk_nodes(av[2])
+        elif op in _ASSERTS:
+            yield from walk_nodes(av[1])
+        elif op is sre_constants.GROUPREF_EXISTS:
+            yield from walk_nodes(av[1])
+            if av[2] is not None:
+                yield from walk_nodes(av[2])
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            yield from walk_nodes(av)
+
+
+@functools.lru_cache(maxsize=256)
+def is_line_local(pattern, flags=0):
+    """
+    Returns True if the pattern never looks beyond the text it consumes:
+    no lookarounds and no \\A, \\Z or \\B anchors. Such a pattern matches a line
+    the same way whether it sees that line alone or the whole buffer (with
+    MULTILINE), provided no match spans a newline.
+    """
+    try:
+        nodes = parse_pattern(pattern, flags)
+    except Exception:
+        return False
+    for op, av in walk_nodes(nodes):
+        if op in _ASSERTS:
+            return False
+        if op is sre_constants.AT and av in _UNSAFE_ANCHORS:
+            return False
+    return True
+
+
+
+class PatternRiskError(re.error):
+    """Raised by check_pattern for a pattern judged too risky to run."""
+
+
+class PatternAnalysis:
+    """
+    Static facts about a regex, worked out from its parse tree:
+
+    literals          strings some match must contain (case-folded under
+                      IGNORECASE), sorted
+    anchored          True if matches can only start at a line or string start
+    line_local        True if the pattern is safe for whole-buffer search
+    min_length,
+    max_length        bounds on match length; max_length is None if unbounded
+    backtracking_risk one of RISK_LEVELS: "high" for nested unbounded repeats
+                      whose iterations can split text more than one way
+                      (exponential), "medium" for several wide unbounded
+                      repeats or backreferences next to one (polynomial),
+                      "low" for other unbounded repeats and "none" otherwise
+    strategy          "literal" when a plain substring search would do,
+                      "prefilter" when required literals can skip lines,
+                      "scan" when every line must go through the regex
+    cost              "low", "medium" or "high" estimate for a large search
+    """
+
+    def __init__(self, pattern, flags, nodes):
+        self.pattern = pattern
+        self.flags = flags
+        ignore_case = bool(nodes.state.flags & re.IGNORECASE)
+        query = required_query(pattern, flags, fold=ignore_case)
+        self.literals = sorted(set(_query_literals(query)))
+        self.anchored = _is_anchored(nodes)
+        self.line_local = is_line_local(pattern, flags)
+        min_length, max_length = nodes.getwidth()
+        self.min_length = min_length
+        self.max_length = None if max_length >= sre_constants.MAXREPEAT else max_length
+        self.backtracking_risk = _backtracking_risk(nodes)
+        if (not ignore_case and nodes
+                and all(op is sre_constants.LITERAL for op, _ in nodes)):
+            self.strategy = "literal"
+        elif literal_prefilter(pattern, flags) is not None:
+            self.strategy = "prefilter"
+        else:
+            self.strategy = "scan"
+        risk = RISK_LEVELS.index(self.backtracking_risk)
+        if risk == 3 or (risk == 2 and self.strategy == "scan"):
+            self.cost = "high"
+        elif self.strategy == "literal" or risk <= 1 and (
+                self.strategy == "prefilter" or self.anchored):
+            self.cost = "low"
+        else:
+            self.cost = "medium"
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in (
+            "pattern", "flags", "literals", "anchored", "line_local",
+            "min_length", "max_length", "backtracking_risk", "strategy",
+            "cost")}
+
+
+@functools.lru_cache(maxsize=PATTERN_CACHE_SIZE)
+def analyze_pattern(pattern, flags=0):
+    """Returns a PatternAnalysis; raises re.error for an invalid pattern."""
+    compile_pattern(pattern, flags)
+    return PatternAnalysis(pattern, flags, parse_pattern(pattern, flags))
+
+
+def check_pattern(pattern, flags=0, max_risk="medium"):
+    """
+    Returns the compiled pattern, or raises PatternRiskError if its
+    backtracking risk is above max_risk (a RISK_LEVELS name).
+    """
+    compiled = compile_pattern(pattern, flags)
+    analysis = analyze_pattern(pattern, flags)
+    if RISK_LEVELS.index(analysis.backtracking_risk) > RISK_LEVELS.index(max_risk):
+        raise PatternRiskError(
+            f"{analysis.backtracking_risk} catastrophic-backtracking risk",
+            pattern)
+    return compiled
+
+
+def _query_literals(query):
+    if query is None:
+        return
+    if isinstance(query, str):
+        yield query
+        return
+    for item in query[1]:
+        yield from _query_literals(item)
+
+
+def _is_anchored(nodes):
+    """True if the first thing a pattern does is assert a start anchor."""
+    if not nodes:
+        return False
+    op, av = nodes[0]
+    if op is sre_constants.AT:
+        return av in _START_ANCHORS
+    if op is sre_constants.SUBPATTERN:
+        return _is_anchored(av[-1])
+    if op is getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _is_anchored(av)
+    if op is sre_constants.BRANCH:
+        return all(_is_anchored(branch) for branch in av[1])
+    return False
+
+
+def _backtracking_risk(nodes):
+    counts = {"unbounded": 0, "wide": 0, "nested": False, "backrefs": False,
+              "flags": nodes.state.flags}
+    _scan_repeats(nodes, False, counts)
+    if counts["nested"]:
+        return "high"
+    if counts["wide"] >= 2 or counts["backrefs"] and counts["unbounded"]:
+        return "medium"
+    return "low" if counts["unbounded"] else "none"
+
+
+def _scan_repeats(nodes, in_repeat, counts):
+    """
+    Counts unbounded repeats, noting ones nested inside another unbounded
+    repeat (star height above one) unless the outer body is delimited.
+    Possessive repeats and atomic groups never backtrack into their body,
+    so nesting restarts inside them.
+    """
+    for op, av in nodes:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            unbounded = av[1] >= sre_constants.MAXREPEAT
+            body = av[2]
+            if unbounded:
+                counts["unbounded"] += 1
+                counts["nested"] = counts["nested"] or in_repeat
+                if len(body) == 1 and body[0][0] in _WIDE_NODES:
+                    counts["wide"] += 1
+            nested = unbounded and not _is_delimited(body, counts["flags"])
+            _scan_repeats(body, in_repeat or nested, counts)
+        elif op is getattr(sre_constants, "POSSESSIVE_REPEAT", None):
+            _scan_repeats(av[2], False, counts)
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            _scan_repeats(av, False, counts)
+        elif op is sre_constants.SUBPATTERN:
+            _scan_repeats(av[-1], in_repeat, counts)
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _scan_repeats(branch, in_repeat, counts)
+        elif op in _ASSERTS:
+            _scan_repeats(av[1], in_repeat, counts)
+        elif op is sre_constants.GROUPREF:
+            counts["backrefs"] = True
+        elif op is sre_constants.GROUPREF_EXISTS:
+            counts["backrefs"] = True
+            _scan_repeats(av[1], in_repeat, counts)
+            if av[2] is not None:
+                _scan_repeats(av[2], in_repeat, counts)
+
+
+def _is_delimited(body, flags):
+    """
+    True if a repeated body splits text into iterations in only one way:
+    each unbounded repeat in it repeats a single character class and is
+    followed (wrapping around to the body's start) by a character it cannot
+    match, as in (\\w+\\.)+ or (?:\\d+,)*.
+    """
+    while len(body) == 1 and body[0][0] is sre_constants.SUBPATTERN:
+        body = body[0][1][-1]
+    body = list(body)
+    found = False
+    for index, (op, av) in enumerate(body):
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if len(av[2]) != 1 or av[2][0][0] in _REPEATS:
+                return False
+            if av[1] < sre_constants.MAXREPEAT:
+                continue
+            follower = body[(index + 1) % len(body)]
+            chars = _literal_chars(follower, flags)
+            if (follower is body[index] or chars is None
+                    or any(_node_matches(av[2][0], char, flags) for char in chars)):
+                return False
+            found = True
+        elif any(sub_op in _REPEATS for sub_op, _ in walk_nodes([(op, av)])):
+            return False
+    return found
+
+
+def _literal_chars(node, flags):
+    """The characters a one-character node matches, or None if not a few."""
+    op, av = node
+    if op is sre_constants.LITERAL:
+        chars = [chr(av)]
+    elif op is sre_constants.IN:
+        chars = []
+        for item_op, item_av in av:
+            if item_op is sre_constants.LITERAL:
+                chars.append(chr(item_av))
+            elif item_op is sre_constants.RANGE and item_av[1] - item_av[0] < 256:
+                chars.extend(map(chr, range(item_av[0], item_av[1] + 1)))
+            else:
+                return None
+    else:
+        return None
+    # Cased letters match other characters under IGNORECASE; stay cautious
+    if flags & re.IGNORECASE and any(c.lower() != c.upper() for c in chars):
+        return None
+    return chars
+
+
+def _node_matches(node, char, flags):
+    """True if a one-character node can match char; True when unsure."""
+    op, av = node
+    if op is sre_constants.LITERAL:
+        return ord(char) == av or bool(flags & re.IGNORECASE)
+    if op is sre_constants.NOT_LITERAL:
+        return ord(char) != av
+    if op is sre_constants.ANY:
+        return char != "\n" or bool(flags & re.DOTALL)
+    if op is sre_constants.CATEGORY:
+        return _category_matches(av, char, flags)
+    if op is sre_constants.IN:
+        negate = bool(av) and av[0][0] is sre_constants.NEGATE
+        for item_op, item_av in av[1:] if negate else av:
+            if item_op is sre_constants.LITERAL:
+                hit = ord(char) == item_av
+            elif item_op is sre_constants.RANGE:
+                hit = item_av[0] <= ord(char) <= item_av[1]
+            elif item_op is sre_constants.CATEGORY:
+                hit = _category_matches(item_av, char, flags)
+            else:
+                return True
+            if hit:
+                return not negate
+        return negate
+    return True
+
+
+def _category_matches(category, char, flags):
+    escape = _CATEGORY_ESCAPES.get(category)
+    if escape is None:
+        return True
+    return re.fullmatch(escape, char, flags & (re.ASCII | re.LOCALE)) is not None
+
+# --- Case Folding ---
+
+
+def _build_fold_table():
+    """Maps characters the re module treats as case-equivalent to one form."""
+    try:
+        from re._casefix import _EXTRA_CASES as extra_cases   # Python 3.11+
+    except ImportError:
+        try:
+            from sre_compile import _ignorecase_fixes as extra_cases
+        except ImportError:
+            extra_cases = {}
+    table = {}
+    for lower, others in extra_cases.items():
+        group = (lower,) + others
+        canonical = min(group)
+        for codepoint in group:
+            if codepoint != canonical:
+                table[codepoint] = canonical
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_case(text):
+    """
+    Lower-cases text so that any two strings an IGNORECASE regex considers
+    equal fold to the same string.
+    """
+    if text.isascii():
+        return text.lower()
+    # "İ" is the only character whose lower() is longer than one char
+    return text.replace("İ", "i").lower().translate(_FOLD_TABLE)
+
+# --- Required-Literal Queries ---
+
+
+def required_query(pattern, flags=0, fold=True):
+    """
+    Returns a boolean query over literal strings that any match of the
+    pattern must contain: a literal str, ("and", [...]), ("or", [...]), or
+    None when nothing is required. With fold=True literals are case-folded,
+    so the query holds for the fold_case() form of any matching text; with
+    fold=False they are exact, and case-insensitive parts are left out.
+    """
+    try:
+        nodes = parse_pattern(pattern, flags)
+    except Exception:
+        return None
+    ignore_case = bool(nodes.state.flags & re.IGNORECASE)
+    return _sequence_query(nodes, fold, ignore_case)
+
+
+def _sequence_query(nodes, fold=True, ignore_case=False):
+    """Builds the required query for a concatenation of nodes."""
+    parts = []
+    run = []
+
+    def flush():
+        if run:
+            text = "".join(run)
+            if fold:
+                parts.append(fold_case(text))
+            elif not ignore_case:
+                parts.append(text)
+            run.clear()
+
+    for op, av in nodes:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        if (op in _REPEATS and av[0] >= 1 and len(av[2]) == 1
+                and av[2][0][0] is sre_constants.LITERAL):
+            # x+ always contributes its character on both sides of the run
+            char = chr(av[2][0][1])
+            run.append(char)
+            flush()
+            run.append(char)
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, body = av
+            scoped = ((ignore_case or bool(add_flags & re.IGNORECASE))
+                      and not del_flags & re.IGNORECASE)
+            parts.append(_sequence_query(body, fold, scoped))
+        elif op is sre_constants.BRANCH:
+            parts.append(_or_query([_sequence_query(b, fold, ignore_case)
+                                    for b in av[1]]))
+        elif op in _REPEATS and av[0] >= 1:
+            parts.append(_sequence_query(av[2], fold, ignore_case))
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            parts.append(_sequence_query(av, fold, ignore_case))
+    flush()
+    return _and_query(parts)
+
+
+def _evaluate_query(query, text):
+    """Checks a required-literal query against a str or bytes-like buffer."""
+    if isinstance(query, (str, bytes)):
+        return text.find(query) != -1
+    op, items = query
+    if op == "and":
+        return all(_evaluate_query(item, text) for item in items)
+    return any(_evaluate_query(item, text) for item in items)
+
+
+def _encode_query(query):
+    """Encodes an ASCII-only query for use on bytes, or returns None."""
+    if isinstance(query, str):
+        return query.encode("ascii") if query.isascii() else None
+    items = [_encode_query(item) for item in query[1]]
+    if any(item is None for item in items):
+        return None
+    return (query[0], items)
+
+# --- Literal Prefilter ---
+
+
+class LiteralPrefilter:
+    """
+    A cheap necessary condition for a pattern to match: the literals every
+    match must contain, checked with str.find instead of the regex engine.
+    A False answer from may_match() means the text cannot contain a match.
+    """
+
+    def __init__(self, query, ignore_case):
+        self.query = query
+        self.ignore_case = ignore_case
+        # Byte-level checks only make sense for exact ASCII literals
+        self.bytes_query = None if ignore_case else _encode_query(query)
+
+    def may_match(self, text):
+        if self.ignore_case:
+            # Without a fold table, non-ASCII text may match in ways the
+            # folded literals miss (e.g. "ſ" for "s")
+            if not _FOLD_TABLE and not text.isascii():
+                return True
+            text = fold_case(text)
+        return _evaluate_query(self.query, text)
+
+    def may_match_bytes(self, buffer):
+        """Checks an ASCII bytes buffer (or mmap); True when unsure."""
+        if self.bytes_query is None:
+            return True
+        return _evaluate_query(self.bytes_query, buffer)
+
+
+@functools.lru_cache(maxsize=256)
+def literal_prefilter(pattern, flags=0):
+    """Returns a LiteralPrefilter for the pattern, or None if it has no literals."""
+    if not isinstance(pattern, str):
+        return None
+    try:
+        ignore_case = bool(parse_pattern(pattern, flags).state.flags
+                           & re.IGNORECASE)
+    except Exception:
+        return None
+    query = _selective_query(required_query(pattern, flags, fold=ignore_case))
+    if query is None:
+        return None
+    return LiteralPrefilter(query, ignore_case)
+
+
+def _selective_query(query, min_length=3):
+    """
+    Trims a query to what is worth checking per line: literals shorter than
+    min_length are dropped and an AND keeps only its most selective item.
+    """
+    if query is None or isinstance(query, str):
+        return query if query and len(query) >= min_length else None
+    op, items = query
+    items = [_selective_query(item, min_length) for item in items]
+    if op == "or":
+        return None if any(item is None for item in items) else (op, items)
+    items = [item for item in items if item is not None]
+    if not items:
+        return None
+    return max(items, key=_query_strength)
+
+
+def _query_strength(query):
+    """Length of the shortest literal that a query is sure to require."""
+    if isinstance(query, str):
+        return len(query)
+    strengths = [_query_strength(item) for item in query[1]]
+    return max(strengths) if query[0] == "and" else min(strengths)
+
+
+def _and_query(parts):
+    items = []
+    for part in parts:
+        if part is None or part == "":
+            continue
+        if isinstance(part, tuple) and part[0] == "and":
+            items.extend(part[1])
+        else:
+            items.append(part)
+    if not items:
+        return None
+    return items[0] if len(items) == 1 else ("and", items)
+
+
+def _or_query(parts):
+    items = []
+    for part in parts:
+        if part is None or part == "":
+            return None
+        if isinstance(part, tuple) and part[0] == "or":
+            items.extend(part[1])
+        else:
+            items.append(part)
+    return items[0] if len(items) == 1 else ("or", items)
@@ -0,0 +1,140 @@
+import sqlite3
+
+try:
+    from .core import SearchResult
+except ImportError:                             # Running as a script from src/
+    from core import SearchResult
+
+# Columns a ResultStore view can be sorted by
+SORT_COLUMNS = {"file": "file_name", "line": "line_number", "match": "match_group"}
+
+# --- Result Store ---
+
+
+class ResultStore:
+    """
+    SQLite-backed table of search results for views that show only a window
+    of rows at a time. Sorting and filtering run in SQLite and are
+    materialised as an ordered list of row ids, so fetching any window stays
+    cheap no matter how many results there are. A sorted or filtered view
+    is a snapshot: rows added later appear after refresh_view().
+    """
+
+    def __init__(self, db_path=":memory:"):
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE results ("
+            " id INTEGER PRIMARY KEY, file_path TEXT, file_name TEXT,"
+            " line_number INTEGER, line_content TEXT, match_group TEXT,"
+            " query TEXT, section INTEGER, match_column INTEGER,"
+            " start_offset INTEGER, end_offset INTEGER);"
+            "CREATE TEMP TABLE result_view (id INTEGER);")
+        self._count = 0
+        self.sort_column = None
+        self.descending = False
+        self.filter_text = ""
+        self._view_count = None   # None while the view is insertion order
+
+    # Append a batch of SearchResult objects
+    def add_many(self, results):
+        rows = [(r.file_path, r.file_name, r.line_number, r.line_content,
+                 r.match_group, r.query, r.section, r.column, r.start, r.end)
+                for r in results]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO results (file_path, file_name, line_number,"
+                " line_content, match_group, query, section, match_column,"
+                " start_offset, end_offset)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows)
+        self._count += len(rows)
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM results")
+            self._conn.execute("DELETE FROM result_view")
+        self._count = 0
+        self.sort_column = None
+        self.descending = False
+        self.filter_text = ""
+        self._view_count = None
+
+    def total(self):
+        """Number of stored results, ignoring any filter."""
+        return self._count
+
+    def __len__(self):
+        """Number of rows in the current view."""
+        if self._view_count is None:
+            return self._count
+        return self._view_count
+
+    # Change how rows are ordered and which rows are visible
+    def set_view(self, sort_column=None, descending=False, filter_text=""):
+        """
+        Sorts by one of SORT_COLUMNS (None keeps insertion order) and keeps
+        only rows whose file name or matched text contains filter_text.
+        """
+        if sort_column is not None and sort_column not in SORT_COLUMNS:
+            raise ValueError(f"Unknown sort column: {sort_column}")
+        self.sort_column = sort_column
+        self.descending = descending
+        self.filter_text = filter_text
+        if sort_column is None and not filter_text:
+            self._view_count = None
+            return
+        self._rebuild_view()
+
+    # Bring a sorted or filtered view up to date with newly added rows
+    def refresh_view(self):
+        if self._view_count is not None:
+            self._rebuild_view()
+
+    def _rebuild_view(self):
+        sql = "INSERT INTO result_view SELECT id FROM results"
+        params = ()
+        if self.filter_text:
+            sql += " WHERE instr(file_name, ?) > 0 OR instr(match_group, ?) > 0"
+            params = (self.filter_text, self.filter_text)
+        if self.sort_column is not None:
+            direction = "DESC" if self.descending else "ASC"
+            sql += f" ORDER BY {SORT_COLUMNS[self.sort_column]} {direction}, id"
+        else:
+            sql += " ORDER BY id"
+        with self._conn:
+            self._conn.execute("DELETE FROM result_view")
+            self._conn.execute(sql, params)
+        self._view_count = self._conn.execute(
+            "SELECT COUNT(*) FROM result_view").fetchone()[0]
+
+    # Fetch the rows at view positions [offset, offset + limit)
+    def fetch(self, offset, limit):
+        if self._view_count is None:
+            rows = self._conn.execute(
+                "SELECT file_path, line_number, line_content, match_group,"
+                " query, section, match_column, start_offset, end_offset"
+                " FROM results WHERE id > ? AND id <= ? ORDER BY id",
+                (offset, offset + limit))
+        else:
+            rows = self._conn.execute(
+                "SELECT r.file_path, r.line_number, r.line_content,"
+                " r.match_group, r.query, r.section, r.match_column,"
+                " r.start_offset, r.end_offset"
+                " FROM result_view v JOIN results r ON r.id = v.id"
+                " WHERE v.rowid > ? AND v.rowid <= ? ORDER BY v.rowid",
+                (offset, offset + limit))
+        return [SearchResult(*row) for row in rows]
+
+    def get(self, position):
+        rows = self.fetch(position, 1)
+        return rows[0] if rows else None
+
+    # Iterate every row of the current view, e.g. for exporting
+    def iter_results(self, batch_size=10000):
+        for offset in range(0, len(self), batch_size):
+            yield from self.fetch(offset, batch_size)
+
+    def close(self):
+        self._conn.close()
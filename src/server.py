@@ -0,0 +1,548 @@
+"""
+Long-lived local search server: python -m src.server [--port 8765 | --unix PATH]
+
+Keeps a process pool, compiled patterns and each worker's extracted-text
+cache warm between searches, so clients skip Python start-up, imports and
+re-extraction. Speaks a small HTTP/1.1 + JSON API on localhost (or a Unix
+socket), handles concurrent requests with asyncio and streams results back
+as JSON Lines while the search is still running. Over TCP every request
+must carry "Authorization: Bearer <token>" with the token the server
+writes to a 0600 file at start-up, and a localhost Host header:
+
+    POST /search  {"folder", "pattern", "flags", "whole_file", "include", ...}
+                  -> one JSON object per match, then {"done": true, ...}
+    POST /cancel  {"id"}   stops a running search
+    GET  /stats            request and cache counters
+    GET  /health
+
+SearchClient is the matching thin client used by the CLI's --server option.
+"""
+import os
+import re
+import sys
+import hmac
+import json
+import uuid
+import signal
+import socket
+import secrets
+import asyncio
+import argparse
+import http.client
+
+try:
+    from .cache import TextCache
+    from .core import (SearchDiagnostic, SearchResult, _chunked,
+                       _search_file_batch, walk_files)
+    from .patterns import PatternRiskError, check_pattern
+except ImportError:                             # Running as a script from src/
+    from cache import TextCache
+    from core import (SearchDiagnostic, SearchResult, _chunked,
+                      _search_file_batch, walk_files)
+    from patterns import PatternRiskError, check_pattern
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# File the server writes its access token to and clients read it from
+DEFAULT_TOKEN_PATH = os.path.join(os.path.expanduser("~"), ".regex_search_token")
+
+# Host header names accepted, with or without a port, against DNS rebinding
+_LOCAL_HOSTS = {"localhost", "127.0.0.1", "[::1]"}
+
+# Files sent to a worker per task, and tasks each request keeps in flight
+SERVER_CHUNK_SIZE = 16
+TASKS_PER_WORKER = 2
+
+# Largest request body accepted, in bytes
+MAX_REQUEST_BYTES = 1024 * 1024
+
+# Options of POST /search passed through to walk_files
+_WALK_OPTIONS = ("include", "exclude", "ignore_files", "max_size",
+                 "max_depth", "skip_binary")
+
+_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized",
+            403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+# --- Worker Processes ---
+
+# Each pool process keeps one TextCache (and its SQLite connection) open
+_worker_cache = None
+
+
+def _init_worker(cache_path):
+    global _worker_cache
+    if cache_path:
+        _worker_cache = TextCache(cache_path)
+
+
+def _serve_batch(file_paths, queries, max_count, whole_file=False):
+    """
+    Searches a chunk of files in a pool process and returns the results
+    already encoded as JSON Lines, so the event loop only copies bytes.
+    """
+    results, counters, diagnostics, _ = _search_file_batch(
+        file_paths, queries, _worker_cache, max_count, whole_file=whole_file)
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    lines = [dumps(result_to_dict(res)) + "\n"
+             for file_results in results for res in file_results]
+    diagnostics = [diagnostic_to_dict(d) for d in diagnostics]
+    return "".join(lines).encode("utf-8"), len(lines), counters, diagnostics
+
+
+def result_to_dict(res):
+    return {"file": res.file_path, "line": res.line_number,
+            "match": res.match_group, "content": res.line_content,
+            "section": res.section, "query": res.query, "column": res.column,
+            "start": res.start, "end": res.end}
+
+
+def diagnostic_to_dict(diagnostic):
+    return {"file": diagnostic.file_path, "kind": diagnostic.kind,
+            "message": diagnostic.message}
+
+
+def write_token(path=DEFAULT_TOKEN_PATH):
+    """Writes a new random access token to a file only the user can read."""
+    token = secrets.token_urlsafe(32)
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token + "\n")
+    return token
+
+
+def read_token(path=DEFAULT_TOKEN_PATH):
+    """Returns the token stored by write_token(), or None if there is none."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def parse_flags(flags):
+    """Accepts re flags as an int or a list of names such as ["IGNORECASE"]."""
+    if isinstance(flags, int):
+        return flags
+    value = 0
+    for name in flags or ():
+        flag = getattr(re.RegexFlag, str(name).upper(), None)
+        if flag is None:
+            raise ValueError(f"Unknown regex flag: {name!r}")
+        value |= flag
+    return value
+
+# --- HTTP Plumbing ---
+
+
+class _HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader):
+    """Returns (method, path, headers, body) of one HTTP/1.1 request."""
+    request_line = await reader.readline()
+    if not request_line:
+        raise ConnectionResetError
+    try:
+        method, path, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise _HTTPError(400, "malformed request line") from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise _HTTPError(400, "bad Content-Length") from None
+    if length > MAX_REQUEST_BYTES:
+        raise _HTTPError(413, "request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path.split("?", 1)[0], headers, body
+
+
+def _check_host(headers):
+    """Refuses requests addressed to any name but localhost."""
+    host = headers.get("host", "")
+    if host.startswith("["):
+        name = host[:host.find("]") + 1]
+    else:
+        name = host.partition(":")[0]
+    if name.lower() not in _LOCAL_HOSTS:
+        raise _HTTPError(403, f"bad Host header: {host!r}")
+
+
+def _head(status, content_type, extra=""):
+    return (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\n{extra}"
+            f"Connection: close\r\n\r\n").encode("latin-1")
+
+
+async def _send_json(writer, status, payload):
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(_head(status, "application/json",
+                       f"Content-Length: {len(body)}\r\n") + body)
+    await writer.drain()
+
+
+def _chunk(data):
+    """Frames bytes for Transfer-Encoding: chunked."""
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+# --- Server ---
+
+
+class SearchServer:
+    """
+    Serves RegexSearcher-style folder searches from a persistent process
+    pool. `cache_path` is the TextCache database every worker keeps open
+    (None disables the cache); `workers` defaults to os.cpu_count().
+    Requests must present `token` as a bearer token unless it is None.
+    """
+
+    def __init__(self, workers=None, cache_path="text_cache.sqlite3",
+                 chunk_size=SERVER_CHUNK_SIZE, allow_risky=False, token=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_path = cache_path
+        self.chunk_size = chunk_size
+        self.allow_risky = allow_risky
+        self.token = token
+        self.requests = 0
+        self.cache_counters = {"hits": 0, "misses": 0, "bytes_saved": 0}
+        self._active = {}         # search id -> asyncio.Task
+        self._pool = None
+        self._server = None
+
+    def _executor(self):
+        if self._pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.cache_path,))
+        return self._pool
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Starts listening; returns the bound address as a string."""
+        # Start the workers now, before the event loop creates any threads,
+        # so they are not forked while another thread holds a lock
+        self._executor().submit(os.getpid).result()
+        if unix_path:
+            self._server = await asyncio.start_unix_server(self._handle, unix_path)
+            os.chmod(unix_path, 0o600)
+            return f"unix:{unix_path}"
+        self._server = await asyncio.start_server(self._handle, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        for task in list(self._active.values()):
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        return {"requests": self.requests, "active": len(self._active),
+                "workers": self.workers, "cache": dict(self.cache_counters)}
+
+    # One connection carries one request
+    async def _handle(self, reader, writer):
+        try:
+            method, path, headers, body = await _read_request(reader)
+            _check_host(headers)
+            self._check_token(headers)
+            self.requests += 1
+            if path == "/search":
+                if method != "POST":
+                    raise _HTTPError(405, "use POST")
+                await self._search(_parse_body(body), writer)
+            elif path == "/cancel":
+                if method != "POST":
+                    raise _HTTPError(405, "use POST")
+                task = self._active.get(_parse_body(body).get("id"))
+                if task is not None:
+                    task.cancel()
+                await _send_json(writer, 200, {"cancelled": task is not None})
+            elif path == "/stats":
+                await _send_json(writer, 200, self.stats())
+            elif path == "/health":
+                await _send_json(writer, 200, {"ok": True})
+            else:
+                raise _HTTPError(404, f"no such endpoint: {path}")
+        except _HTTPError as e:
+            await _send_json(writer, e.status, {"error": str(e)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass                                # Client went away
+        finally:
+            writer.close()
+
+    def _check_token(self, headers):
+        if self.token is None:
+            return
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(
+                token.strip().encode("utf-8"), self.token.encode("utf-8")):
+            raise _HTTPError(401, "missing or wrong access token")
+
+    async def _search(self, request, writer):
+        try:
+            folder = request["folder"]
+            pattern = request["pattern"]
+            flags = parse_flags(request.get("flags", 0))
+            if not self.allow_risky and not request.get("allow_risky"):
+                check_pattern(pattern, flags)
+            else:
+                re.compile(pattern, flags)
+        except KeyError as e:
+            raise _HTTPError(400, f"missing field: {e.args[0]}") from None
+        except PatternRiskError as e:
+            raise _HTTPError(400, f"risky regex: {e}") from None
+        except (re.error, ValueError, TypeError) as e:
+            raise _HTTPError(400, f"invalid regex: {e}") from None
+        if not os.path.isdir(folder):
+            raise _HTTPError(400, f"not a folder: {folder}")
+
+        search_id = str(request.get("id") or uuid.uuid4().hex)
+        writer.write(_head(200, "application/x-ndjson",
+                           f"X-Search-Id: {search_id}\r\n"
+                           "Transfer-Encoding: chunked\r\n"))
+        task = asyncio.current_task()
+        self._active[search_id] = task
+        summary = {"done": True, "id": search_id, "matches": 0, "files": 0,
+                   "diagnostics": [], "cancelled": False}
+        try:
+            await self._stream(request, pattern, flags, writer, summary)
+        except asyncio.CancelledError:
+            # Cancelled through /cancel: finish the response politely
+            summary.update(done=False, cancelled=True)
+        except Exception as e:
+            summary.update(done=False, error=f"{type(e).__name__}: {e}")
+        finally:
+            self._active.pop(search_id, None)
+        writer.write(_chunk(json.dumps(summary).encode("utf-8") + b"\n"))
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _stream(self, request, pattern, flags, writer, summary):
+        loop = asyncio.get_running_loop()
+        walk_options = {key: request[key] for key in _WALK_OPTIONS if key in request}
+        # The walk advances in a thread a chunk at a time, so the first
+        # files are searched while the rest of the tree is still listed
+        chunks = _chunked(walk_files(request["folder"], **walk_options),
+                          self.chunk_size)
+        queries = [(None, pattern, flags)]
+        max_count = request.get("max_count")
+        whole_file = bool(request.get("whole_file"))
+        pool = self._executor()
+        pending = []
+        walking = True
+        try:
+            while True:
+                # Keep a few tasks queued so workers never wait on this loop
+                while walking and len(pending) < self.workers * TASKS_PER_WORKER:
+                    chunk = await loop.run_in_executor(None, next, chunks, None)
+                    if chunk is None:
+                        walking = False
+                        break
+                    pending.append((len(chunk), loop.run_in_executor(
+                        pool, _serve_batch, chunk, queries, max_count,
+                        whole_file)))
+                if not pending:
+                    break
+                files, future = pending.pop(0)
+                payload, count, counters, diagnostics = await future
+                if counters:
+                    for key, value in zip(("hits", "misses", "bytes_saved"), counters):
+                        self.cache_counters[key] += value
+                summary["files"] += files
+                summary["matches"] += count
+                summary["diagnostics"].extend(diagnostics)
+                if payload:
+                    writer.write(_chunk(payload))
+                    await writer.drain()
+        finally:
+            # Queued chunks are dropped; running ones finish in the pool
+            for _, future in pending:
+                future.cancel()
+
+
+def _parse_body(body):
+    try:
+        request = json.loads(body or b"{}")
+    except ValueError:
+        raise _HTTPError(400, "body is not valid JSON") from None
+    if not isinstance(request, dict):
+        raise _HTTPError(400, "body must be a JSON object")
+    return request
+
+# --- Client ---
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+class SearchClient:
+    """
+    Thin client for a SearchServer at "host:port" or "unix:/path". search()
+    yields SearchResult objects as they stream in; after it finishes,
+    `diagnostics` holds the server's SearchDiagnostics and `summary` its
+    final status line. `token` defaults to the one in DEFAULT_TOKEN_PATH.
+    """
+
+    def __init__(self, address=f"{DEFAULT_HOST}:{DEFAULT_PORT}", timeout=None,
+                 token=None):
+        self.address = address
+        self.timeout = timeout
+        self.token = token if token is not None else read_token()
+        self.diagnostics = []
+        self.summary = None
+
+    def _connection(self):
+        if self.address.startswith("unix:"):
+            return _UnixHTTPConnection(self.address[5:], self.timeout)
+        host, _, port = self.address.rpartition(":")
+        return http.client.HTTPConnection(host or DEFAULT_HOST, int(port),
+                                          timeout=self.timeout)
+
+    def _request(self, method, path, payload=None):
+        conn = self._connection()
+        body = None if payload is None else json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if body else {}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        conn.request(method, path, body, headers)
+        response = conn.getresponse()
+        if response.status != 200:
+            message = json.loads(response.read() or b"{}").get("error", response.reason)
+            conn.close()
+            raise ValueError(message)
+        return conn, response
+
+    def search(self, folder, pattern, flags=0, search_id=None, **options):
+        """
+        Starts a search on the server and returns an iterator of its
+        results. Keyword options are max_count, allow_risky, whole_file and
+        the walk_files filters. Raises ValueError for a request the server
+        rejects and OSError if it cannot be reached.
+        """
+        payload = dict(options, folder=os.path.abspath(folder),
+                       pattern=pattern, flags=parse_flags(flags),
+                       id=search_id or uuid.uuid4().hex)
+        self.diagnostics = []
+        self.summary = None
+        # Send the request now so rejections surface here, not mid-iteration
+        conn, response = self._request("POST", "/search", payload)
+        return self._results(conn, response)
+
+    def _results(self, conn, response):
+        try:
+            for line in response:
+                record = json.loads(line)
+                if "done" in record:
+                    self.summary = record
+                    self.diagnostics = [
+                        SearchDiagnostic(d["file"], d["kind"], d["message"])
+                        for d in record["diagnostics"]]
+                    if record.get("error"):
+                        self.diagnostics.append(
+                            SearchDiagnostic(None, "error", record["error"]))
+                    break
+                yield SearchResult(record["file"], record["line"],
+                                   record["content"], record["match"],
+                                   record["query"], record["section"],
+                                   record["column"], record["start"],
+                                   record["end"])
+        finally:
+            conn.close()
+
+    def cancel(self, search_id):
+        return self._call("POST", "/cancel", {"id": search_id})["cancelled"]
+
+    def stats(self):
+        return self._call("GET", "/stats")
+
+    def _call(self, method, path, payload=None):
+        conn, response = self._request(method, path, payload)
+        try:
+            return json.loads(response.read())
+        finally:
+            conn.close()
+
+# --- Entry Point ---
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m src.server",
+        description="Serve folder searches over a local HTTP/JSON API.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"TCP port, 0 for any free port (default: {DEFAULT_PORT})")
+    parser.add_argument("--unix", metavar="PATH",
+                        help="listen on a Unix socket instead of TCP")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes; 0 uses every CPU (default: 0)")
+    parser.add_argument("--cache", default="text_cache.sqlite3", metavar="PATH",
+                        help="extracted-text cache database ('' disables it)")
+    parser.add_argument("--allow-risky", action="store_true",
+                        help="run patterns with a high catastrophic-backtracking risk")
+    parser.add_argument("--token-file", default=DEFAULT_TOKEN_PATH, metavar="PATH",
+                        help="where to write the access token TCP clients must send "
+                             f"(default: {DEFAULT_TOKEN_PATH})")
+    args = parser.parse_args(argv)
+
+    async def run():
+        # The Unix socket is only reachable by its owner, so needs no token
+        token = None if args.unix else write_token(args.token_file)
+        server = SearchServer(args.workers or None, args.cache or None,
+                              allow_risky=args.allow_risky, token=token)
+        address = await server.start(args.host, args.port, args.unix)
+        print(f"listening on {address}", flush=True)
+        # Shut the pool down cleanly on SIGTERM as well as Ctrl+C
+        serving = asyncio.ensure_future(server.serve_forever())
+        if hasattr(signal, "SIGTERM"):
+            try:
+                asyncio.get_running_loop().add_signal_handler(
+                    signal.SIGTERM, serving.cancel)
+            except NotImplementedError:         # Windows event loops
+                pass
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
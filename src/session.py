@@ -0,0 +1,131 @@
+import hashlib
+import os
+import threading
+
+try:
+    from .core import RegexSearcher, walk_files
+except ImportError:                             # Running as a script from src/
+    from core import RegexSearcher, walk_files
+
+# --- Incremental Search Sessions ---
+
+
+def _result_key(result):
+    """Identity of a match used when diffing two runs."""
+    return (result.file_path, result.line_number, result.match_group,
+            result.line_content, result.query)
+
+
+def _file_digest(file_path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SessionDiff:
+    """Changes between two refreshes of a SearchSession."""
+
+    def __init__(self):
+        self.added = []           # SearchResults that are new
+        self.removed = []         # SearchResults that disappeared
+        self.unchanged = 0        # Number of matches carried over
+        self.changed_files = []   # Files that were (re-)searched
+        self.deleted_files = []   # Files that no longer exist
+
+    def __bool__(self):
+        return bool(self.added or self.removed)
+
+
+class SearchSession:
+    """
+    Keeps the per-file results of a folder search so that refresh() only
+    re-reads files that were added or changed (by mtime and size, or by
+    content hash when hash_files is True) and reports what changed.
+    """
+
+    def __init__(self, folder_path, pattern, flags=0, searcher=None,
+                 hash_files=False):
+        self.folder_path = folder_path
+        self.pattern = pattern
+        self.flags = flags
+        self.searcher = searcher or RegexSearcher()
+        self.hash_files = hash_files
+        self._files = {}   # path -> (mtime_ns, size, digest, [results])
+        self._lock = threading.Lock()
+
+    # Re-scan changed files and return a SessionDiff
+    def refresh(self):
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        diff = SessionDiff()
+        seen = set()
+        for file_path in walk_files(self.folder_path):
+            seen.add(file_path)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                continue
+            old = self._files.get(file_path)
+            if old and old[:2] == (st.st_mtime_ns, st.st_size):
+                diff.unchanged += len(old[3])
+                continue
+            digest = _file_digest(file_path) if self.hash_files else None
+            if old and digest is not None and digest == old[2]:
+                # Touched but identical: keep results, remember the new mtime
+                self._files[file_path] = (st.st_mtime_ns, st.st_size, digest, old[3])
+                diff.unchanged += len(old[3])
+                continue
+            results = list(self.searcher.search_in_file(
+                file_path, self.pattern, self.flags))
+            self._files[file_path] = (st.st_mtime_ns, st.st_size, digest, results)
+            diff.changed_files.append(file_path)
+            self._diff_results(old[3] if old else [], results, diff)
+        for file_path in sorted(set(self._files) - seen):
+            diff.removed.extend(self._files.pop(file_path)[3])
+            diff.deleted_files.append(file_path)
+        return diff
+
+    @staticmethod
+    def _diff_results(old_results, new_results, diff):
+        remaining = {}
+        for result in old_results:
+            remaining.setdefault(_result_key(result), []).append(result)
+        for result in new_results:
+            matches = remaining.get(_result_key(result))
+            if matches:
+                matches.pop()
+                diff.unchanged += 1
+            else:
+                diff.added.append(result)
+        for matches in remaining.values():
+            diff.removed.extend(matches)
+
+    # All current results in path order
+    def results(self):
+        with self._lock:
+            files = sorted(self._files.items())
+        for _, (_, _, _, results) in files:
+            yield from results
+
+    # Poll the folder on a background thread
+    def watch(self, callback, interval=2.0, stop_event=None):
+        """
+        Calls refresh() every `interval` seconds and passes each non-empty
+        SessionDiff to callback until stop_event is set. Returns the
+        (started, daemon) thread and the stop event.
+        """
+        stop_event = stop_event or threading.Event()
+
+        def poll():
+            while not stop_event.wait(interval):
+                diff = self.refresh()
+                if diff:
+                    callback(diff)
+
+        thread = threading.Thread(target=poll, daemon=True)
+        thread.start()
+        return thread, stop_event
@@ -0,0 +1,207 @@
+"""
+Opt-in search instrumentation. A SearchStats passed to a search records
+where the time went: walking the folder, extracting text, splitting lines
+and running the regex, plus bytes read and per-format counts. Searches
+that are not given one take their usual code path untouched.
+"""
+import os
+import json
+import time
+import heapq
+import cProfile
+import contextlib
+
+# Stages a search's time is split into
+STAGES = ("walk", "extract", "split", "match")
+
+# How many of the slowest files a SearchStats remembers
+SLOWEST_FILES_KEPT = 10
+
+# --- Timing Helpers ---
+
+
+def timed(iterable, totals, key):
+    """Yields from an iterable, adding the time spent producing items to totals[key]."""
+    iterator = iter(iterable)
+    clock = time.perf_counter
+    while True:
+        start = clock()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            totals[key] += clock() - start
+            return
+        totals[key] += clock() - start
+        yield item
+
+
+@contextlib.contextmanager
+def profile_to(output_path):
+    """Runs the enclosed block under cProfile and dumps pstats data to a file."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+
+# --- Search Statistics ---
+
+
+class SearchStats:
+    """
+    Counters and timings for one or more searches. Worker processes fill
+    their own copies, which are merged back with merge().
+
+    stage_times         seconds per STAGES entry; "match" also covers
+                        building results and memory-mapped scans
+    files, bytes_read   files searched and their total size on disk
+    matches             results produced
+    files_by_ext        extension -> files searched
+    extract_time_by_ext extension -> seconds spent extracting text
+    slowest_files       [(seconds, path)] of the slowest files, slowest first
+    wall_time           seconds from the start of a search to its end
+    trace_events        Chrome trace events, one per file, when trace=True
+    """
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.stage_times = dict.fromkeys(STAGES, 0.0)
+        self.files = 0
+        self.bytes_read = 0
+        self.matches = 0
+        self.files_by_ext = {}
+        self.extract_time_by_ext = {}
+        self._slowest = []                 # min-heap of (seconds, path)
+        self.wall_time = 0.0
+        self.trace_events = [] if trace else None
+        self._current = None
+
+    def spawn(self):
+        """Returns an empty SearchStats with the same settings, for a worker."""
+        return SearchStats(self.trace)
+
+    # Called around each file by the search code
+    def begin_file(self, file_path):
+        self._current = {"path": file_path, "start": time.perf_counter(),
+                         "extract": 0.0, "split": 0.0}
+
+    def end_file(self, matches):
+        current, self._current = self._current, None
+        end = time.perf_counter()
+        total = end - current["start"]
+        path = current["path"]
+        extract = current["extract"]
+        # The line iterator drives extraction, so its time includes it
+        split = max(0.0, current["split"] - extract)
+        match = max(0.0, total - extract - split)
+        ext = os.path.splitext(path)[1].lower()
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        self.stage_times["extract"] += extract
+        self.stage_times["split"] += split
+        self.stage_times["match"] += match
+        self.files += 1
+        self.bytes_read += size
+        self.matches += matches
+        self.files_by_ext[ext] = self.files_by_ext.get(ext, 0) + 1
+        self.extract_time_by_ext[ext] = self.extract_time_by_ext.get(ext, 0.0) + extract
+        self._keep_slowest(total, path)
+        if self.trace_events is not None:
+            self.trace_events.append({
+                "name": os.path.basename(path), "cat": ext or "file",
+                "ph": "X", "pid": os.getpid(), "tid": 0,
+                "ts": current["start"] * 1e6, "dur": total * 1e6,
+                "args": {"path": path, "bytes": size, "matches": matches,
+                         "extract_s": extract, "split_s": split,
+                         "match_s": match}})
+
+    def time_lines(self, chunks, lines_from):
+        """
+        Wraps the current file's chunk iterator and the line iterator built
+        from it so extraction and splitting are timed separately.
+        """
+        current = self._current
+        return timed(lines_from(timed(chunks, current, "extract")),
+                     current, "split")
+
+    def time_walk(self, file_paths):
+        return timed(file_paths, self.stage_times, "walk")
+
+    def time_run(self, results):
+        """Yields from a search's results, adding its duration to wall_time."""
+        start = time.perf_counter()
+        try:
+            yield from results
+        finally:
+            self.wall_time += time.perf_counter() - start
+
+    def _keep_slowest(self, seconds, path):
+        if len(self._slowest) < SLOWEST_FILES_KEPT:
+            heapq.heappush(self._slowest, (seconds, path))
+        elif seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (seconds, path))
+
+    @property
+    def slowest_files(self):
+        return sorted(self._slowest, reverse=True)
+
+    def merge(self, other):
+        """Adds the counts and timings of another SearchStats to this one."""
+        for stage in STAGES:
+            self.stage_times[stage] += other.stage_times[stage]
+        self.files += other.files
+        self.bytes_read += other.bytes_read
+        self.matches += other.matches
+        for ext, count in other.files_by_ext.items():
+            self.files_by_ext[ext] = self.files_by_ext.get(ext, 0) + count
+        for ext, seconds in other.extract_time_by_ext.items():
+            self.extract_time_by_ext[ext] = self.extract_time_by_ext.get(ext, 0.0) + seconds
+        for seconds, path in other._slowest:
+            self._keep_slowest(seconds, path)
+        if self.trace_events is not None and other.trace_events:
+            self.trace_events.extend(other.trace_events)
+
+    # --- Reporting ---
+
+    def to_dict(self):
+        return {
+            "files": self.files,
+            "bytes_read": self.bytes_read,
+            "matches": self.matches,
+            "wall_time": self.wall_time,
+            "stage_times": dict(self.stage_times),
+            "files_by_ext": dict(self.files_by_ext),
+            "extract_time_by_ext": dict(self.extract_time_by_ext),
+            "slowest_files": [{"path": path, "seconds": seconds}
+                              for seconds, path in self.slowest_files],
+        }
+
+    def summary(self):
+        """One line for a status bar."""
+        stages = ", ".join(f"{stage} {self.stage_times[stage]:.2f}s"
+                           for stage in STAGES)
+        return (f"{self.files} files, {self.bytes_read / 2 ** 20:.1f} MB, "
+                f"{self.matches} matches in {self.wall_time:.2f}s ({stages})")
+
+    def report(self):
+        """Multi-line summary with per-format and slowest-file breakdowns."""
+        lines = [self.summary(), "by format:"]
+        for ext, count in sorted(self.files_by_ext.items(),
+                                 key=lambda item: -item[1]):
+            lines.append(f"  {ext or '(none)':<8} {count:>8} files "
+                         f"{self.extract_time_by_ext.get(ext, 0.0):>9.3f}s extract")
+        if self._slowest:
+            lines.append("slowest files:")
+            lines.extend(f"  {seconds:>9.3f}s  {path}"
+                         for seconds, path in self.slowest_files)
+        return "\n".join(lines)
+
+    def write_trace(self, output_path):
+        """Writes the per-file trace in Chrome trace-event format (Perfetto)."""
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.trace_events or [],
+                       "displayTimeUnit": "ms"}, f)
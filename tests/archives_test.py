@@ -0,0 +1,57 @@
+import io
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.archives import (archive_kind, iter_line_blocks, member_path,
+                          prefetch, split_archive_path)
+
+
+def test_virtual_paths():
+    """Test archive detection and splitting of member paths."""
+    assert archive_kind("logs/Bundle.TAR.GZ") == "tar"
+    assert archive_kind("a.zip") == "zip"
+    assert archive_kind("a.log.gz") is None
+    path = member_path("/d/x!/y.zip", "sub/app.log")
+    assert path == "/d/x!/y.zip!/sub/app.log"
+    assert split_archive_path(path) == ("/d/x!/y.zip", "sub/app.log")
+    assert split_archive_path("/d/plain!/file.txt") == ("/d/plain!/file.txt", None)
+
+
+def test_line_blocks_end_at_newlines():
+    """Test that blocks are cut after newlines and lose no bytes."""
+    data = b"one\ntwo\nthree\nfour"
+    blocks = list(iter_line_blocks(io.BytesIO(data), 5))
+    assert b"".join(blocks) == data
+    assert all(block.endswith(b"\n") for block in blocks[:-1])
+    assert blocks[-1] == b"four"
+
+
+def test_prefetch_yields_raises_and_stops():
+    """Test item order, error propagation and early close of prefetch."""
+    assert list(prefetch(iter(range(100)), depth=2)) == list(range(100))
+
+    def failing():
+        yield 1
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        list(prefetch(failing()))
+
+    closed = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                yield "x"
+        finally:
+            closed.set()
+
+    items = prefetch(endless(), depth=2)
+    assert next(items) == "x"
+    items.close()
+    assert closed.is_set()
@@ -0,0 +1,196 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import src.core as core
+from src.cache import ResultCache, TextCache
+from src.core import RegexSearcher, read_file_content
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a TextCache in a temporary database."""
+    text_cache = TextCache(str(tmp_path / "cache.sqlite3"))
+    yield text_cache
+    text_cache.close()
+
+
+@pytest.fixture
+def fake_pdf(tmp_path, monkeypatch):
+    """Create a .pdf file whose extraction is counted instead of parsed."""
+    calls = []
+
+    def fake_extract(file_path, ext):
+        calls.append(file_path)
+        return "invoice 42\ntotal 99"
+
+    monkeypatch.setattr(core, "_extract_text", fake_extract)
+    pdf = tmp_path / "docs" / "report.pdf"
+    pdf.parent.mkdir()
+    pdf.write_bytes(b"%PDF-fake")
+    return pdf, calls
+
+
+def test_cache_skips_repeat_extraction(cache, fake_pdf):
+    """Test that unchanged documents are only parsed once."""
+    pdf, calls = fake_pdf
+    assert read_file_content(str(pdf), cache) == "invoice 42\ntotal 99"
+    assert read_file_content(str(pdf), cache) == "invoice 42\ntotal 99"
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["bytes_saved"] == len(b"%PDF-fake")
+
+
+def test_cache_invalidates_on_change(cache, fake_pdf):
+    """Test that a modified file is re-extracted."""
+    pdf, calls = fake_pdf
+    read_file_content(str(pdf), cache)
+    pdf.write_bytes(b"%PDF-changed")
+    read_file_content(str(pdf), cache)
+    assert len(calls) == 2
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size cap evicts the oldest entries."""
+    cache = TextCache(str(tmp_path / "cache.sqlite3"), max_bytes=10)
+    for name in ("a.pdf", "b.pdf"):
+        (tmp_path / name).write_bytes(b"x")
+        cache.put(str(tmp_path / name), 1, "123456")
+    assert cache.get(str(tmp_path / "a.pdf"), 1) is None
+    assert cache.get(str(tmp_path / "b.pdf"), 1) == "123456"
+    cache.close()
+
+
+def test_cache_serves_other_threads(cache, fake_pdf):
+    """Test that a cache opened on one thread can be used from another."""
+    import threading
+    pdf, calls = fake_pdf
+    searcher = RegexSearcher(cache=cache)
+    assert len(list(searcher.search_in_file(str(pdf), r"\d+"))) == 2
+    found = []
+    thread = threading.Thread(target=lambda: found.extend(
+        searcher.search_in_file(str(pdf), r"\d+")))
+    thread.start()
+    thread.join()
+    assert [r.match_group for r in found] == ["42", "99"]
+    assert len(calls) == 1
+
+
+def test_searcher_uses_cache(cache, fake_pdf):
+    """Test that folder searches consult the searcher's cache."""
+    pdf, calls = fake_pdf
+    searcher = RegexSearcher(cache=cache)
+    for _ in range(2):
+        results = list(searcher.search_in_folder(str(pdf.parent), r"\d+"))
+        assert [r.match_group for r in results] == ["42", "99"]
+    assert len(calls) == 1
+
+
+def test_result_cache_replays_unchanged_files(tmp_path):
+    """Test that repeat searches only re-read files that changed."""
+    import time, zipfile
+    folder = tmp_path / "logs"
+    folder.mkdir()
+    (folder / "a.log").write_text("ok\nERROR one\n", encoding="utf-8")
+    (folder / "b.log").write_text("ERROR two\n", encoding="utf-8")
+    with zipfile.ZipFile(folder / "c.zip", "w") as archive:
+        archive.writestr("inner.txt", "ERROR three\n")
+    result_cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    searcher = RegexSearcher(result_cache=result_cache)
+
+    def search(**kw):
+        return [(r.file_path, r.line_number, r.column, r.match_group)
+                for r in searcher.search_in_folder(str(folder), "ERROR", **kw)]
+
+    first = search()
+    assert first == [(r.file_path, r.line_number, r.column, r.match_group)
+                     for r in RegexSearcher().search_in_folder(str(folder), "ERROR")]
+    assert search() == first
+    assert (result_cache.hits, result_cache.misses) == (3, 3)
+    time.sleep(0.01)
+    (folder / "b.log").write_text("x\nERROR two\n", encoding="utf-8")
+    assert [r[1] for r in search()] == [2, 2, 1]
+    assert (result_cache.hits, result_cache.misses) == (5, 4)
+    # Different options are cached separately
+    search(max_count=1)
+    assert result_cache.misses == 7
+    result_cache.close()
+
+
+def test_result_cache_streams_during_walk(tmp_path, monkeypatch):
+    """Test that memoized searches yield results before the walk ends."""
+    folder = tmp_path / "logs"
+    folder.mkdir()
+    for i in range(300):
+        (folder / f"{i:03}.log").write_text(f"ERROR {i}\n", encoding="utf-8")
+    walked = []
+    walk_files = core.walk_files
+
+    def counting_walk(*args, **kwargs):
+        for path in walk_files(*args, **kwargs):
+            walked.append(path)
+            yield path
+
+    monkeypatch.setattr(core, "walk_files", counting_walk)
+    monkeypatch.setattr(core, "RESULT_CACHE_WALK_AHEAD", 16)
+    result_cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    searcher = RegexSearcher(result_cache=result_cache)
+    for _ in range(2):                  # Cold, then fully cached
+        del walked[:]
+        results = searcher.search_in_folder(str(folder), "ERROR")
+        assert next(results).file_path.endswith("000.log")
+        assert len(walked) < 300
+        assert len(list(results)) == 299
+    assert (result_cache.hits, result_cache.misses) == (300, 300)
+    result_cache.close()
+
+
+def test_result_cache_merges_in_walk_order(tmp_path):
+    """Test that replayed and fresh results interleave in walk order."""
+    import time
+    folder = tmp_path / "logs"
+    folder.mkdir()
+    for i in range(20):
+        (folder / f"{i:02}.log").write_text(f"ERROR {i}\nERROR again\n", encoding="utf-8")
+    result_cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    searcher = RegexSearcher(result_cache=result_cache)
+    expected = [(r.file_path, r.line_number) for r in
+                RegexSearcher().search_in_folder(str(folder), "ERROR")]
+    list(searcher.search_in_folder(str(folder), "ERROR"))
+    time.sleep(0.01)
+    for i in range(0, 20, 3):
+        (folder / f"{i:02}.log").write_text(f"ERROR {i}\nERROR again\n", encoding="utf-8")
+    for options in ({}, {"workers": 2, "chunk_size": 2}, {"timeout": 30}):
+        assert [(r.file_path, r.line_number) for r in searcher.search_in_folder(
+            str(folder), "ERROR", **options)] == expected
+    result_cache.close()
+
+
+def test_result_cache_lookup_loads_requested_files(tmp_path):
+    """Test that lookup only returns the files it is asked about."""
+    result_cache = ResultCache(str(tmp_path / "results.sqlite3"))
+    result_cache.store("k", [("/a", 1, 2, [["", 1]]), ("/b", 1, 2, [["", 2]])])
+    assert result_cache.lookup("k", [("/b", 1, 2)]) == {"/b": [["", 2]]}
+    assert result_cache.lookup("k", [("/a", 1, 3)]) == {}
+    assert (result_cache.hits, result_cache.misses) == (1, 1)
+    result_cache.close()
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    """Test that the size cap drops old entries and their fingerprints."""
+    folder = tmp_path / "logs"
+    folder.mkdir()
+    (folder / "a.log").write_text("ERROR\n" * 50, encoding="utf-8")
+    result_cache = ResultCache(str(tmp_path / "results.sqlite3"), max_bytes=600)
+    searcher = RegexSearcher(result_cache=result_cache)
+    assert len(list(searcher.search_in_folder(str(folder), "ERROR"))) == 50
+    assert len(list(searcher.search_in_folder(str(folder), "E"))) == 50
+    assert result_cache.stats()["entries"] == 1
+    assert len(list(searcher.search_in_folder(str(folder), "ERROR"))) == 50
+    assert result_cache.misses == 3
+    result_cache.close()
@@ -0,0 +1,77 @@
+import io
+import os
+import sys
+import json
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.cli import main
+
+
+def make_folder(tmp_path):
+    (tmp_path / "a.log").write_text("error 1\nok\nerror 2\nerror 3\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("Error 4\n", encoding="utf-8")
+    (tmp_path / "skip").mkdir()
+    (tmp_path / "skip" / "c.log").write_text("error 5\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def run(argv):
+    out = io.StringIO()
+    status = main(argv, out)
+    return status, out.getvalue().splitlines()
+
+
+def test_grep_output_and_flags(tmp_path):
+    """Test grep-style output, -i and the exit status."""
+    folder = make_folder(tmp_path)
+    status, lines = run([r"error \d", folder, "-i", "--exclude", "skip"])
+    assert status == 0
+    assert lines == [
+        os.path.join(folder, "a.log") + ":1:error 1",
+        os.path.join(folder, "a.log") + ":3:error 2",
+        os.path.join(folder, "a.log") + ":4:error 3",
+        os.path.join(folder, "b.txt") + ":1:Error 4",
+    ]
+    assert run(["nothing here", folder])[0] == 1
+    assert run(["(", folder])[0] == 2
+
+
+def test_jsonl_with_include_and_max_count(tmp_path):
+    """Test JSONL output limited by --include and --max-count."""
+    folder = make_folder(tmp_path)
+    status, lines = run([r"error \d", folder, "-f", "jsonl",
+                         "--include", "*.log", "-m", "1"])
+    records = [json.loads(line) for line in lines]
+    assert [(os.path.basename(r["file"]), r["match"]) for r in records] == [
+        ("a.log", "error 1"), ("c.log", "error 5")]
+
+
+def test_files_with_matches(tmp_path):
+    """Test that -l lists each matching file once."""
+    folder = make_folder(tmp_path)
+    status, lines = run(["error", folder, "-l", "-j", "2"])
+    assert lines == [os.path.join(folder, "a.log"),
+                     os.path.join(folder, "skip", "c.log")]
+
+
+def test_analyze_and_risky_patterns(tmp_path):
+    """Test --analyze output and the refusal of risky patterns."""
+    folder = make_folder(tmp_path)
+    status, lines = run([r"error \d", folder, "--analyze"])
+    assert status == 0 and json.loads(lines[0])["literals"] == ["error "]
+    assert run([r"(e+)+r", folder])[0] == 2
+    assert run([r"(e+)+r", folder, "--allow-risky"])[0] == 0
+
+
+def test_ignore_and_binary_defaults(tmp_path):
+    """Test that ignored and binary files are skipped unless asked for."""
+    folder = make_folder(tmp_path)
+    (tmp_path / ".gitignore").write_text("skip/\n", encoding="utf-8")
+    (tmp_path / "d.bin.txt").write_bytes(b"error 6\0")
+    files = lambda *extra: run(["error", folder, "-l", *extra])[1]
+    assert files() == [os.path.join(folder, "a.log")]
+    assert os.path.join(folder, "skip", "c.log") in files("--no-ignore")
+    assert os.path.join(folder, "d.bin.txt") in files("--binary")
+    assert files("--max-filesize", "10") == []
+    assert files("--max-depth", "0", "--no-ignore") == [os.path.join(folder, "a.log")]
@@ -5,11 +5,14 @@ import pytest
 import os
 import sys
 import re
+import threading
+import subprocess
 
 # Ensure the src directory is in sys.path to find core.py
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.core import read_file_content, find_matches_in_text, SearchResult, RegexSearcher
+from src.core import read_file_content, iter_file_lines, find_matches_in_text, SearchResult, RegexSearcher
+from src import core
 
 # Sample test content
 TEST_TXT_CONTENT = """Hello world
@@ -44,6 +47,29 @@ def test_read_file_content_non_existent():
     assert content.startswith("Error reading file")
     assert "non_existent.txt" in content
 
+def test_iter_file_lines_matches_splitlines(tmp_path, monkeypatch):
+    """Test that streamed lines equal splitlines() of the whole content."""
+    text = "one\r\ntwo\rthree\n\nfour\x0bfive\u2028six\r\n"
+    path = tmp_path / "mixed.log"
+    path.write_bytes(text.encode("utf-8"))
+    monkeypatch.setattr(core, "TEXT_BLOCK_SIZE", 3)
+    lines = list(iter_file_lines(str(path)))
+    expected = read_file_content(str(path)).splitlines()
+    assert lines == list(enumerate(expected, 1))
+
+def test_split_lines_any_chunking():
+    """Test that chunk boundaries never change how lines are split."""
+    text = "a\r\nb\r\r\nc\n\x1cd\re"
+    for size in range(1, len(text) + 1):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(core._split_lines(chunks)) == text.splitlines()
+
+def test_iter_file_lines_csv(tmp_path):
+    """Test that CSV rows are streamed as comma-joined lines."""
+    path = tmp_path / "data.csv"
+    path.write_text("id,name\n1,Ann\n", encoding="utf-8")
+    assert list(iter_file_lines(str(path))) == [(1, "id, name"), (2, "1, Ann")]
+
 def test_find_matches_in_text():
     """Test regex matching in text."""
     pattern = r"[hH]ello"
@@ -71,6 +97,17 @@ def test_search_result():
     assert result.line_content == "Hello world"
     assert result.match_group == "Hello"
 
+def test_search_result_is_compact(tmp_path):
+    """Test that results use slots and share one line object per line."""
+    path = tmp_path / "dense.txt"
+    path.write_text("  a b c  \n", encoding="utf-8")
+    results = list(RegexSearcher().search_in_folder(str(tmp_path), r"\w"))
+    assert len(results) == 3
+    assert not hasattr(results[0], "__dict__")
+    assert results[0]._line is results[1]._line is results[2]._line
+    assert results[2].line_content == "a b c"
+    assert results[2].file_name == "dense.txt"
+
 def test_regex_searcher_search_in_folder(temp_folder):
     """Test searching for matches in a folder."""
     searcher = RegexSearcher()
@@ -83,6 +120,86 @@ def test_regex_searcher_search_in_folder(temp_folder):
     )
     assert found
 
+def test_search_in_folder_parallel_matches_serial(tmp_path):
+    """Test that a process-pool search returns the same ordered results."""
+    for i in range(5):
+        sub = tmp_path / f"dir{i % 2}"
+        sub.mkdir(exist_ok=True)
+        (sub / f"file{i}.txt").write_text(TEST_TXT_CONTENT, encoding="utf-8")
+    searcher = RegexSearcher()
+    serial = [(r.file_path, r.line_number, r.match_group)
+              for r in searcher.search_in_folder(str(tmp_path), r"test", re.IGNORECASE)]
+    parallel = [(r.file_path, r.line_number, r.match_group)
+                for r in searcher.search_in_folder(str(tmp_path), r"test", re.IGNORECASE,
+                                                   workers=2, chunk_size=2)]
+    unordered = [(r.file_path, r.line_number, r.match_group)
+                 for r in searcher.search_in_folder(str(tmp_path), r"test", re.IGNORECASE,
+                                                    workers=2, chunk_size=1, ordered=False)]
+    assert len(serial) == 10
+    assert parallel == serial
+    assert sorted(unordered) == sorted(serial)
+
+def test_mmap_search_matches_line_search(tmp_path):
+    """Test that the whole-buffer fast path agrees with the per-line loop."""
+    path = tmp_path / "app.log"
+    path.write_text("ab ab\n\nxab\nb a\n", encoding="utf-8")
+    for pattern, flags in [(r"ab", 0), (r"^a|b$", 0), (r"\bA", re.IGNORECASE), (r"x*", 0)]:
+        queries = [(None, re.compile(pattern, flags))]
+        found, remaining = core._search_mmap(str(path), queries)
+        slow = list(core._search_lines(str(path), queries))
+        assert remaining == []
+        assert [(r.line_number, r.line_content, r.match_group) for r in found[0]] == \
+            [(r.line_number, r.line_content, r.match_group) for r in slow]
+
+def test_mmap_search_falls_back(tmp_path):
+    """Test that non-ASCII files and line-spanning matches use the line path."""
+    unicode_file = tmp_path / "unicode.txt"
+    unicode_file.write_text("caf\u00e9 test\n", encoding="utf-8")
+    queries = [(None, re.compile(r"test"))]
+    assert core._search_mmap(str(unicode_file), queries) == ([], queries)
+    ascii_file = tmp_path / "ascii.txt"
+    ascii_file.write_text("a\nb\n", encoding="utf-8")
+    for pattern in (r"a\sb", r"(?<=a)b"):
+        queries = [(None, re.compile(pattern))]
+        assert core._search_mmap(str(ascii_file), queries) == ([], queries)
+    searcher = RegexSearcher()
+    assert list(searcher.search_in_folder(str(tmp_path), r"a\sb")) == []
+
+def test_mmap_search_keeps_unit_separator_whitespace(tmp_path):
+    """Test that a unit separator, whitespace only to str patterns, still matches."""
+    (tmp_path / "sep.txt").write_text("a\x1fb\n", encoding="utf-8")
+    results = list(RegexSearcher().search_in_folder(str(tmp_path), r"a\sb"))
+    assert [(r.line_number, r.match_group) for r in results] == [(1, "a\x1fb")]
+
+def test_search_many_in_folder(temp_folder):
+    """Test that several named queries are answered in one pass."""
+    searcher = RegexSearcher()
+    queries = [("greeting", r"hello", re.IGNORECASE), ("test", r"TEST", 0), ("none", r"zzz", 0)]
+    results = list(searcher.search_many_in_folder(temp_folder, queries))
+    assert [(r.query, r.line_number, r.match_group) for r in results] == [
+        ("greeting", 1, "Hello"), ("test", 3, "TEST"), ("greeting", 4, "hello")]
+    single = list(searcher.search_in_folder(temp_folder, r"hello", re.IGNORECASE))
+    assert [r.match_group for r in single] == ["Hello", "hello"]
+    assert all(r.query is None for r in single)
+
+def test_search_in_folder_progress_and_cancel(tmp_path):
+    """Test progress callbacks and that a set cancel event stops the walk."""
+    for i in range(4):
+        (tmp_path / f"file{i}.txt").write_text(TEST_TXT_CONTENT, encoding="utf-8")
+    searcher = RegexSearcher()
+    seen = []
+    results = list(searcher.search_in_folder(str(tmp_path), r"test", progress=seen.append))
+    assert len(seen) == 4 and len(results) == 4
+    assert core.count_files(str(tmp_path)) == 4
+
+    cancel = threading.Event()
+    seen = []
+    def stop_after_first(path):
+        seen.append(path)
+        cancel.set()
+    list(searcher.search_in_folder(str(tmp_path), r"test", cancel=cancel, progress=stop_after_first))
+    assert len(seen) == 1
+
 def test_regex_searcher_save_load_queries(tmp_path):
     """Test saving and loading regex queries."""
     searcher = RegexSearcher()
@@ -112,5 +229,255 @@ def test_regex_searcher_export_results(tmp_path):
         assert "test.txt,1,Hello,Hello world" in content
         assert "test.txt,2,test,This is a test" in content
 
+def test_register_extractor_dispatch(tmp_path):
+    """Test that read_file_content dispatches on registered extractors."""
+    @core.register_extractor(".rev")
+    def _iter_reversed(file_path):
+        with open(file_path, "r", encoding="utf-8") as f:
+            yield f.read()[::-1]
+    try:
+        rev_file = tmp_path / "test.rev"
+        rev_file.write_text("olleH", encoding="utf-8")
+        assert read_file_content(str(rev_file)) == "Hello"
+        assert not core._is_plain_text(".rev")
+    finally:
+        del core.EXTRACTORS[".rev"]
+
+def test_core_import_is_lazy():
+    """Test that importing core does not pull in heavy optional modules."""
+    code = ("import sys, src.core; "
+            "print(any(m in sys.modules for m in "
+            "('sqlite3', 'concurrent.futures.process', 'docx', 'pypdf', 'openpyxl')))")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root,
+                            capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "False"
+
+def test_walk_files_include_exclude(tmp_path):
+    """Test glob filtering of the folder walk."""
+    (tmp_path / "a.txt").write_text("x", encoding="utf-8")
+    (tmp_path / "b.log").write_text("x", encoding="utf-8")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "c.txt").write_text("x", encoding="utf-8")
+    names = lambda **kw: [os.path.relpath(p, tmp_path).replace(os.sep, "/")
+                          for p in core.walk_files(str(tmp_path), **kw)]
+    assert names(include=["*.txt"]) == ["a.txt", "build/c.txt"]
+    assert names(exclude=["build"]) == ["a.txt", "b.log"]
+    assert names(include=["build/*"]) == ["build/c.txt"]
+
+def test_max_count_stops_each_file(tmp_path):
+    """Test that max_count limits matches per file on both search paths."""
+    (tmp_path / "a.txt").write_text("hit 1\nhit 2\nhit 3\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("hit 4\nhit 5\n", encoding="utf-8")
+    searcher = RegexSearcher()
+    results = list(searcher.search_in_folder(str(tmp_path), r"hit \d", max_count=1))
+    assert [r.match_group for r in results] == ["hit 1", "hit 4"]
+    results = list(searcher.search_many_in_folder(
+        str(tmp_path), [("a", r"hit [12]", 0), ("b", r"hit [3-5]", 0)], max_count=2))
+    assert [r.match_group for r in results] == ["hit 1", "hit 2", "hit 4", "hit 5"]
+
+def test_sectioned_extractor_locates_results(tmp_path):
+    """Test that section breaks number pages without shifting line numbers."""
+    @core.register_extractor(".pages", sectioned=True)
+    def _iter_pages(file_path):
+        yield "intro\nhit one\f"
+        yield "\f"
+        yield "hit two\r\nhit three\f"
+    try:
+        doc = tmp_path / "doc.pages"
+        doc.write_text("unused", encoding="utf-8")
+        lines = read_file_content(str(doc)).splitlines()
+        located = list(core.iter_located_lines(str(doc)))
+        assert [line for _, _, line in located] == lines
+        results = list(RegexSearcher().search_in_file(str(doc), r"hit \w+"))
+        assert [(r.line_number, r.section) for r in results] == [(2, 1), (4, 3), (5, 3)]
+    finally:
+        del core.EXTRACTORS[".pages"]
+        core.SECTIONED_EXTENSIONS.discard(".pages")
+
+def test_xlsx_searches_every_sheet(tmp_path):
+    """Test that all worksheets are read and hits carry their sheet number."""
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["id", "status"])
+    workbook.active.append([1, "overdue"])
+    workbook.create_sheet("Archive").append([2, "overdue"])
+    path = str(tmp_path / "book.xlsx")
+    workbook.save(path)
+    results = list(RegexSearcher().search_in_file(path, r"overdue"))
+    assert [(r.line_number, r.section) for r in results] == [(2, 1), (3, 2)]
+
+def test_xlsx_keeps_formula_cells(tmp_path):
+    """Test that formulas without cached values are still searchable."""
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.append([1, 2, "=SUM(A1:B1)"])
+    path = str(tmp_path / "formulas.xlsx")
+    workbook.save(path)
+    results = list(RegexSearcher().search_in_file(path, r"SUM\(\w+:\w+\)"))
+    assert [r.match_group for r in results] == ["SUM(A1:B1)"]
+
+def test_parallel_pdf_pages_match_serial(monkeypatch):
+    """Test that page-parallel PDF extraction yields the same text."""
+    pytest.importorskip("pypdf")
+    pdf = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "Data.pdf")
+    serial = core._extract_text(pdf, ".pdf")
+    monkeypatch.setattr(core, "PDF_PARALLEL_MIN_PAGES", 1)
+    monkeypatch.setattr(core, "PDF_PAGES_PER_TASK", 1)
+    monkeypatch.setattr(core, "PDF_WORKERS", 2)
+    assert core._extract_text(pdf, ".pdf") == serial
+    assert serial.count(core.SECTION_BREAK) == 3
+
+def test_read_errors_become_diagnostics(tmp_path):
+    """Test that files failing extraction are reported, not silently dropped."""
+    @core.register_extractor(".broken")
+    def _iter_broken(file_path):
+        raise ValueError("corrupt header")
+        yield
+    try:
+        (tmp_path / "a.broken").write_text("x", encoding="utf-8")
+        (tmp_path / "b.txt").write_text("x", encoding="utf-8")
+        diagnostics = []
+        assert list(RegexSearcher().search_in_folder(str(tmp_path), "x", diagnostics=diagnostics))
+        assert [(os.path.basename(d.file_path), d.kind) for d in diagnostics] == [("a.broken", "error")]
+        assert "corrupt header" in diagnostics[0].message
+    finally:
+        del core.EXTRACTORS[".broken"]
+
 if __name__ == "__main__":
-    pytest.main(["-v", __file__])
\ No newline at end of file
+    pytest.main(["-v", __file__])
+def test_walk_files_pruning_filters(tmp_path):
+    """Test ignore files, VCS folders, depth, size and binary filters."""
+    (tmp_path / ".gitignore").write_text("*.log\nbuild/\n", encoding="utf-8")
+    (tmp_path / "a.txt").write_text("x", encoding="utf-8")
+    (tmp_path / "big.txt").write_text("x" * 5000, encoding="utf-8")
+    (tmp_path / "run.log").write_text("x", encoding="utf-8")
+    (tmp_path / "blob.dat").write_bytes(b"abc\0def")
+    (tmp_path / "image.png").write_bytes(b"not really")
+    for folder in ("build", ".git", "sub", "sub/deeper"):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "f.txt").write_text("x", encoding="utf-8")
+    names = lambda **kw: [os.path.relpath(p, tmp_path).replace(os.sep, "/")
+                          for p in core.walk_files(str(tmp_path), **kw)]
+    everything = names()
+    assert "build/f.txt" in everything and ".git/f.txt" in everything
+    assert names(ignore_files=[".gitignore"]) == [
+        ".gitignore", "a.txt", "big.txt", "blob.dat", "image.png",
+        "sub/f.txt", "sub/deeper/f.txt"]
+    assert names(max_depth=0) == [p for p in everything if "/" not in p]
+    assert "sub/deeper/f.txt" not in names(max_depth=1)
+    assert "big.txt" not in names(max_size=1000)
+    skipped = set(everything) - set(names(skip_binary=True))
+    assert skipped == {"blob.dat", "image.png"}
+    assert core.count_files(str(tmp_path), skip_binary=True) == len(everything) - 2
+
+def test_find_match_spans_indices():
+    """Test offset to Tk line.column conversion for match spans."""
+    text = "ab\ncd ab\n\nxab\fab"
+    spans = core.find_match_spans(text, "ab")
+    assert len(spans) == 4
+    assert list(spans.indices(range(len(spans)))) == [
+        ("1.0", "1.2"), ("2.3", "2.5"), ("4.1", "4.3"), ("4.4", "4.6")]
+    assert spans.index(9) == "3.0"
+    assert list(spans.on_lines(2, 4)) == [1]
+    assert list(spans.on_lines(4, 1000)) == [2, 3]
+    assert [text[s:e] for s, e in zip(spans.starts, spans.ends)] == ["ab"] * 4
+    assert len(core.find_match_spans(text, "zz")) == 0
+    cancel = threading.Event()
+    cancel.set()
+    assert core.find_match_spans(text, "ab", cancel=cancel) is None
+
+def test_results_carry_offsets_and_column(tmp_path):
+    """Test column and text offsets on the buffer and line-by-line paths."""
+    (tmp_path / "ascii.txt").write_text("one two\ntwo two\n", encoding="utf-8")
+    (tmp_path / "text.txt").write_bytes("é two\r\ntwo\n".encode("utf-8"))
+    for path in (tmp_path / "ascii.txt", tmp_path / "text.txt"):
+        text = core.read_file_text(str(path))
+        results = list(RegexSearcher().search_in_file(str(path), "two"))
+        assert all(text[r.start:r.end] == "two" for r in results)
+        lines = text.splitlines()
+        assert all(lines[r.line_number - 1][r.column:].startswith("two")
+                   for r in results)
+    results = list(RegexSearcher().search_in_file(str(tmp_path / "ascii.txt"), "two"))
+    assert [(r.line_number, r.column) for r in results] == [(1, 4), (2, 0), (2, 4)]
+
+def test_whole_file_matches_span_lines(tmp_path):
+    """Test whole-file matching across lines and its context window."""
+    (tmp_path / "a.txt").write_text("head\nbegin x\ny end\ntail\nmore\n",
+                                    encoding="utf-8")
+    searcher = RegexSearcher()
+    assert list(searcher.search_in_folder(str(tmp_path), r"begin.*end", re.DOTALL)) == []
+    results = list(searcher.search_in_folder(str(tmp_path), r"begin.*end",
+                                             re.DOTALL, whole_file=True))
+    assert len(results) == 1
+    res = results[0]
+    assert (res.line_number, res.column, res.match_group) == (2, 0, "begin x\ny end")
+    assert res.end_location() == (3, 5)
+    # Single-line matches agree with the line-by-line search
+    line_results = list(searcher.search_in_folder(str(tmp_path), "e"))
+    whole_results = list(searcher.search_in_folder(str(tmp_path), "e", whole_file=True))
+    assert ([(r.line_number, r.column, r.start) for r in line_results] ==
+            [(r.line_number, r.column, r.start) for r in whole_results])
+    reader = core.ContextReader()
+    assert reader.context(res, before=1, after=1) == (1, ["head", "begin x", "y end", "tail"])
+
+
+def test_context_reader_stops_after_context(tmp_path):
+    """Test that context is read only as far as the lines it needs."""
+    path = tmp_path / "long.txt"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 1001)), encoding="utf-8")
+    reader = core.ContextReader()
+    res = SearchResult(str(path), 5, "line 5", "5", column=5)
+    assert reader.context(res, 1, 2) == (4, ["line 4", "line 5", "line 6", "line 7"])
+    assert len(reader._lines) == 7
+    res = SearchResult(str(path), 1000, "line 1000", "1000", column=5)
+    assert reader.context(res, 1, 2) == (999, ["line 999", "line 1000"])
+    reader.close()
+
+def test_compressed_files_match_plain_text(tmp_path):
+    """Test gzip, bzip2 and xz files against the same text uncompressed."""
+    import bz2, gzip, lzma
+    text = "".join(f"line {i} {'ERROR' if i % 7 == 0 else 'ok'}\n" for i in range(500))
+    (tmp_path / "plain.log").write_text(text, encoding="utf-8")
+    for ext, module in ((".gz", gzip), (".bz2", bz2), (".xz", lzma)):
+        (tmp_path / f"app.log{ext}").write_bytes(module.compress(text.encode()))
+    # A non-ASCII file takes the line-by-line path
+    (tmp_path / "utf8.log.gz").write_bytes(gzip.compress("héllo ERROR\n".encode()))
+    results = {}
+    for res in RegexSearcher().search_in_folder(str(tmp_path), r"ERROR", max_count=30,
+                                                skip_binary=True):
+        results.setdefault(os.path.basename(res.file_path), []).append(
+            (res.line_number, res.column, res.start, res.end))
+    assert len(results["plain.log"]) == 30
+    for ext in (".gz", ".bz2", ".xz"):
+        assert results[f"app.log{ext}"] == results["plain.log"]
+    assert results["utf8.log.gz"] == [(1, 6, 6, 11)]
+    assert core.read_file_content(str(tmp_path / "app.log.xz")) == text
+
+def test_archive_members_are_virtual_files(tmp_path):
+    """Test zip and tar.gz members searched and read as virtual paths."""
+    import gzip, io, tarfile, zipfile
+    with zipfile.ZipFile(tmp_path / "a.zip", "w") as archive:
+        archive.writestr("docs/one.txt", "hello\nan ERROR here\n")
+        archive.writestr("two.log.gz", gzip.compress(b"ERROR zipped\n"))
+        archive.writestr("data.bin", "ERROR\0")
+        archive.writestr("inner.zip", "ERROR")
+    with tarfile.open(tmp_path / "b.tar.gz", "w:gz") as archive:
+        for name, data in (("x/a.log", "é ERROR\n"), ("x/b.log", "no\nERROR\n")):
+            info = tarfile.TarInfo(name)
+            info.size = len(data.encode())
+            archive.addfile(info, io.BytesIO(data.encode()))
+    (tmp_path / "broken.zip").write_bytes(b"not a zip")
+    assert not core.is_binary_file(str(tmp_path / "b.tar.gz"))
+    diagnostics = []
+    results = list(RegexSearcher().search_in_folder(
+        str(tmp_path), "ERROR", diagnostics=diagnostics, skip_binary=True))
+    found = [(os.path.relpath(r.file_path, tmp_path).replace(os.sep, "/"),
+              r.line_number, r.column) for r in results]
+    assert found == [("a.zip!/docs/one.txt", 2, 3), ("a.zip!/two.log.gz", 1, 0),
+                     ("b.tar.gz!/x/a.log", 1, 2), ("b.tar.gz!/x/b.log", 2, 0)]
+    for res in results:
+        assert core.read_file_text(res.file_path)[res.start:res.end] == "ERROR"
+    assert core.ContextReader().context(results[0], 1, 1) == (1, ["hello", "an ERROR here"])
+    assert [d.kind for d in diagnostics] == ["error"]
+    assert diagnostics[0].file_path.endswith("broken.zip")
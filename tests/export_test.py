@@ -0,0 +1,85 @@
+import os
+import sys
+import csv
+import gzip
+import json
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import SearchResult
+from src.export import export_results, guess_format
+
+
+def make_results(count):
+    for i in range(count):
+        yield SearchResult(f"/data/file{i % 3}.txt", i + 1,
+                           f"  line {i} has a héllo  ", "héllo", query="q",
+                           column=13 + len(str(i)), start=i * 22 + 13 + len(str(i)),
+                           end=i * 22 + 18 + len(str(i)))
+
+
+def test_guess_format():
+    """Test that the format and compression follow the file name."""
+    assert guess_format("report.csv") == ("csv", None)
+    assert guess_format("report.JSONL.gz") == ("jsonl", "gzip")
+    assert guess_format("report.parquet") == ("parquet", None)
+    assert guess_format("report.txt") == ("csv", None)
+
+
+def test_csv_export_streams_in_batches(tmp_path):
+    """Test CSV export from a generator across several batches."""
+    path = str(tmp_path / "out.csv")
+    assert export_results(make_results(25), path, batch_size=10) == 25
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["File Name", "Line Number", "Matched Text", "Full Line"]
+    assert rows[1] == ["file0.txt", "1", "héllo", "line 0 has a héllo"]
+    assert len(rows) == 26
+
+
+def test_gzip_jsonl_export(tmp_path):
+    """Test JSON Lines export with gzip compression."""
+    path = str(tmp_path / "out.jsonl.gz")
+    assert export_results(make_results(3), path) == 3
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    assert records[2] == {"file_path": "/data/file2.txt", "line_number": 3,
+                          "match_group": "héllo",
+                          "line_content": "line 2 has a héllo", "query": "q",
+                          "section": None, "column": 14, "start": 58, "end": 63}
+
+
+def test_parquet_export(tmp_path):
+    """Test Parquet export when pyarrow is installed."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "out.parquet")
+    assert export_results(make_results(5), path, batch_size=2) == 5
+    table = pq.read_table(path)
+    assert table.column("line_number").to_pylist() == [1, 2, 3, 4, 5]
+
+
+def test_unknown_format(tmp_path):
+    """Test that unsupported formats are rejected."""
+    with pytest.raises(ValueError):
+        export_results([], str(tmp_path / "out.xml"), fmt="xml")
+
+
+def test_export_with_context(tmp_path):
+    """Test that context lines are read from the files and exported."""
+    source = tmp_path / "log.txt"
+    source.write_text("one\ntwo\nthree hit\nfour\nfive\n", encoding="utf-8")
+    result = SearchResult(str(source), 3, "three hit", "hit", column=6)
+    path = str(tmp_path / "out.jsonl")
+    assert export_results([result], path, context=1) == 1
+    with open(path, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert record["context_line"] == 2
+    assert record["context"] == "two\nthree hit\nfour"
+    csv_path = str(tmp_path / "out.csv")
+    export_results([result], csv_path, context=1)
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][-2:] == ["Context Line", "Context"]
+    assert rows[1][-2:] == ["2", "two\nthree hit\nfour"]
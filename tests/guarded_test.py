@@ -0,0 +1,54 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import RegexSearcher
+
+# Backtracks for minutes on the long line of slow.txt
+RUNAWAY_PATTERN = r"(a+)+$|error \d"
+
+
+def make_folder(tmp_path):
+    for name in ("a.txt", "c.txt"):
+        (tmp_path / name).write_text("ok\nerror 1\n", encoding="utf-8")
+    (tmp_path / "b_slow.txt").write_text("a" * 40 + "!\nerror 2\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_timeout_skips_runaway_file(tmp_path):
+    """Test that a file over its time budget is killed and reported."""
+    folder = make_folder(tmp_path)
+    diagnostics = []
+    seen = []
+    results = list(RegexSearcher().search_in_folder(
+        folder, RUNAWAY_PATTERN, workers=2, timeout=0.5,
+        diagnostics=diagnostics, progress=seen.append))
+    assert [(os.path.basename(r.file_path), r.match_group) for r in results] == [
+        ("a.txt", "error 1"), ("c.txt", "error 1")]
+    assert [(os.path.basename(d.file_path), d.kind) for d in diagnostics] == [
+        ("b_slow.txt", "timeout")]
+    assert len(seen) == 3
+
+
+def test_total_timeout_reports_incomplete_search(tmp_path):
+    """Test that the overall budget stops the search and says so."""
+    folder = make_folder(tmp_path)
+    diagnostics = []
+    results = list(RegexSearcher().search_in_folder(
+        folder, RUNAWAY_PATTERN, total_timeout=0.5, diagnostics=diagnostics))
+    assert [r.match_group for r in results] == ["error 1"]
+    assert [d.kind for d in diagnostics] == ["timeout", "incomplete"]
+    assert diagnostics[1].file_path is None
+
+
+def test_guarded_search_matches_plain_search(tmp_path):
+    """Test that guarded workers return the same results as a serial search."""
+    for i in range(5):
+        (tmp_path / f"f{i}.log").write_text(f"x {i}\nerror {i}\n", encoding="utf-8")
+    searcher = RegexSearcher()
+    plain = [(r.file_path, r.line_number) for r in
+             searcher.search_in_folder(str(tmp_path), r"error \d")]
+    guarded = [(r.file_path, r.line_number) for r in searcher.search_in_folder(
+        str(tmp_path), r"error \d", workers=3, timeout=10)]
+    assert guarded == plain
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.ignore import IgnoreRule, IgnoreRules, parse_ignore_file
+
+
+def test_ignore_rule_globs():
+    """Test gitignore glob semantics for unanchored, anchored and ** rules."""
+    assert IgnoreRule("*.log").matches("deep/dir/app.log", False)
+    assert not IgnoreRule("/*.log").matches("deep/app.log", False)
+    assert IgnoreRule("/*.log").matches("app.log", False)
+    assert IgnoreRule("docs/*.md").matches("docs/a.md", False)
+    assert not IgnoreRule("docs/*.md").matches("docs/sub/a.md", False)
+    assert IgnoreRule("**/build").matches("a/b/build", True)
+    assert IgnoreRule("logs/**").matches("logs/x/y.txt", False)
+    assert IgnoreRule("a/**/b").matches("a/b", True)
+    assert IgnoreRule("a/**/b").matches("a/x/y/b", True)
+    assert IgnoreRule("file[0-9].txt").matches("file7.txt", False)
+    assert not IgnoreRule("file[!0-9].txt").matches("file7.txt", False)
+    # Directory-only rules never match files
+    assert not IgnoreRule("out/").matches("out", False)
+    assert IgnoreRule("out/").matches("out", True)
+    # Rules only apply below the folder of their ignore file
+    assert not IgnoreRule("*.log", "sub/").matches("app.log", False)
+
+
+def test_ignore_rules_last_match_wins(tmp_path):
+    """Test comments, escapes and negation across nested ignore files."""
+    (tmp_path / ".gitignore").write_text(
+        "# comment\n\n*.log\n!keep.log\n\\#hash\n", encoding="utf-8")
+    (tmp_path / "sub.ignore").write_text("!*.log\n", encoding="utf-8")
+    rules = IgnoreRules(parse_ignore_file(str(tmp_path / ".gitignore")))
+    assert rules.ignored("a.log")
+    assert not rules.ignored("keep.log")
+    assert rules.ignored("#hash")
+    assert not rules.ignored("comment")
+    nested = rules.extend(parse_ignore_file(str(tmp_path / "sub.ignore"), "sub/"))
+    assert nested.ignored("a.log")
+    assert not nested.ignored("sub/a.log")
+    assert parse_ignore_file(str(tmp_path / "missing")) == []
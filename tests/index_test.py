@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import RegexSearcher
+from src.index import TrigramIndex
+from src.patterns import required_query
+
+
+def _write_corpus(folder):
+    (folder / "logs").mkdir()
+    (folder / "logs" / "a.log").write_text("disk full on node7\nok\n", encoding="utf-8")
+    (folder / "logs" / "b.log").write_text("all good\n", encoding="utf-8")
+    (folder / "c.txt").write_text("Timeout after 30s\n", encoding="utf-8")
+
+
+def test_required_query():
+    """Test extraction of literals every match must contain."""
+    assert required_query(r"disk full") == "disk full"
+    assert required_query(r"ERROR \d+ ms") == ("and", ["error ", " ms"])
+    assert required_query(r"(?:timeout|refused) on") == \
+        ("and", [("or", ["timeout", "refused"]), " on"])
+    assert required_query(r"\d+") is None
+
+
+def test_index_narrows_candidates(tmp_path):
+    """Test that only files containing the literal trigrams are candidates."""
+    _write_corpus(tmp_path)
+    RegexSearcher().build_index(str(tmp_path))
+    index = TrigramIndex(str(tmp_path))
+    try:
+        assert index.candidates(r"DISK\s+full", 0) == {
+            os.path.join(str(tmp_path), "logs", "a.log")}
+        assert len(index.candidates(r"\w+", 0)) == 3
+    finally:
+        index.close()
+
+
+def test_index_updates_incrementally(tmp_path):
+    """Test that rebuilding only touches changed, new and deleted files."""
+    _write_corpus(tmp_path)
+    searcher = RegexSearcher()
+    assert searcher.build_index(str(tmp_path))["added"] == 3
+    (tmp_path / "logs" / "b.log").write_text("disk full again\n", encoding="utf-8")
+    (tmp_path / "c.txt").unlink()
+    (tmp_path / "d.txt").write_text("new\n", encoding="utf-8")
+    counts = searcher.build_index(str(tmp_path))
+    assert counts == {"added": 1, "updated": 1, "removed": 1, "unchanged": 1}
+
+
+def test_search_indexed_matches_full_search(tmp_path):
+    """Test that indexed search returns exactly the unindexed results."""
+    _write_corpus(tmp_path)
+    searcher = RegexSearcher()
+    for pattern in (r"disk full", r"\d+", r"(?i)TIMEOUT|good"):
+        indexed = [(r.file_path, r.line_number, r.match_group)
+                   for r in searcher.search_indexed(str(tmp_path), pattern)]
+        full = [(r.file_path, r.line_number, r.match_group)
+                for r in searcher.search_in_folder(str(tmp_path), pattern)]
+        assert indexed == full
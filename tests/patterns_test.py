@@ -0,0 +1,106 @@
+import os
+import re
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import find_matches_in_text
+import pytest
+
+from src.patterns import (PatternRiskError, analyze_pattern, check_pattern,
+                          compile_pattern, fold_case, literal_prefilter)
+
+
+def test_fold_case_matches_ignorecase_equivalence():
+    """Test that characters re treats as equal under IGNORECASE fold together."""
+    assert fold_case("DISK") == fold_case("disk")
+    assert fold_case("ſ") == fold_case("S")        # long s
+    assert fold_case("İx") == fold_case("ix")     # dotted capital I
+
+
+def test_literal_prefilter_picks_selective_literal():
+    """Test that the longest required literal is used and short ones dropped."""
+    assert literal_prefilter(r"\d+ ERROR [a-z]+ x").query == " ERROR "
+    assert literal_prefilter(r"\d+\s\w") is None
+    assert literal_prefilter(r"(?:timeout|refused)\d").query == ("or", ["timeout", "refused"])
+
+
+def test_literal_prefilter_ignorecase():
+    """Test that IGNORECASE prefilters compare case-folded text."""
+    prefilter = literal_prefilter(r"disk full", re.IGNORECASE)
+    assert prefilter.ignore_case
+    assert prefilter.may_match("DISK FULL on /var")
+    assert not prefilter.may_match("disk is fine")
+    assert prefilter.may_match_bytes(b"anything")
+
+
+def test_literal_prefilter_ignorecase_non_ascii(monkeypatch):
+    """Test that IGNORECASE prefilters keep lines re matches via special folds."""
+    import src.patterns as patterns
+    prefilter = literal_prefilter(r"class", re.IGNORECASE)
+    assert re.search(r"class", "claſſ", re.IGNORECASE)
+    assert prefilter.may_match("claſſ")
+    monkeypatch.setattr(patterns, "_FOLD_TABLE", {})
+    assert prefilter.may_match("claſſ")
+    assert not prefilter.may_match("clause")
+
+
+def test_literal_prefilter_scoped_ignorecase():
+    """Test that case-insensitive groups are not checked case-sensitively."""
+    prefilter = literal_prefilter(r"user=(?i:ADMIN) logged")
+    assert prefilter.may_match("user=admin logged")
+    assert not prefilter.may_match("user=admin signed in")
+
+
+def test_find_matches_unchanged_by_prefilter():
+    """Test that prefiltered searches return the same matches as plain re."""
+    text = "ok\n12 ERROR disk\nError 7\nerror 99 ERROR 3"
+    for pattern, flags in [(r"\d+ ERROR", 0), (r"error \d+", re.IGNORECASE),
+                           (r"(ERROR|Error) \d", 0), (r"missing", 0)]:
+        expected = [m.group(0) for m in re.finditer(pattern, text, flags)]
+        assert [m.group(0) for m in find_matches_in_text(text, pattern, flags)] == expected
+
+
+def test_compile_pattern_is_cached():
+    """Test that repeated compiles of the same pattern and flags are shared."""
+    assert compile_pattern(r"cached \d+", re.I) is compile_pattern(r"cached \d+", re.I)
+    with pytest.raises(re.error):
+        compile_pattern("(")
+
+
+def test_analyze_pattern_reports_literals_and_anchors():
+    """Test the literal, anchor and strategy facts of an analysis."""
+    analysis = analyze_pattern(r"^\d+ ERROR")
+    assert analysis.literals == [" ERROR"]
+    assert analysis.anchored and analysis.strategy == "prefilter"
+    assert analysis.min_length == 7 and analysis.max_length is None
+    assert analyze_pattern("disk full").strategy == "literal"
+    assert analyze_pattern(r"(?i)Disk").literals == ["disk"]
+    assert analyze_pattern(r"\d{2}:\d{2}").strategy == "scan"
+
+
+def test_analyze_pattern_backtracking_risk():
+    """Test that nested and overlapping unbounded repeats are flagged."""
+    assert analyze_pattern("ERROR").backtracking_risk == "none"
+    assert analyze_pattern(r"\w+@").backtracking_risk == "low"
+    assert analyze_pattern(r".*foo.*bar").backtracking_risk == "medium"
+    assert analyze_pattern(r"(a+)+$").backtracking_risk == "high"
+    assert analyze_pattern(r"(a+)+$").cost == "high"
+    assert analyze_pattern(r"(\w+\s?)+$").backtracking_risk == "high"
+
+
+def test_analyze_pattern_delimited_nesting_is_not_high_risk():
+    """Test that nested repeats split by a distinct delimiter are allowed."""
+    for pattern in (r"[\w.]+@(\w+\.)+\w+", r"(?:\d+,)*\d+", r"^(\w+\.)+com$"):
+        assert analyze_pattern(pattern).backtracking_risk != "high"
+        check_pattern(pattern)
+    assert analyze_pattern(r"(.*,)+x").backtracking_risk == "high"
+
+
+def test_check_pattern_rejects_risky_patterns():
+    """Test that check_pattern refuses patterns above the allowed risk."""
+    assert check_pattern(r".*foo.*bar").pattern == r".*foo.*bar"
+    with pytest.raises(PatternRiskError):
+        check_pattern(r"(\w+\s?)*$")
+    with pytest.raises(PatternRiskError):
+        check_pattern(r".*foo.*bar", max_risk="low")
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import SearchResult
+from src.results import ResultStore
+
+
+@pytest.fixture
+def store():
+    """Create a ResultStore holding a few results."""
+    result_store = ResultStore()
+    result_store.add_many([
+        SearchResult("/logs/b.log", 3, "beta 2", "2"),
+        SearchResult("/logs/a.log", 1, "alpha 10", "10"),
+        SearchResult("/logs/c.log", 2, "gamma 7", "7", query="digits"),
+    ])
+    yield result_store
+    result_store.close()
+
+
+def test_fetch_window_in_insertion_order(store):
+    """Test that windows of rows come back in insertion order by default."""
+    assert len(store) == 3
+    assert [r.file_name for r in store.fetch(1, 5)] == ["a.log", "c.log"]
+    assert store.get(2).query == "digits"
+    assert store.get(3) is None
+
+
+def test_sort_and_filter_view(store):
+    """Test that sorting and filtering are applied by the store."""
+    store.set_view("file", descending=True)
+    assert [r.file_name for r in store.fetch(0, 3)] == ["c.log", "b.log", "a.log"]
+    store.set_view("line", filter_text="a.log")
+    assert len(store) == 1 and store.total() == 3
+    assert store.get(0).line_content == "alpha 10"
+    with pytest.raises(ValueError):
+        store.set_view("size")
+
+
+def test_view_is_snapshot_until_refreshed(store):
+    """Test that rows added under a sorted view appear after refresh_view()."""
+    store.set_view("line")
+    store.add_many([SearchResult("/logs/d.log", 0, "delta", "d")])
+    assert len(store) == 3
+    store.refresh_view()
+    assert store.get(0).file_name == "d.log"
+    assert [r.file_name for r in store.iter_results(batch_size=2)] == \
+        ["d.log", "a.log", "c.log", "b.log"]
+    store.clear()
+    assert len(store) == 0 and store.sort_column is None
+
+
+def test_offsets_round_trip(store):
+    """Test that column and offsets survive storage."""
+    store.clear()
+    store.add_many([SearchResult("/x/a.txt", 3, "  hello  ", "ll", column=4,
+                                 start=20, end=22)])
+    res = store.get(0)
+    assert (res.column, res.start, res.end) == (4, 20, 22)
@@ -0,0 +1,85 @@
+import os
+import sys
+import asyncio
+import threading
+import http.client
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.server import SearchClient, SearchServer, read_token, write_token
+
+
+@pytest.fixture
+def server():
+    """Runs a one-worker SearchServer on a background event loop."""
+    loop = asyncio.new_event_loop()
+    instance = SearchServer(workers=1, cache_path=None, chunk_size=1,
+                            token="secret")
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    address = asyncio.run_coroutine_threadsafe(
+        instance.start(port=0), loop).result(10)
+    yield instance, SearchClient(address, timeout=30, token="secret")
+    asyncio.run_coroutine_threadsafe(instance.close(), loop).result(30)
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def test_search_streams_results(server, tmp_path):
+    """Test that results and the final summary stream back to the client."""
+    _, client = server
+    (tmp_path / "a.log").write_text("error 1\nok\nerror 2\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("Error 3\n", encoding="utf-8")
+    results = list(client.search(str(tmp_path), r"error \d", flags=2))
+    assert [(os.path.basename(r.file_path), r.line_number, r.match_group)
+            for r in results] == [("a.log", 1, "error 1"), ("a.log", 3, "error 2"),
+                                  ("b.txt", 1, "Error 3")]
+    assert client.summary["matches"] == 3 and client.summary["files"] == 2
+    assert [r.line_content for r in client.search(
+        str(tmp_path), "error", include=["*.txt"], flags=["IGNORECASE"])] == ["Error 3"]
+    assert client.stats()["requests"] >= 2
+
+
+def test_search_rejects_bad_requests(server, tmp_path):
+    """Test that invalid and risky patterns and missing folders are refused."""
+    _, client = server
+    for folder, pattern in ((str(tmp_path), "("), (str(tmp_path), "(a+)+$"),
+                            (str(tmp_path / "missing"), "x")):
+        with pytest.raises(ValueError):
+            client.search(folder, pattern)
+
+
+def test_cancel_stops_search(server, tmp_path):
+    """Test that /cancel ends a running search early."""
+    _, client = server
+    for i in range(300):
+        (tmp_path / f"{i:03}.txt").write_text("hit\n" * 200, encoding="utf-8")
+    results = client.search(str(tmp_path), "hit", search_id="job-1")
+    next(results)
+    assert client.cancel("job-1")
+    rest = list(results)
+    assert client.summary["cancelled"]
+    assert len(rest) + 1 < 300 * 200
+
+
+def test_requests_need_token_and_local_host(server, tmp_path):
+    """Test that requests without the token or for another Host are refused."""
+    instance, client = server
+    with pytest.raises(ValueError):
+        SearchClient(client.address, timeout=30, token="wrong").stats()
+    host, _, port = client.address.rpartition(":")
+    conn = http.client.HTTPConnection(host, int(port), timeout=30)
+    conn.request("GET", "/health", headers={"Host": "evil.example:80",
+                                            "Authorization": "Bearer secret"})
+    assert conn.getresponse().status == 403
+    conn.close()
+    assert client.stats()["requests"] == 1
+
+
+def test_token_file_is_private(tmp_path):
+    """Test that the token file is readable by its owner only."""
+    path = str(tmp_path / "token")
+    token = write_token(path)
+    assert read_token(path) == token
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert write_token(path) != token
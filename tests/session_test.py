@@ -0,0 +1,65 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.session import SearchSession
+
+
+def test_first_refresh_reports_everything(tmp_path):
+    """Test that the first refresh adds every match."""
+    (tmp_path / "a.log").write_text("error 1\nok\nerror 2\n", encoding="utf-8")
+    session = SearchSession(str(tmp_path), r"error \d")
+    diff = session.refresh()
+    assert [r.match_group for r in diff.added] == ["error 1", "error 2"]
+    assert diff.removed == [] and diff.unchanged == 0
+
+
+def test_refresh_only_rescans_changes(tmp_path):
+    """Test that unchanged files are skipped and diffs are per match."""
+    (tmp_path / "a.log").write_text("error 1\n", encoding="utf-8")
+    (tmp_path / "b.log").write_text("error 2\nerror 3\n", encoding="utf-8")
+    (tmp_path / "c.log").write_text("error 4\n", encoding="utf-8")
+    session = SearchSession(str(tmp_path), r"error \d")
+    session.refresh()
+
+    (tmp_path / "b.log").write_text("error 2\nerror 5\n", encoding="utf-8")
+    (tmp_path / "c.log").unlink()
+    (tmp_path / "d.log").write_text("error 6\n", encoding="utf-8")
+    diff = session.refresh()
+    assert sorted(r.match_group for r in diff.added) == ["error 5", "error 6"]
+    assert sorted(r.match_group for r in diff.removed) == ["error 3", "error 4"]
+    assert diff.unchanged == 2
+    assert [os.path.basename(p) for p in diff.changed_files] == ["b.log", "d.log"]
+    assert [os.path.basename(p) for p in diff.deleted_files] == ["c.log"]
+    assert [r.match_group for r in session.results()] == \
+        ["error 1", "error 2", "error 5", "error 6"]
+    assert not session.refresh()
+
+
+def test_hash_files_ignores_touch(tmp_path):
+    """Test that a touched but identical file is not re-searched."""
+    path = tmp_path / "a.log"
+    path.write_text("error 1\n", encoding="utf-8")
+    session = SearchSession(str(tmp_path), r"error", hash_files=True)
+    session.refresh()
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    diff = session.refresh()
+    assert diff.changed_files == [] and diff.unchanged == 1
+
+
+def test_watch_reports_changes(tmp_path):
+    """Test that watch() delivers diffs from its polling thread."""
+    session = SearchSession(str(tmp_path), r"error")
+    session.refresh()
+    received = threading.Event()
+    diffs = []
+    thread, stop = session.watch(lambda diff: (diffs.append(diff), received.set()),
+                                 interval=0.05)
+    (tmp_path / "new.log").write_text("error\n", encoding="utf-8")
+    assert received.wait(5)
+    stop.set()
+    thread.join(5)
+    assert diffs[0].added[0].file_name == "new.log"
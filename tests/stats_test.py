@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import pstats
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.core import RegexSearcher
+from src.stats import STAGES, SearchStats, profile_to
+
+
+def make_folder(tmp_path):
+    (tmp_path / "a.txt").write_text("error 1\nok\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("x,error 2\ny,error 3\n", encoding="utf-8")
+    (tmp_path / "c.log").write_text("nothing\n", encoding="utf-8")
+    return str(tmp_path)
+
+
+def test_stats_count_files_bytes_and_matches(tmp_path):
+    """Test the counters recorded for a serial search."""
+    folder = make_folder(tmp_path)
+    stats = SearchStats()
+    results = list(RegexSearcher().search_in_folder(folder, r"error \d", stats=stats))
+    assert stats.matches == len(results) == 3
+    assert stats.files == 3
+    assert stats.bytes_read == sum(os.path.getsize(os.path.join(folder, name))
+                                   for name in os.listdir(folder))
+    assert stats.files_by_ext == {".txt": 1, ".csv": 1, ".log": 1}
+    assert set(stats.stage_times) == set(STAGES)
+    assert all(seconds >= 0 for seconds in stats.stage_times.values())
+    assert stats.wall_time > 0
+    assert len(stats.slowest_files) == 3
+    assert "3 files" in stats.summary()
+
+
+def test_worker_stats_are_merged(tmp_path):
+    """Test that process-pool and guarded searches merge worker stats."""
+    folder = make_folder(tmp_path)
+    for kwargs in ({"workers": 2, "chunk_size": 1}, {"timeout": 10}):
+        stats = SearchStats()
+        list(RegexSearcher().search_in_folder(folder, r"error \d", stats=stats, **kwargs))
+        assert (stats.files, stats.matches) == (3, 3)
+        assert stats.files_by_ext[".csv"] == 1
+
+
+def test_trace_and_profile_dumps(tmp_path):
+    """Test the Chrome trace and cProfile outputs."""
+    folder = make_folder(tmp_path)
+    stats = SearchStats(trace=True)
+    profile_path = str(tmp_path / "run.prof")
+    with profile_to(profile_path):
+        list(RegexSearcher().search_in_folder(folder, r"error \d", stats=stats))
+    trace_path = str(tmp_path / "trace.json")
+    stats.write_trace(trace_path)
+    with open(trace_path, encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    assert sorted(event["name"] for event in events) == ["a.txt", "b.csv", "c.log"]
+    assert pstats.Stats(profile_path).total_calls > 0